@@ -5,13 +5,14 @@ Generates feature importance explanations for model predictions.
 
 import json
 import logging
+import weakref
+from collections import OrderedDict
 from pathlib import Path
 
 import numpy as np
 import pandas as pd
 import xgboost as xgb
 import shap
-import matplotlib.pyplot as plt
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
@@ -19,6 +20,11 @@ logger = logging.getLogger(__name__)
 MODEL_DIR = Path(__file__).parent.parent / "models" / "baseline" / "artifacts"
 OUTPUT_DIR = Path(__file__).parent / "artifacts"
 
+# model version (or model identity) -> (weakref to model, TreeExplainer),
+# least recently used first; see get_explainer
+_explainers: OrderedDict = OrderedDict()
+MAX_CACHED_EXPLAINERS = 8
+
 
 def load_model():
     """Load trained model."""
@@ -51,21 +57,55 @@ def generate_sample_data(n_samples: int = 100, seed: int = 42) -> pd.DataFrame:
     })
 
 
-def compute_shap_values(model, X: pd.DataFrame, feature_names: list) -> tuple:
+def get_explainer(model, model_version: str = None) -> shap.TreeExplainer:
+    """
+    TreeExplainer for a model, built once per model version.
+    
+    The MAX_CACHED_EXPLAINERS most recently used explainers are kept. An
+    entry is only reused for the very model object it was built for (held
+    by weak reference), so a recycled id() or another model published under
+    the same version never gets a stale explainer.
+    
+    Args:
+        model: Trained XGBoost model
+        model_version: Cache key; defaults to the model object's identity
+    """
+    key = model_version or id(model)
+    cached = _explainers.get(key)
+    if cached is None or cached[0]() is not model:
+        cached = _explainers[key] = (weakref.ref(model), shap.TreeExplainer(model))
+    _explainers.move_to_end(key)
+    while len(_explainers) > MAX_CACHED_EXPLAINERS:
+        _explainers.popitem(last=False)
+    return cached[1]
+
+
+def native_contributions(model, X: pd.DataFrame, feature_names: list) -> tuple:
+    """
+    SHAP values from XGBoost's native TreeSHAP (pred_contribs).
+    
+    Same values as TreeExplainer, without building one, and the class
+    probabilities come from the same call.
+    
+    Returns:
+        (probabilities (rows, classes), shap_values (rows, classes, features))
+    """
+    contribs = model.predict(xgb.DMatrix(X, feature_names=feature_names), pred_contribs=True)
+    # Per-class contributions (last column is the bias) sum to the class margin
+    margins = contribs.sum(axis=2)
+    proba = np.exp(margins - margins.max(axis=1, keepdims=True))
+    proba /= proba.sum(axis=1, keepdims=True)
+    return proba, contribs[:, :, :-1]
+
+
+def compute_shap_values(model, X: pd.DataFrame, feature_names: list, model_version: str = None) -> tuple:
     """
     Compute SHAP values for the dataset.
     
     Returns:
         (explainer, shap_values)
     """
-    # Create DMatrix
-    # Create DMatrix
-    _ = xgb.DMatrix(X, feature_names=feature_names)
-    
-    # Create SHAP explainer
-    explainer = shap.TreeExplainer(model)
-    
-    # Compute SHAP values
+    explainer = get_explainer(model, model_version)
     shap_values = explainer.shap_values(X)
     
     return explainer, shap_values
@@ -73,6 +113,9 @@ def compute_shap_values(model, X: pd.DataFrame, feature_names: list) -> tuple:
 
 def generate_summary_plot(shap_values, X: pd.DataFrame, output_path: Path):
     """Generate and save SHAP summary plot."""
+    # Only plotting needs matplotlib; explanations are served without it
+    import matplotlib.pyplot as plt
+    
     plt.figure(figsize=(10, 8))
     shap.summary_plot(shap_values, X, show=False)
     plt.tight_layout()
@@ -89,6 +132,9 @@ def generate_feature_importance(shap_values, feature_names: list) -> dict:
         mean_abs_shap = np.mean([np.abs(sv).mean(axis=0) for sv in shap_values], axis=0)
     else:
         mean_abs_shap = np.abs(shap_values).mean(axis=0)
+        if mean_abs_shap.ndim > 1:
+            # (features, classes) from newer shap releases
+            mean_abs_shap = mean_abs_shap.mean(axis=1)
     
     # Normalize to sum to 1
     total = mean_abs_shap.sum()
@@ -105,44 +151,32 @@ def generate_feature_importance(shap_values, feature_names: list) -> dict:
     return importance
 
 
-def explain_single(model, features: dict, feature_names: list, label_classes: list) -> dict:
+def iter_feature_importance(model, X: pd.DataFrame, feature_names: list, chunk_size: int = 5000):
     """
-    Explain a single prediction.
+    Feature importance over a large sample, computed chunk by chunk with
+    native TreeSHAP so only one chunk's SHAP values are held at a time.
     
-    Args:
-        model: Trained XGBoost model
-        features: Feature dict for single instance
-        feature_names: List of feature names
-        label_classes: List of class labels
-        
-    Returns:
-        Explanation dict with prediction and feature contributions
+    Yields:
+        (rows_done, importance) after every chunk; the final importance
+        equals generate_feature_importance over the whole sample
     """
-    # Prepare input
-    X = pd.DataFrame([features])[feature_names]
-    dmatrix = xgb.DMatrix(X, feature_names=feature_names)
-    
-    # Get prediction
-    proba = model.predict(dmatrix)[0]
-    pred_idx = proba.argmax()
-    pred_label = label_classes[pred_idx]
-    
-    # Compute SHAP
-    explainer = shap.TreeExplainer(model)
-    shap_values = explainer.shap_values(X)
-    
-    # Get SHAP values for predicted class
-    if isinstance(shap_values, list):
-        sv = shap_values[pred_idx][0]
-    else:
-        sv = shap_values[0]
+    abs_shap_sum = 0
+    for start in range(0, len(X), chunk_size):
+        _, shap_values = native_contributions(model, X.iloc[start:start + chunk_size], feature_names)
+        abs_shap_sum = abs_shap_sum + np.abs(shap_values).sum(axis=0).T
+        # One pseudo-row of (features, classes); normalization makes sums and means equivalent
+        yield min(start + chunk_size, len(X)), generate_feature_importance(abs_shap_sum[np.newaxis], feature_names)
+
+
+def _build_explanation(values, proba, sv, feature_names: list, label_classes: list) -> dict:
+    """Explanation dict for one row, given its per-feature SHAP values for the predicted class."""
+    pred_idx = int(proba.argmax())
     
-    # Build explanation
     contributions = []
     for i, name in enumerate(feature_names):
         contributions.append({
             'feature': name,
-            'value': float(features[name]),
+            'value': float(values[i]),
             'shap_value': float(sv[i]),
             'contribution': 'positive' if sv[i] > 0 else 'negative' if sv[i] < 0 else 'neutral'
         })
@@ -151,13 +185,63 @@ def explain_single(model, features: dict, feature_names: list, label_classes: li
     contributions.sort(key=lambda x: abs(x['shap_value']), reverse=True)
     
     return {
-        'prediction': pred_label,
+        'prediction': label_classes[pred_idx],
         'confidence': float(proba[pred_idx]),
         'probabilities': {label_classes[i]: float(p) for i, p in enumerate(proba)},
         'feature_contributions': contributions
     }
 
 
+def explain_batch(model, X: pd.DataFrame, feature_names: list, label_classes: list) -> list:
+    """
+    Explain every row of X with one native TreeSHAP call.
+    
+    Returns:
+        One explain_single-style dict per row
+    """
+    X = X[feature_names]
+    proba, shap_values = native_contributions(model, X, feature_names)
+    pred_idx = proba.argmax(axis=1)
+    class_shap = shap_values[np.arange(len(X)), pred_idx]
+    
+    return [
+        _build_explanation(values, proba[i], class_shap[i], feature_names, label_classes)
+        for i, values in enumerate(X.to_numpy())
+    ]
+
+
+def explain_single(model, features: dict, feature_names: list, label_classes: list,
+                   model_version: str = None, native: bool = True) -> dict:
+    """
+    Explain a single prediction.
+    
+    Args:
+        model: Trained XGBoost model
+        features: Feature dict for single instance
+        feature_names: List of feature names
+        label_classes: List of class labels
+        model_version: Key for the cached TreeExplainer (native=False only)
+        native: Use XGBoost's pred_contribs; False uses shap's TreeExplainer
+        
+    Returns:
+        Explanation dict with prediction and feature contributions
+    """
+    X = pd.DataFrame([features])[feature_names]
+    
+    if native:
+        return explain_batch(model, X, feature_names, label_classes)[0]
+    
+    proba = model.predict(xgb.DMatrix(X, feature_names=feature_names))[0]
+    shap_values = get_explainer(model, model_version).shap_values(X)
+    
+    # Older shap releases return one array per class, newer (rows, features, classes)
+    if isinstance(shap_values, list):
+        shap_values = np.stack(shap_values, axis=-1)
+    sv = shap_values[0, :, int(proba.argmax())]
+    
+    return _build_explanation(X.to_numpy()[0], proba, sv, feature_names, label_classes)
+
+
 def main():
     """Generate SHAP summary and save artifacts."""
     logger.info("=" * 60)
@@ -174,7 +258,7 @@ def main():
     X = X[feature_names]  # Ensure column order
     
     logger.info("Computing SHAP values...")
-    explainer, shap_values = compute_shap_values(model, X, feature_names)
+    explainer, shap_values = compute_shap_values(model, X, feature_names, metadata.get('version'))
     
     logger.info("Generating summary plot...")
     generate_summary_plot(shap_values, X, OUTPUT_DIR / "shap_summary.png")
@@ -0,0 +1,176 @@
+"""
+Sharded Feature Backfill
+Runs the offline feature pipeline across multiple cores.
+
+Usage: python -m ml.features.backfill raw/accounts-*.parquet --workers 8
+"""
+
+import argparse
+import logging
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Optional, Union
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from ml.features.pipeline import FeaturePipeline
+from ml.features.streaming import (
+    ACCOUNT_FEATURES_PATH,
+    DEFAULT_CHUNK_SIZE,
+    ParquetFeatureSink,
+    iter_record_chunks,
+)
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+DEFAULT_NUM_SHARDS = 64
+
+
+def shard_ids(account_ids, num_shards: int) -> np.ndarray:
+    """
+    Map account ids to shard numbers.
+    
+    Uses pandas' keyed hash rather than Python's hash(), so the mapping is
+    identical in every worker process and across runs.
+    """
+    values = pd.Series(account_ids, dtype=object).fillna('unknown').astype(str).to_numpy()
+    return (pd.util.hash_array(values) % np.uint64(num_shards)).astype(np.int64)
+
+
+class ShardedBackfill:
+    """
+    Multi-process backfill runner.
+    
+    Work happens in two parallel phases:
+    1. Partition: each input file is read in chunks and split by account_id
+       hash into per-shard part files.
+    2. Transform: each shard is transformed and sorted by account_id.
+    
+    Shards are then merged in shard order into a single Parquet file. The
+    shard count, not the worker count, decides the layout, so the output is
+    identical for any number of workers.
+    """
+    
+    def __init__(
+        self,
+        reference_date: Optional[datetime] = None,
+        workers: Optional[int] = None,
+        num_shards: int = DEFAULT_NUM_SHARDS,
+        chunk_size: int = DEFAULT_CHUNK_SIZE
+    ):
+        self.reference_date = reference_date or datetime.utcnow()
+        self.workers = workers or os.cpu_count() or 1
+        self.num_shards = num_shards
+        self.chunk_size = chunk_size
+    
+    def run(
+        self,
+        inputs: list[Union[str, Path]],
+        output_path: Union[str, Path] = ACCOUNT_FEATURES_PATH
+    ) -> int:
+        """
+        Backfill features for all input files.
+        
+        Args:
+            inputs: Raw account record files (.parquet or .jsonl)
+            output_path: Destination Parquet file
+        
+        Returns:
+            Number of feature rows written
+        """
+        output_path = Path(output_path)
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        
+        with tempfile.TemporaryDirectory(dir=output_path.parent, prefix='.backfill-') as work_dir:
+            work_dir = Path(work_dir)
+            
+            with ProcessPoolExecutor(max_workers=self.workers) as pool:
+                list(pool.map(
+                    _partition_file,
+                    range(len(inputs)),
+                    [str(p) for p in inputs],
+                    [str(work_dir)] * len(inputs),
+                    [self.num_shards] * len(inputs),
+                    [self.chunk_size] * len(inputs),
+                ))
+                
+                shard_dirs = sorted(p for p in work_dir.iterdir() if p.is_dir())
+                shard_outputs = list(pool.map(
+                    _transform_shard,
+                    [str(p) for p in shard_dirs],
+                    [self.reference_date] * len(shard_dirs),
+                ))
+            
+            pipeline = FeaturePipeline(reference_date=self.reference_date)
+            with ParquetFeatureSink(output_path, pipeline.FEATURE_SCHEMA, self.reference_date) as sink:
+                for shard_output in shard_outputs:
+                    sink.write(pd.read_parquet(shard_output))
+        
+        logger.info(
+            f"Backfilled {sink.rows_written} accounts from {len(inputs)} files "
+            f"({len(shard_outputs)} shards, {self.workers} workers)"
+        )
+        return sink.rows_written
+
+
+def _partition_file(file_index: int, path: str, work_dir: str, num_shards: int, chunk_size: int):
+    """Split one input file into per-shard part files."""
+    for chunk_index, chunk in enumerate(iter_record_chunks(path, chunk_size)):
+        table = chunk if isinstance(chunk, pa.Table) else pa.Table.from_pandas(chunk, preserve_index=False)
+        if 'account_id' in table.column_names:
+            shards = shard_ids(table.column('account_id').to_pandas(), num_shards)
+        else:
+            shards = shard_ids(np.full(table.num_rows, 'unknown', dtype=object), num_shards)
+        
+        for shard in np.unique(shards):
+            shard_dir = Path(work_dir) / f'shard-{shard:05d}'
+            shard_dir.mkdir(exist_ok=True)
+            part = table.filter(pa.array(shards == shard))
+            pq.write_table(part, shard_dir / f'part-{file_index:05d}-{chunk_index:06d}.parquet')
+
+
+def _transform_shard(shard_dir: str, reference_date: datetime) -> str:
+    """Transform one shard's parts and sort them by account_id."""
+    pipeline = FeaturePipeline(reference_date=reference_date)
+    parts = sorted(Path(shard_dir).glob('part-*.parquet'))
+    features = pd.concat(
+        [pipeline.transform_columns(pq.read_table(p)) for p in parts],
+        ignore_index=True
+    )
+    features = features.sort_values('account_id', kind='stable', ignore_index=True)
+    
+    output = Path(shard_dir) / 'features.parquet'
+    features.to_parquet(output, index=False)
+    return str(output)
+
+
+def main(argv: Optional[list[str]] = None):
+    """CLI entrypoint for sharded backfills."""
+    parser = argparse.ArgumentParser(description="Backfill account features across multiple cores.")
+    parser.add_argument('inputs', nargs='+', help="Raw account record files (.parquet or .jsonl)")
+    parser.add_argument('--output', default=str(ACCOUNT_FEATURES_PATH), help="Output Parquet path")
+    parser.add_argument('--workers', type=int, default=None, help="Worker processes (default: all cores)")
+    parser.add_argument('--shards', type=int, default=DEFAULT_NUM_SHARDS, help="Number of account_id hash shards")
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE, help="Records per read chunk")
+    parser.add_argument('--reference-date', type=datetime.fromisoformat, default=None,
+                        help="ISO date features are computed relative to (default: now, UTC)")
+    args = parser.parse_args(argv)
+    
+    runner = ShardedBackfill(
+        reference_date=args.reference_date,
+        workers=args.workers,
+        num_shards=args.shards,
+        chunk_size=args.chunk_size,
+    )
+    return runner.run(args.inputs, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -5,9 +5,13 @@ Handles feature store operations.
 
 import logging
 from pathlib import Path
+from typing import Optional
 
 from feast import FeatureStore
 
+from ml.features.historical import HistoricalFeatureJoiner
+from ml.features.online_store import LocalOnlineStore, materialize_from_offline
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
@@ -20,9 +24,25 @@ class FeastRegistry:
     Ensures training/serving parity.
     """
     
-    def __init__(self, repo_path: str = str(FEATURE_STORE_PATH)):
+    def __init__(
+        self,
+        repo_path: str = str(FEATURE_STORE_PATH),
+        local_online_store: Optional[str] = None,
+        local_offline_store: bool = False
+    ):
+        """
+        Args:
+            repo_path: Feast repo directory
+            local_online_store: Path of an embedded memory-mapped online
+                store to use instead of Feast's online store (dev/CI)
+            local_offline_store: Build historical features with the local
+                point-in-time join engine instead of Feast's offline store
+        """
         self.repo_path = repo_path
         self.store = FeatureStore(repo_path=repo_path)
+        self.local_online_store = local_online_store
+        self._local_store: Optional[LocalOnlineStore] = None
+        self.local_offline_store = local_offline_store
         logger.info(f"Initialized Feast registry at {repo_path}")
     
     def apply(self):
@@ -32,9 +52,32 @@ class FeastRegistry:
     
     def materialize(self, start_date, end_date):
         """Materialize features to online store."""
-        self.store.materialize(start_date=start_date, end_date=end_date)
+        if self.local_online_store:
+            materialize_from_offline(start_date, end_date, self.local_online_store)
+        else:
+            self.store.materialize(start_date=start_date, end_date=end_date)
         logger.info(f"Materialized features from {start_date} to {end_date}")
     
+    def _get_local_online_features(self, entity_rows: list[dict], feature_refs: list[str]) -> dict:
+        """Serve get_online_features from the embedded store."""
+        if self._local_store is None:
+            self._local_store = LocalOnlineStore(self.local_online_store)
+        else:
+            self._local_store.refresh()
+        
+        account_ids = [row["account_id"] for row in entity_rows]
+        names = [ref.split(":")[-1] for ref in feature_refs]
+        available = [n for n in names if n in self._local_store.columns]
+        values, found = self._local_store.get_many(account_ids, available)
+        
+        result = {"account_id": account_ids}
+        for name in names:
+            if name in values:
+                result[name] = [v if ok else None for v, ok in zip(values[name].tolist(), found)]
+            else:
+                result[name] = [None] * len(account_ids)
+        return result
+    
     def get_online_features(self, entity_rows: list[dict], features: list[str]) -> dict:
         """
         Get features from online store.
@@ -55,6 +98,9 @@ class FeastRegistry:
             "payment_history:payment_history_score",
         ]
         
+        if self.local_online_store:
+            return self._get_local_online_features(entity_rows, feature_refs)
+        
         response = self.store.get_online_features(
             features=feature_refs,
             entity_rows=entity_rows
@@ -73,6 +119,10 @@ class FeastRegistry:
         Returns:
             DataFrame with features
         """
+        if self.local_offline_store:
+            joiner = HistoricalFeatureJoiner(repo_path=self.repo_path)
+            return joiner.get_historical_features(entity_df, features)
+        
         return self.store.get_historical_features(
             entity_df=entity_df,
             features=features
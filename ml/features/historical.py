@@ -0,0 +1,218 @@
+"""
+Point-in-Time Historical Features
+Local as-of join of FeatureView offline sources onto labelled entity rows.
+
+Usage: python -m ml.features.historical labels.parquet --output training.parquet
+"""
+
+import argparse
+import logging
+from pathlib import Path
+from typing import Optional, Union
+
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+from feast import FeatureView
+
+from ml.features.contracts.account_features import account_features, payment_history_features
+from ml.features.streaming import DATA_DIR
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+DEFAULT_FEATURE_VIEWS = [account_features, payment_history_features]
+
+DEFAULT_FEATURE_REFS = [
+    "account_features:days_past_due",
+    "account_features:outstanding_balance",
+    "account_features:contact_attempts",
+    "account_features:last_payment_days_ago",
+    "account_features:account_age_months",
+    "payment_history:payment_history_score",
+]
+
+
+class HistoricalFeatureJoiner:
+    """
+    Point-in-time correct training data from the local offline sources.
+    
+    For every entity row (account_id, event_timestamp) and FeatureView, picks
+    the latest feature row for that account with
+        
+        event_timestamp - ttl <= feature timestamp <= event_timestamp
+    
+    breaking timestamp ties on the view's created_timestamp_column, which
+    matches Feast's offline store semantics. Each view is joined with one
+    vectorized sort-merge over entity and feature rows, so the cost is a
+    single sort of O(entities + feature rows) instead of a lookup per label.
+    Source Parquet files are read with column pruning and a timestamp filter
+    covering only the window the entity rows can reach.
+    """
+    
+    def __init__(
+        self,
+        feature_views: Optional[list[FeatureView]] = None,
+        repo_path: Union[str, Path] = DATA_DIR.parent,
+        join_key: str = 'account_id'
+    ):
+        """
+        Args:
+            feature_views: FeatureViews to join from (default: account views)
+            repo_path: Directory FileSource paths are relative to
+            join_key: Entity join key shared by the views
+        """
+        self.views = {v.name: v for v in (feature_views or DEFAULT_FEATURE_VIEWS)}
+        self.repo_path = Path(repo_path)
+        self.join_key = join_key
+    
+    def get_historical_features(
+        self,
+        entity_df: pd.DataFrame,
+        features: Optional[list[str]] = None,
+        timestamp_column: str = 'event_timestamp',
+        full_feature_names: bool = False
+    ) -> pd.DataFrame:
+        """
+        Join features onto entity rows as of each row's timestamp.
+        
+        Args:
+            entity_df: DataFrame with the join key, timestamp_column and any
+                label columns
+            features: Feature refs ("view:feature", default: model features)
+            timestamp_column: Entity timestamp column
+            full_feature_names: Name output columns "view__feature"
+        
+        Returns:
+            entity_df (same row order) with one column per feature; rows with
+            no feature row inside the ttl window get NaN
+        """
+        refs_by_view: dict[str, list[str]] = {}
+        for ref in features or DEFAULT_FEATURE_REFS:
+            view_name, _, feature = ref.partition(':')
+            if view_name not in self.views:
+                raise ValueError(f"Unknown feature view: {view_name}")
+            refs_by_view.setdefault(view_name, []).append(feature)
+        
+        result = entity_df.copy()
+        entity_ts = _utc_naive(entity_df[timestamp_column])
+        entity_ids = entity_df[self.join_key].to_numpy(dtype=object)
+        
+        for view_name, names in refs_by_view.items():
+            view = self.views[view_name]
+            source = self._read_source(view, names, entity_ts)
+            rows = self._as_of_rows(view, entity_ids, entity_ts, source)
+            found = rows >= 0
+            safe_rows = np.where(found, rows, 0)
+            
+            for name in names:
+                values = source[name].to_numpy()[safe_rows] if len(source) else np.zeros(len(rows))
+                column = pd.Series(values, index=result.index).where(found)
+                result[f"{view_name}__{name}" if full_feature_names else name] = column
+            
+            logger.info(f"Joined {view_name}: {int(found.sum())}/{len(rows)} rows matched")
+        
+        return result
+    
+    def _read_source(self, view: FeatureView, names: list[str], entity_ts: np.ndarray) -> pd.DataFrame:
+        """Read the columns and timestamp window of a view's source that the join needs."""
+        source = view.batch_source
+        ts_field = source.timestamp_field
+        columns = [self.join_key, ts_field] + names
+        if source.created_timestamp_column:
+            columns.append(source.created_timestamp_column)
+        
+        path = self.repo_path / source.path
+        filters = None
+        valid_ts = entity_ts[~np.isnat(entity_ts)]
+        if len(valid_ts):
+            upper, lower = pd.Timestamp(valid_ts.max()), pd.Timestamp(valid_ts.min())
+            # Bounds must match the column's tz-awareness for Arrow to compare them
+            tz = getattr(pq.read_schema(path).field(ts_field).type, 'tz', None)
+            if tz:
+                upper, lower = (t.tz_localize('UTC').tz_convert(tz) for t in (upper, lower))
+            filters = [(ts_field, '<=', upper)]
+            if view.ttl:
+                filters.append((ts_field, '>=', lower - view.ttl))
+        
+        return pq.read_table(path, columns=columns, filters=filters).to_pandas()
+    
+    def _as_of_rows(
+        self,
+        view: FeatureView,
+        entity_ids: np.ndarray,
+        entity_ts: np.ndarray,
+        source: pd.DataFrame
+    ) -> np.ndarray:
+        """
+        Source row matched to each entity row (-1 for none).
+        
+        Entity and feature rows are sorted together by (key, timestamp),
+        with feature rows placed before entity rows at equal timestamps and
+        ordered by created timestamp among themselves. A running maximum of
+        feature positions then gives, for each entity row, the most recent
+        feature row at or before it.
+        """
+        n, m = len(entity_ids), len(source)
+        if not n or not m:
+            return np.full(n, -1, dtype=np.int64)
+        
+        ts_field = view.batch_source.timestamp_field
+        created_field = view.batch_source.created_timestamp_column
+        feature_ts = _utc_naive(source[ts_field])
+        feature_created = (
+            _utc_naive(source[created_field]).view(np.int64)
+            if created_field else np.zeros(m, dtype=np.int64)
+        )
+        
+        keys, _ = pd.factorize(np.concatenate([entity_ids, source[self.join_key].to_numpy(dtype=object)]))
+        ts = np.concatenate([entity_ts, feature_ts]).view(np.int64)
+        is_entity = np.concatenate([np.ones(n, dtype=np.int8), np.zeros(m, dtype=np.int8)])
+        created = np.concatenate([np.zeros(n, dtype=np.int64), feature_created])
+        
+        order = np.lexsort((created, is_entity, ts, keys))
+        
+        last_feature = np.where(order >= n, np.arange(n + m), -1)
+        np.maximum.accumulate(last_feature, out=last_feature)
+        
+        entity_pos = np.flatnonzero(order < n)
+        candidate = last_feature[entity_pos]
+        candidate_row = order[np.maximum(candidate, 0)]
+        entity_row = order[entity_pos]
+        
+        valid = (candidate >= 0) & (keys[candidate_row] == keys[entity_row])
+        valid &= ~np.isnat(entity_ts[entity_row]) & ~np.isnat(feature_ts[np.maximum(candidate_row - n, 0)])
+        if view.ttl:
+            ttl = np.timedelta64(int(view.ttl.total_seconds() * 1_000_000), 'us')
+            valid &= (entity_ts[entity_row] - feature_ts[np.maximum(candidate_row - n, 0)]) <= ttl
+        
+        rows = np.full(n, -1, dtype=np.int64)
+        rows[entity_row[valid]] = candidate_row[valid] - n
+        return rows
+
+
+def _utc_naive(values) -> np.ndarray:
+    """Timestamps as naive UTC datetime64[us]; tz-naive input is taken as UTC."""
+    values = pd.to_datetime(pd.Series(values), utc=True).dt.tz_localize(None)
+    return values.to_numpy(dtype='datetime64[us]')
+
+
+def main(argv: Optional[list[str]] = None):
+    """CLI entrypoint for building a point-in-time training set."""
+    parser = argparse.ArgumentParser(description="Join historical features onto labelled entity rows.")
+    parser.add_argument('entities', help="Parquet file with account_id, event_timestamp and labels")
+    parser.add_argument('--output', required=True, help="Output Parquet path")
+    parser.add_argument('--features', nargs='+', default=None, help="Feature refs (view:feature)")
+    parser.add_argument('--repo-path', default=str(DATA_DIR.parent), help="Directory source paths are relative to")
+    args = parser.parse_args(argv)
+    
+    entity_df = pd.read_parquet(args.entities)
+    joiner = HistoricalFeatureJoiner(repo_path=args.repo_path)
+    training_df = joiner.get_historical_features(entity_df, args.features)
+    training_df.to_parquet(args.output, index=False)
+    logger.info(f"Wrote {len(training_df)} training rows to {args.output}")
+    return training_df
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,290 @@
+"""
+Local Online Feature Store
+Memory-mapped, fixed-width columnar feature rows indexed by account_id.
+
+Used in dev/CI (and single-host deployments) where no Redis-backed Feast
+online store is available. The on-disk layout is also read by
+services/feature-service/online_store.py, so keep the two in sync:
+
+    <store>/CURRENT              name of the active generation directory
+    <store>/<generation>/
+        meta.json                format version, feature names/dtypes, sizes
+        account_id.npy           fixed-width bytes (S<width>), one per row
+        index.npy                int64 open-addressing hash table (-1 = empty)
+        columns/<feature>.npy    one fixed-width column per feature
+
+Each materialization writes a new generation and then swaps CURRENT, so
+readers holding the old mmaps are never affected by a write.
+"""
+
+import json
+import logging
+import os
+import shutil
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Optional, Union
+
+import numpy as np
+import pandas as pd
+
+from ml.features.payment_state import PAYMENT_HISTORY_PATH
+from ml.features.streaming import ACCOUNT_FEATURES_PATH, DATA_DIR
+
+logger = logging.getLogger(__name__)
+
+LOCAL_ONLINE_STORE_PATH = DATA_DIR / "online_store"
+
+FORMAT_VERSION = 1
+KEEP_GENERATIONS = 2
+
+_FNV_OFFSET = np.uint64(0xcbf29ce484222325)
+_FNV_PRIME = np.uint64(0x100000001b3)
+
+
+def hash_ids(ids: np.ndarray) -> np.ndarray:
+    """64-bit FNV-1a over fixed-width byte strings, vectorized across rows."""
+    codes = ids.view(np.uint8).reshape(len(ids), ids.dtype.itemsize)
+    h = np.full(len(ids), _FNV_OFFSET, dtype=np.uint64)
+    for j in range(codes.shape[1]):
+        h ^= codes[:, j]
+        h *= _FNV_PRIME
+    return h
+
+
+def encode_ids(account_ids, width: int) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Encode account ids as S<width> bytes.
+    
+    Returns:
+        (encoded ids, mask of ids that fit in width)
+    """
+    encoded = np.char.encode(np.asarray(account_ids, dtype=str), 'utf-8')
+    fits = np.char.str_len(encoded) <= width
+    return encoded.astype(f'S{width}'), fits
+
+
+class LocalOnlineStore:
+    """
+    Read side of the memory-mapped online store.
+    
+    Lookups hash the account id and probe the mmapped index, so a single
+    lookup is O(1) and touches only the pages it needs; column values are
+    served straight from the mapped files without copying the store.
+    """
+    
+    def __init__(self, path: Union[str, Path] = LOCAL_ONLINE_STORE_PATH):
+        self.path = Path(path)
+        self.generation: Optional[str] = None
+        self.refresh()
+    
+    def refresh(self) -> bool:
+        """Re-open the store if a newer generation was materialized."""
+        generation = (self.path / "CURRENT").read_text().strip()
+        if generation == self.generation:
+            return False
+        
+        gen_dir = self.path / generation
+        meta = json.loads((gen_dir / "meta.json").read_text())
+        if meta['version'] != FORMAT_VERSION:
+            raise ValueError(f"Unsupported online store format: {meta['version']}")
+        
+        self.meta = meta
+        self.feature_names = [f['name'] for f in meta['features']]
+        self.account_ids = np.load(gen_dir / "account_id.npy", mmap_mode='r')
+        self.index = np.load(gen_dir / "index.npy", mmap_mode='r')
+        self.columns = {
+            name: np.load(gen_dir / "columns" / f"{name}.npy", mmap_mode='r')
+            for name in self.feature_names
+        }
+        self.generation = generation
+        logger.info(f"Opened online store generation {generation} ({meta['num_rows']} rows)")
+        return True
+    
+    def __len__(self) -> int:
+        return self.meta['num_rows']
+    
+    def lookup(self, account_ids) -> np.ndarray:
+        """Map account ids to row numbers (-1 when not found)."""
+        keys, fits = encode_ids(account_ids, self.meta['id_width'])
+        mask = np.uint64(len(self.index) - 1)
+        slots = hash_ids(keys) & mask
+        
+        rows = np.full(len(keys), -1, dtype=np.int64)
+        if self.meta['num_rows'] == 0:
+            return rows
+        pending = np.flatnonzero(fits)
+        while pending.size:
+            candidates = self.index[slots[pending]]
+            empty = candidates < 0
+            hit = ~empty & (self.account_ids[np.where(empty, 0, candidates)] == keys[pending])
+            rows[pending[hit]] = candidates[hit]
+            pending = pending[~empty & ~hit]
+            slots[pending] = (slots[pending] + np.uint64(1)) & mask
+        return rows
+    
+    def get(self, account_id: str) -> Optional[dict]:
+        """Get one account's features as a dict, or None if absent."""
+        row = self.lookup([account_id])[0]
+        if row < 0:
+            return None
+        return {'account_id': account_id, **{
+            name: column[row].item() for name, column in self.columns.items()
+        }}
+    
+    def get_many(self, account_ids, features: Optional[list[str]] = None) -> tuple[dict, np.ndarray]:
+        """
+        Vectorized lookup of many accounts.
+        
+        Returns:
+            ({feature: values array}, found mask); values for missing rows are
+            undefined and should be masked by the caller
+        """
+        rows = self.lookup(account_ids)
+        found = rows >= 0
+        safe_rows = np.where(found, rows, 0)
+        names = features or self.feature_names
+        if not len(self):
+            return {name: np.zeros(len(rows), dtype=self.columns[name].dtype) for name in names}, found
+        return {name: self.columns[name][safe_rows] for name in names}, found
+
+
+def write_online_store(
+    features: pd.DataFrame,
+    path: Union[str, Path] = LOCAL_ONLINE_STORE_PATH,
+    feature_names: Optional[list[str]] = None
+) -> Path:
+    """
+    Materialize feature rows into a new store generation.
+    
+    Args:
+        features: DataFrame with account_id and feature columns; for
+            duplicate account ids the last row wins
+        path: Store directory
+        feature_names: Columns to store (default: all but account_id)
+    
+    Returns:
+        Path of the new generation directory
+    """
+    path = Path(path)
+    features = features.drop_duplicates('account_id', keep='last')
+    feature_names = feature_names or [c for c in features.columns if c != 'account_id']
+    
+    n = len(features)
+    id_strings = features['account_id'].astype(str).to_numpy()
+    width = max(1, max((len(s.encode('utf-8')) for s in id_strings), default=1))
+    ids, _ = encode_ids(id_strings, width)
+    
+    generation = f"gen-{time.time_ns()}"
+    gen_dir = path / generation
+    (gen_dir / "columns").mkdir(parents=True)
+    
+    np.save(gen_dir / "account_id.npy", ids)
+    np.save(gen_dir / "index.npy", _build_index(ids))
+    
+    feature_meta = []
+    for name in feature_names:
+        values = features[name]
+        dtype = np.int64 if pd.api.types.is_integer_dtype(values.dtype) else np.float64
+        np.save(gen_dir / "columns" / f"{name}.npy", values.to_numpy(dtype=dtype))
+        feature_meta.append({'name': name, 'dtype': np.dtype(dtype).name})
+    
+    meta = {
+        'version': FORMAT_VERSION,
+        'num_rows': n,
+        'id_width': width,
+        'features': feature_meta,
+        'created_at': datetime.utcnow().isoformat(),
+    }
+    (gen_dir / "meta.json").write_text(json.dumps(meta, indent=2))
+    
+    current_tmp = path / "CURRENT.tmp"
+    current_tmp.write_text(generation)
+    os.replace(current_tmp, path / "CURRENT")
+    
+    _prune_generations(path)
+    logger.info(f"Materialized {n} accounts into online store {gen_dir}")
+    return gen_dir
+
+
+def materialize_from_offline(
+    start_date: datetime,
+    end_date: datetime,
+    path: Union[str, Path] = LOCAL_ONLINE_STORE_PATH,
+    account_features_path: Union[str, Path] = ACCOUNT_FEATURES_PATH,
+    payment_history_path: Union[str, Path] = PAYMENT_HISTORY_PATH
+) -> Path:
+    """
+    Load the latest feature rows in [start_date, end_date] from the offline
+    Parquet sources and write them to the local online store.
+    """
+    accounts = _latest_rows(account_features_path, start_date, end_date)
+    if Path(payment_history_path).exists():
+        payments = _latest_rows(payment_history_path, start_date, end_date)
+        accounts = accounts.drop(columns=['payment_history_score'], errors='ignore').merge(
+            payments[['account_id', 'payment_history_score', 'total_payments',
+                      'missed_payments', 'average_payment_amount']],
+            on='account_id',
+            how='left',
+        )
+        accounts = accounts.fillna({
+            'payment_history_score': 0.5,
+            'total_payments': 0,
+            'missed_payments': 0,
+            'average_payment_amount': 0.0,
+        }).astype({'total_payments': np.int64, 'missed_payments': np.int64})
+    
+    feature_names = [
+        c for c in accounts.columns
+        if c not in ('account_id', 'event_timestamp', 'created_at', 'last_payment_date')
+    ]
+    return write_online_store(accounts, path, feature_names)
+
+
+def _latest_rows(source: Union[str, Path], start_date: datetime, end_date: datetime) -> pd.DataFrame:
+    """Latest row per account_id with event_timestamp in the window."""
+    df = pd.read_parquet(source)
+    window = (df['event_timestamp'] >= start_date) & (df['event_timestamp'] <= end_date)
+    sort_columns = ['event_timestamp'] + (['created_at'] if 'created_at' in df else [])
+    return (
+        df[window]
+        .sort_values(sort_columns, kind='stable')
+        .drop_duplicates('account_id', keep='last')
+        .reset_index(drop=True)
+    )
+
+
+def _build_index(ids: np.ndarray) -> np.ndarray:
+    """Build a linear-probing hash table with load factor <= 0.5."""
+    num_slots = 8
+    while num_slots < 2 * len(ids):
+        num_slots *= 2
+    mask = np.uint64(num_slots - 1)
+    
+    index = np.full(num_slots, -1, dtype=np.int64)
+    slots = hash_ids(ids) & mask
+    pending = np.arange(len(ids))
+    while pending.size:
+        candidate_slots = slots[pending]
+        free = np.flatnonzero(index[candidate_slots] < 0)
+        # Several pending ids may want the same free slot; the first one wins
+        _, first = np.unique(candidate_slots[free], return_index=True)
+        winners = free[first]
+        index[candidate_slots[winners]] = pending[winners]
+        
+        placed = np.zeros(len(pending), dtype=bool)
+        placed[winners] = True
+        pending = pending[~placed]
+        slots[pending] = (slots[pending] + np.uint64(1)) & mask
+    return index
+
+
+def _prune_generations(path: Path):
+    """Remove all but the newest KEEP_GENERATIONS generations."""
+    generations = sorted(
+        (p for p in path.iterdir() if p.is_dir() and p.name.startswith("gen-")),
+        key=lambda p: int(p.name.split("-")[1]),
+    )
+    for old in generations[:-KEEP_GENERATIONS]:
+        shutil.rmtree(old, ignore_errors=True)
@@ -0,0 +1,249 @@
+"""
+Incremental Payment Aggregates
+Per-account running payment counters persisted between pipeline runs.
+"""
+
+import json
+import logging
+import os
+from datetime import datetime
+from pathlib import Path
+from typing import Iterable, Optional, Union
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from ml.features.streaming import DATA_DIR
+
+logger = logging.getLogger(__name__)
+
+PAYMENT_STATE_PATH = DATA_DIR / "payment_state.parquet"
+PAYMENT_HISTORY_PATH = DATA_DIR / "payment_history.parquet"
+
+_WATERMARK_KEY = b"watermark"
+_BOUNDARY_EVENTS_KEY = b"watermark_events"
+
+
+class PaymentAggregateStore:
+    """
+    Running payment aggregates keyed by account_id.
+    
+    Keeps on-time count, total count, amount sum and last payment date per
+    account in flat NumPy arrays, persisted as a small Parquet file. Each
+    update folds in only payment events at or after the stored watermark, so
+    a run costs O(new events) instead of O(all payments ever made).
+    
+    Payment ledgers are often date-only, so more events can arrive for the
+    watermark timestamp itself. The (account_id, on_time, amount) keys of
+    the events applied at the watermark are kept next to it, and an event
+    at the watermark is skipped only if its key was already applied.
+    Events before the watermark are skipped with a warning; including them
+    needs a rebuild from scratch (reset()).
+    """
+    
+    def __init__(self, path: Union[str, Path] = PAYMENT_STATE_PATH):
+        self.path = Path(path)
+        self.reset()
+        if self.path.exists():
+            self.load()
+    
+    def reset(self):
+        """Drop all aggregates and the watermark."""
+        self.watermark: Optional[np.datetime64] = None
+        # Keys of the events applied at the watermark timestamp
+        self._boundary_events: set[tuple] = set()
+        self._index = pd.Index([], dtype=object)
+        self._on_time = np.zeros(0, dtype=np.int64)
+        self._total = np.zeros(0, dtype=np.int64)
+        self._amount_sum = np.zeros(0, dtype=np.float64)
+        self._last_payment = np.zeros(0, dtype='datetime64[us]')
+    
+    def __len__(self) -> int:
+        return len(self._index)
+    
+    def update(self, events: Union[pd.DataFrame, pa.Table, Iterable[dict]]) -> int:
+        """
+        Fold new payment events into the running aggregates.
+        
+        Args:
+            events: Payment events with account_id, payment_date, on_time
+                and optionally amount
+        
+        Returns:
+            Number of events applied (late events and events already applied
+            at the watermark are skipped)
+        """
+        events = _normalize_events(events)
+        if self.watermark is not None and not events.empty:
+            dates = events['payment_date'].to_numpy(dtype='datetime64[us]')
+            late = dates < self.watermark
+            applied = dates == self.watermark
+            if applied.any():
+                applied[applied] = [key in self._boundary_events for key in _event_keys(events[applied])]
+            if late.any():
+                logger.warning(
+                    f"Skipped {int(late.sum())} payment events before the watermark {self.watermark}; "
+                    f"reset() and rebuild to include them"
+                )
+            if applied.any():
+                logger.info(f"Skipped {int(applied.sum())} payment events already applied at {self.watermark}")
+            events = events[~(late | applied)]
+        if events.empty:
+            return 0
+        
+        deltas = events.groupby('account_id', sort=False).agg(
+            on_time=('on_time', 'sum'),
+            total=('on_time', 'size'),
+            amount_sum=('amount', 'sum'),
+            last_payment=('payment_date', 'max'),
+        )
+        
+        new_ids = deltas.index.difference(self._index, sort=False)
+        if len(new_ids):
+            self._index = self._index.append(pd.Index(new_ids, dtype=object))
+            self._on_time = np.concatenate([self._on_time, np.zeros(len(new_ids), dtype=np.int64)])
+            self._total = np.concatenate([self._total, np.zeros(len(new_ids), dtype=np.int64)])
+            self._amount_sum = np.concatenate([self._amount_sum, np.zeros(len(new_ids))])
+            self._last_payment = np.concatenate([
+                self._last_payment, np.full(len(new_ids), np.datetime64('NaT'), dtype='datetime64[us]')
+            ])
+        
+        rows = self._index.get_indexer(deltas.index)
+        self._on_time[rows] += deltas['on_time'].to_numpy(dtype=np.int64)
+        self._total[rows] += deltas['total'].to_numpy(dtype=np.int64)
+        self._amount_sum[rows] += deltas['amount_sum'].to_numpy(dtype=np.float64)
+        last_payment = deltas['last_payment'].to_numpy(dtype='datetime64[us]')
+        current = self._last_payment[rows]
+        self._last_payment[rows] = np.where(np.isnat(current) | (last_payment > current), last_payment, current)
+        
+        dates = events['payment_date'].to_numpy(dtype='datetime64[us]')
+        newest = dates.max()
+        if self.watermark is None or newest > self.watermark:
+            self.watermark = newest
+            self._boundary_events = set()
+        self._boundary_events.update(_event_keys(events[dates == newest]))
+        
+        logger.info(f"Applied {len(events)} payment events for {len(deltas)} accounts")
+        return len(events)
+    
+    def counts(self, account_ids) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Look up (on_time_count, total_count) for each account id.
+        
+        Unknown accounts get zero counts.
+        """
+        ids = pd.Index(account_ids, dtype=object)
+        if not len(self):
+            return np.zeros(len(ids), dtype=np.int64), np.zeros(len(ids), dtype=np.int64)
+        
+        rows = self._index.get_indexer(ids)
+        found = rows >= 0
+        return np.where(found, self._on_time[rows], 0), np.where(found, self._total[rows], 0)
+    
+    def payment_history_score(self, account_ids) -> np.ndarray:
+        """Payment reliability score (0-1); 0.5 for accounts with no payments."""
+        on_time, total = self.counts(account_ids)
+        return np.where(total > 0, on_time / np.maximum(total, 1), 0.5)
+    
+    def to_features(self) -> pd.DataFrame:
+        """
+        Materialize the payment_history FeatureView columns.
+        
+        Returns:
+            DataFrame with account_id, payment_history_score, total_payments,
+            missed_payments, average_payment_amount and last_payment_date
+        """
+        return pd.DataFrame({
+            'account_id': self._index.to_numpy(dtype=object),
+            'payment_history_score': np.where(
+                self._total > 0, self._on_time / np.maximum(self._total, 1), 0.5
+            ),
+            'total_payments': self._total,
+            'missed_payments': self._total - self._on_time,
+            'average_payment_amount': np.where(
+                self._total > 0, self._amount_sum / np.maximum(self._total, 1), 0.0
+            ),
+            'last_payment_date': self._last_payment,
+        })
+    
+    def write_features(
+        self,
+        output_path: Union[str, Path] = PAYMENT_HISTORY_PATH,
+        event_timestamp: Optional[datetime] = None
+    ):
+        """Write the payment_history offline source for Feast."""
+        features = self.to_features()
+        features['event_timestamp'] = pd.Timestamp(event_timestamp or datetime.utcnow())
+        _atomic_write(pa.Table.from_pandas(features, preserve_index=False), Path(output_path))
+        logger.info(f"Wrote payment features for {len(features)} accounts to {output_path}")
+    
+    def load(self):
+        """Load aggregates and watermark from disk."""
+        table = pq.read_table(self.path)
+        metadata = table.schema.metadata or {}
+        self._index = pd.Index(table.column('account_id').to_pylist(), dtype=object)
+        self._on_time = table.column('on_time_count').to_numpy().astype(np.int64)
+        self._total = table.column('total_count').to_numpy().astype(np.int64)
+        self._amount_sum = table.column('amount_sum').to_numpy().astype(np.float64)
+        self._last_payment = table.column('last_payment_date').to_numpy().astype('datetime64[us]')
+        watermark = metadata.get(_WATERMARK_KEY)
+        self.watermark = np.datetime64(watermark.decode(), 'us') if watermark else None
+        self._boundary_events = {tuple(key) for key in json.loads(metadata.get(_BOUNDARY_EVENTS_KEY, b"[]"))}
+    
+    def save(self):
+        """Persist aggregates and watermark to disk."""
+        table = pa.table({
+            'account_id': pa.array(self._index.to_numpy(dtype=object), pa.string()),
+            'on_time_count': self._on_time,
+            'total_count': self._total,
+            'amount_sum': self._amount_sum,
+            'last_payment_date': pa.array(self._last_payment, pa.timestamp('us')),
+        })
+        if self.watermark is not None:
+            table = table.replace_schema_metadata({
+                _WATERMARK_KEY: str(self.watermark).encode(),
+                _BOUNDARY_EVENTS_KEY: json.dumps(sorted(self._boundary_events)).encode(),
+            })
+        _atomic_write(table, self.path)
+        logger.info(f"Saved payment state for {len(self)} accounts (watermark={self.watermark})")
+
+
+def _normalize_events(events) -> pd.DataFrame:
+    """Coerce payment events to a DataFrame with the expected dtypes."""
+    if isinstance(events, pa.Table):
+        events = events.to_pandas()
+    elif not isinstance(events, pd.DataFrame):
+        events = pd.DataFrame(list(events))
+    
+    missing = {'account_id', 'payment_date', 'on_time'} - set(events.columns)
+    if missing and not events.empty:
+        raise ValueError(f"Payment events missing columns: {sorted(missing)}")
+    if events.empty:
+        return pd.DataFrame(columns=['account_id', 'payment_date', 'on_time', 'amount'])
+    
+    return pd.DataFrame({
+        'account_id': events['account_id'].fillna('unknown').to_numpy(dtype=object),
+        'payment_date': pd.to_datetime(events['payment_date']).to_numpy(dtype='datetime64[us]'),
+        'on_time': events['on_time'].fillna(False).to_numpy(dtype=bool).astype(np.int64),
+        'amount': (
+            pd.to_numeric(events['amount']).fillna(0).to_numpy(dtype=np.float64)
+            if 'amount' in events else np.zeros(len(events))
+        ),
+    })
+
+
+def _event_keys(events: pd.DataFrame) -> list[tuple]:
+    """(account_id, on_time, amount) keys identifying normalized events within one timestamp."""
+    return list(zip(
+        events['account_id'].tolist(), events['on_time'].tolist(), events['amount'].tolist()
+    ))
+
+
+def _atomic_write(table: pa.Table, path: Path):
+    """Write a Parquet file via a temp file so readers never see a partial write."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(path.name + ".tmp")
+    pq.write_table(table, tmp_path)
+    os.replace(tmp_path, path)
@@ -5,9 +5,22 @@ Generates feature vectors from raw data.
 
 import logging
 from datetime import datetime, timedelta
-from typing import Optional
+from pathlib import Path
+from typing import Iterator, Optional, Union
 
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from ml.features.payment_state import PaymentAggregateStore
+from ml.features.streaming import (
+    ACCOUNT_FEATURES_PATH,
+    DEFAULT_CHUNK_SIZE,
+    ParquetFeatureSink,
+    RecordSource,
+    iter_record_chunks,
+)
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
@@ -28,14 +41,33 @@ class FeaturePipeline:
         'account_age_months': int,
     }
     
-    def __init__(self, reference_date: Optional[datetime] = None):
+    OUTPUT_COLUMNS = ['account_id'] + list(FEATURE_SCHEMA)
+    
+    # Inclusive (min, max) bounds; None means unbounded
+    FEATURE_RANGES = {
+        'payment_history_score': (0.0, 1.0),
+        'outstanding_balance': (0.0, None),
+    }
+    
+    # Columns that may accompany features without counting as schema drift
+    METADATA_COLUMNS = {'account_id', 'event_timestamp', 'created_at'}
+    
+    def __init__(
+        self,
+        reference_date: Optional[datetime] = None,
+        payment_state: Optional[PaymentAggregateStore] = None
+    ):
         """
         Initialize pipeline.
         
         Args:
             reference_date: Date to compute features relative to. Defaults to today.
+            payment_state: Incremental payment aggregates. When set,
+                payment_history_score comes from the running counters instead
+                of walking each record's payment_history list.
         """
         self.reference_date = reference_date or datetime.utcnow()
+        self.payment_state = payment_state
     
     def compute_days_past_due(self, due_date: datetime) -> int:
         """Compute days since payment was due."""
@@ -83,8 +115,10 @@ class FeaturePipeline:
                 record.get('due_date', self.reference_date)
             ),
             'outstanding_balance': float(record.get('outstanding_balance', 0)),
-            'payment_history_score': self.compute_payment_history_score(
-                record.get('payment_history', [])
+            'payment_history_score': (
+                float(self.payment_state.payment_history_score([record.get('account_id', 'unknown')])[0])
+                if self.payment_state is not None
+                else self.compute_payment_history_score(record.get('payment_history', []))
             ),
             'contact_attempts': int(record.get('contact_attempts', 0)),
             'last_payment_days_ago': self.compute_last_payment_days(
@@ -97,18 +131,190 @@ class FeaturePipeline:
         
         return features
     
-    def transform_batch(self, records: list[dict]) -> pd.DataFrame:
+    def transform_batch(self, records: list[dict], vectorized: bool = True) -> pd.DataFrame:
         """
         Transform multiple records into feature DataFrame.
         
         Args:
             records: List of raw account data
+            vectorized: Use the columnar engine instead of one
+                transform_single call per record
             
         Returns:
             DataFrame with feature columns
         """
-        features = [self.transform_single(r) for r in records]
-        return pd.DataFrame(features)
+        if not vectorized:
+            features = [self.transform_single(r) for r in records]
+            return pd.DataFrame(features)
+        
+        return self.transform_columns(pd.DataFrame(records))
+    
+    def transform_columns(self, data: Union[pd.DataFrame, pa.Table, dict]) -> pd.DataFrame:
+        """
+        Columnar feature engine.
+        
+        Computes every FEATURE_SCHEMA feature with NumPy datetime64 arithmetic
+        in a single pass. Produces the same values and dtypes as running
+        transform_single on each row; missing columns and nulls fall back to
+        the same defaults the per-record path uses.
+        
+        Args:
+            data: Raw account columns as a pandas DataFrame, Arrow Table or
+                dict of column name -> array-like
+            
+        Returns:
+            DataFrame with account_id and feature columns
+        """
+        if isinstance(data, pa.Table):
+            if self.payment_state is None:
+                on_time, total = self._payment_counts_arrow(data)
+            columns = data.drop_columns(
+                [c for c in ['payment_history'] if c in data.column_names]
+            ).to_pandas()
+        else:
+            columns = data if isinstance(data, pd.DataFrame) else pd.DataFrame(data)
+            if self.payment_state is None:
+                on_time, total = self._payment_counts(columns)
+        
+        n = len(columns)
+        if 'account_id' in columns:
+            account_id = columns['account_id'].fillna('unknown').to_numpy(dtype=object)
+        else:
+            account_id = np.full(n, 'unknown', dtype=object)
+        if self.payment_state is not None:
+            on_time, total = self.payment_state.counts(account_id)
+        
+        ref = np.datetime64(self.reference_date, 'us')
+        one_day = np.timedelta64(1, 'D')
+        
+        # days_past_due: 0 when not yet due, otherwise whole days overdue
+        due = self._date_column(columns, 'due_date', n)
+        due = np.where(np.isnat(due), ref, due)
+        days_past_due = np.where(due >= ref, 0, (ref - due) // one_day)
+        
+        # last_payment_days_ago: 365 for never-paid accounts
+        last_payment = self._date_column(columns, 'last_payment_date', n)
+        never_paid = np.isnat(last_payment)
+        last_payment_days = np.where(
+            never_paid, 365, np.maximum(0, (ref - np.where(never_paid, ref, last_payment)) // one_day)
+        )
+        
+        # account_age_months: truncated 30-day months, at least 1
+        open_date = self._date_column(columns, 'open_date', n)
+        open_date = np.where(np.isnat(open_date), ref - np.timedelta64(365, 'D'), open_date)
+        account_age = np.maximum(1, np.trunc(((ref - open_date) // one_day) / 30).astype(np.int64))
+        
+        # payment_history_score: 0.5 for accounts without payments
+        payment_score = np.where(total > 0, on_time / np.maximum(total, 1), 0.5)
+        
+        return pd.DataFrame({
+            'account_id': account_id,
+            'days_past_due': days_past_due.astype(np.int64),
+            'outstanding_balance': self._numeric_column(columns, 'outstanding_balance', n).astype(np.float64),
+            'payment_history_score': payment_score.astype(np.float64),
+            'contact_attempts': self._numeric_column(columns, 'contact_attempts', n).astype(np.int64),
+            'last_payment_days_ago': last_payment_days.astype(np.int64),
+            'account_age_months': account_age,
+        }, columns=self.OUTPUT_COLUMNS)
+    
+    def transform_stream(
+        self,
+        source: RecordSource,
+        chunk_size: int = DEFAULT_CHUNK_SIZE
+    ) -> Iterator[pd.DataFrame]:
+        """
+        Transform raw records chunk by chunk.
+        
+        Args:
+            source: Parquet/JSONL path or iterable of record dicts
+            chunk_size: Records per chunk
+            
+        Yields:
+            One feature DataFrame per input chunk
+        """
+        for chunk in iter_record_chunks(source, chunk_size):
+            yield self.transform_columns(chunk)
+    
+    def write_parquet(
+        self,
+        source: RecordSource,
+        output_path: Union[str, Path] = ACCOUNT_FEATURES_PATH,
+        chunk_size: int = DEFAULT_CHUNK_SIZE
+    ) -> int:
+        """
+        Stream records through the pipeline into a Parquet feature file.
+        
+        Peak memory is bounded by chunk_size, not by the size of the input.
+        The default output is the offline source behind account_features.
+        
+        Returns:
+            Number of feature rows written
+        """
+        with ParquetFeatureSink(output_path, self.FEATURE_SCHEMA, self.reference_date) as sink:
+            for features in self.transform_stream(source, chunk_size):
+                sink.write(features)
+        return sink.rows_written
+    
+    @staticmethod
+    def _date_column(columns: pd.DataFrame, name: str, n: int) -> np.ndarray:
+        """Return a column as naive datetime64[us], NaT where missing."""
+        if name not in columns:
+            return np.full(n, np.datetime64('NaT'), dtype='datetime64[us]')
+        
+        values = columns[name]
+        if not pd.api.types.is_datetime64_any_dtype(values):
+            values = pd.to_datetime(values)
+        if values.dt.tz is not None:
+            values = values.dt.tz_convert(None)
+        return values.to_numpy(dtype='datetime64[us]')
+    
+    @staticmethod
+    def _numeric_column(columns: pd.DataFrame, name: str, n: int) -> np.ndarray:
+        """Return a numeric column with missing values replaced by 0."""
+        if name not in columns:
+            return np.zeros(n, dtype=np.float64)
+        return pd.to_numeric(columns[name]).fillna(0).to_numpy(dtype=np.float64)
+    
+    @staticmethod
+    def _payment_counts(columns: pd.DataFrame) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Count on-time and total payments per row from a payment_history column.
+        
+        The nested lists are flattened once and reduced with cumulative sums,
+        so there is no per-row Python call.
+        """
+        n = len(columns)
+        if 'payment_history' not in columns:
+            return np.zeros(n, dtype=np.int64), np.zeros(n, dtype=np.int64)
+        
+        histories = [
+            h if isinstance(h, (list, tuple, np.ndarray)) else ()
+            for h in columns['payment_history'].to_numpy(dtype=object)
+        ]
+        total = np.fromiter(map(len, histories), dtype=np.int64, count=n)
+        flags = np.fromiter(
+            (bool(p.get('on_time', False)) for h in histories for p in h),
+            dtype=np.int64,
+            count=int(total.sum()),
+        )
+        return _segment_sums(flags, total), total
+    
+    @staticmethod
+    def _payment_counts_arrow(table: pa.Table) -> tuple[np.ndarray, np.ndarray]:
+        """Count on-time and total payments from an Arrow list<struct> column."""
+        n = table.num_rows
+        if 'payment_history' not in table.column_names:
+            return np.zeros(n, dtype=np.int64), np.zeros(n, dtype=np.int64)
+        
+        histories = table.column('payment_history').combine_chunks()
+        total = pc.fill_null(pc.list_value_length(histories), 0).to_numpy().astype(np.int64)
+        payments = pc.list_flatten(histories)
+        if pa.types.is_struct(payments.type) and payments.type.get_field_index('on_time') >= 0:
+            on_time = pc.fill_null(pc.struct_field(payments, 'on_time'), False)
+            flags = np.asarray(on_time.to_numpy(zero_copy_only=False), dtype=np.int64)
+        else:
+            flags = np.zeros(len(payments), dtype=np.int64)
+        return _segment_sums(flags, total), total
     
     def validate_features(self, features: dict) -> list[str]:
         """
@@ -133,6 +339,94 @@ class FeaturePipeline:
             errors.append("outstanding_balance cannot be negative")
         
         return errors
+    
+    def validate_batch(self, df: pd.DataFrame, max_rows: int = 1000) -> dict:
+        """
+        Validate a feature DataFrame with vectorized column checks.
+        
+        Checks every FEATURE_SCHEMA column for presence, dtype, nulls and
+        FEATURE_RANGES bounds, and reports columns outside the schema.
+        
+        Args:
+            df: Feature DataFrame (e.g. output of transform_batch)
+            max_rows: Cap on the number of offending row labels returned
+            
+        Returns:
+            Report dict with per-column violation counts and the index
+            labels of offending rows
+        """
+        invalid = np.zeros(len(df), dtype=bool)
+        columns = {}
+        
+        for name, expected_type in self.FEATURE_SCHEMA.items():
+            if name not in df:
+                continue
+            
+            values = df[name]
+            nulls = values.isna().to_numpy()
+            type_errors = ~nulls & ~_type_mask(values, expected_type)
+            
+            range_errors = np.zeros(len(df), dtype=bool)
+            if name in self.FEATURE_RANGES:
+                low, high = self.FEATURE_RANGES[name]
+                numeric = pd.to_numeric(values.where(~type_errors), errors='coerce').to_numpy(
+                    dtype=np.float64, na_value=np.nan
+                )
+                if low is not None:
+                    range_errors |= numeric < low
+                if high is not None:
+                    range_errors |= numeric > high
+            
+            column_invalid = nulls | type_errors | range_errors
+            if column_invalid.any():
+                columns[name] = {
+                    'dtype': str(values.dtype),
+                    'nulls': int(nulls.sum()),
+                    'type_errors': int(type_errors.sum()),
+                    'range_errors': int(range_errors.sum()),
+                }
+                invalid |= column_invalid
+        
+        missing_columns = [name for name in self.FEATURE_SCHEMA if name not in df]
+        unexpected_columns = [
+            name for name in df.columns
+            if name not in self.FEATURE_SCHEMA and name not in self.METADATA_COLUMNS
+        ]
+        invalid_rows = df.index[invalid]
+        
+        return {
+            'valid': not (columns or missing_columns or unexpected_columns),
+            'rows_checked': len(df),
+            'invalid_row_count': int(invalid.sum()),
+            'invalid_rows': invalid_rows[:max_rows].tolist(),
+            'columns': columns,
+            'missing_columns': missing_columns,
+            'unexpected_columns': unexpected_columns,
+        }
+
+
+def _type_mask(values: pd.Series, expected_type: type) -> np.ndarray:
+    """Elementwise isinstance check, vectorized for typed columns."""
+    dtype = values.dtype
+    if expected_type is int and pd.api.types.is_integer_dtype(dtype):
+        return np.ones(len(values), dtype=bool)
+    if expected_type is float and pd.api.types.is_float_dtype(dtype):
+        return np.ones(len(values), dtype=bool)
+    if pd.api.types.is_object_dtype(dtype):
+        # Mixed Python objects still need a per-value check
+        return np.fromiter(
+            (isinstance(v, expected_type) and not isinstance(v, bool) for v in values),
+            dtype=bool,
+            count=len(values),
+        )
+    return np.zeros(len(values), dtype=bool)
+
+
+def _segment_sums(values: np.ndarray, lengths: np.ndarray) -> np.ndarray:
+    """Sum consecutive segments of `values` whose sizes are given by `lengths`."""
+    offsets = np.concatenate(([0], np.cumsum(lengths)))
+    cumulative = np.concatenate(([0], np.cumsum(values)))
+    return cumulative[offsets[1:]] - cumulative[offsets[:-1]]
 
 
 def main():
@@ -0,0 +1,153 @@
+"""
+Streaming Feature I/O
+Chunked readers for raw account records and a Parquet sink for feature rows.
+"""
+
+import json
+import logging
+import os
+from datetime import datetime
+from itertools import islice
+from pathlib import Path
+from typing import Iterable, Iterator, Union
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+logger = logging.getLogger(__name__)
+
+DATA_DIR = Path(__file__).parent / "data"
+ACCOUNT_FEATURES_PATH = DATA_DIR / "account_features.parquet"
+
+DEFAULT_CHUNK_SIZE = 50_000
+
+RecordSource = Union[str, Path, Iterable[dict]]
+
+
+def iter_record_chunks(
+    source: RecordSource,
+    chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> Iterator[Union[pa.Table, pd.DataFrame]]:
+    """
+    Read raw account records in fixed-size chunks.
+    
+    Args:
+        source: Path to a .parquet or .jsonl file, or an iterable of record dicts
+        chunk_size: Maximum records per chunk
+    
+    Yields:
+        Arrow Tables (Parquet input) or DataFrames (JSONL / iterable input)
+    """
+    if chunk_size <= 0:
+        raise ValueError(f"chunk_size must be positive, got {chunk_size}")
+    
+    if isinstance(source, (str, Path)):
+        path = Path(source)
+        if path.suffix == ".parquet":
+            yield from _iter_parquet(path, chunk_size)
+        elif path.suffix in (".jsonl", ".json"):
+            yield from _iter_jsonl(path, chunk_size)
+        else:
+            raise ValueError(f"Unsupported record source: {path}")
+        return
+    
+    iterator = iter(source)
+    while chunk := list(islice(iterator, chunk_size)):
+        yield pd.DataFrame(chunk)
+
+
+def _iter_parquet(path: Path, chunk_size: int) -> Iterator[pa.Table]:
+    """Yield Parquet row batches without loading the whole file."""
+    parquet_file = pq.ParquetFile(path)
+    for batch in parquet_file.iter_batches(batch_size=chunk_size):
+        yield pa.Table.from_batches([batch])
+
+
+def _iter_jsonl(path: Path, chunk_size: int) -> Iterator[pd.DataFrame]:
+    """Yield JSON-lines records as DataFrames (dates stay ISO strings)."""
+    with open(path) as f:
+        records = (json.loads(line) for line in f if line.strip())
+        while chunk := list(islice(records, chunk_size)):
+            yield pd.DataFrame(chunk)
+
+
+class ParquetFeatureSink:
+    """
+    Incremental Parquet writer for feature DataFrames.
+    
+    Each written chunk becomes one row group, so memory is bounded by the
+    chunk size rather than the total output. Rows are stamped with the
+    event_timestamp / created_at columns the Feast FileSource expects, and
+    the file is moved into place only when the sink closes cleanly.
+    """
+    
+    def __init__(self, path: Union[str, Path], schema: dict, event_timestamp: datetime):
+        """
+        Args:
+            path: Output Parquet path
+            schema: Feature name -> Python type (FeaturePipeline.FEATURE_SCHEMA)
+            event_timestamp: Timestamp the features are valid at
+        """
+        self.path = Path(path)
+        self.event_timestamp = event_timestamp
+        self.created_at = datetime.utcnow()
+        self.rows_written = 0
+        self.arrow_schema = pa.schema(
+            [pa.field("account_id", pa.string())]
+            + [pa.field(name, _ARROW_TYPES[dtype]) for name, dtype in schema.items()]
+            + [
+                pa.field("event_timestamp", pa.timestamp("us")),
+                pa.field("created_at", pa.timestamp("us")),
+            ]
+        )
+        self._tmp_path = self.path.with_name(self.path.name + ".tmp")
+        self._writer = None
+    
+    def write(self, features: pd.DataFrame):
+        """Append one chunk of feature rows."""
+        if self._writer is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._writer = pq.ParquetWriter(self._tmp_path, self.arrow_schema)
+        
+        n = len(features)
+        columns = {name: features[name].to_numpy() for name in self.arrow_schema.names[:-2]}
+        columns["account_id"] = features["account_id"].astype(str).to_numpy()
+        columns["event_timestamp"] = pa.repeat(pa.scalar(self.event_timestamp, pa.timestamp("us")), n)
+        columns["created_at"] = pa.repeat(pa.scalar(self.created_at, pa.timestamp("us")), n)
+        self._writer.write_table(pa.table(columns, schema=self.arrow_schema))
+        self.rows_written += n
+    
+    def close(self):
+        """Finalize the file and move it into place."""
+        if self._writer is None:
+            # Nothing was written; still produce a valid (empty) file
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            pq.write_table(self.arrow_schema.empty_table(), self._tmp_path)
+        else:
+            self._writer.close()
+        os.replace(self._tmp_path, self.path)
+        logger.info(f"Wrote {self.rows_written} feature rows to {self.path}")
+    
+    def abort(self):
+        """Discard a partially written file."""
+        if self._writer is not None:
+            self._writer.close()
+        self._tmp_path.unlink(missing_ok=True)
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+        return False
+
+
+_ARROW_TYPES = {
+    int: pa.int64(),
+    float: pa.float64(),
+    str: pa.string(),
+}
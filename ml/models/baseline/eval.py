@@ -1,19 +1,28 @@
 """
 Baseline Model Evaluation Script
 Evaluates trained model on test data.
+
+Predictions are scored in chunks into a streaming confusion matrix, so
+evaluation memory does not grow with the number of rows. Every metric is
+a function of the confusion matrix, which makes the bootstrap cheap:
+resampling n rows with replacement is the same as drawing the confusion
+cells from a multinomial, so each replicate costs O(classes^2) rather
+than O(rows).
+
+Usage: python -m ml.models.baseline.eval --n-samples 5000000 --baseline previous/evaluation.json
 """
 
+import argparse
 import json
 import logging
+import time
+from datetime import datetime
 from pathlib import Path
+from typing import Iterable, Iterator
 
 import numpy as np
 import pandas as pd
 import xgboost as xgb
-from sklearn.metrics import (
-    accuracy_score, f1_score, precision_score, recall_score,
-    confusion_matrix, classification_report
-)
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
@@ -21,6 +30,8 @@ logger = logging.getLogger(__name__)
 SCRIPT_DIR = Path(__file__).parent
 ARTIFACTS_DIR = SCRIPT_DIR / "artifacts"
 
+WEIGHTED_METRICS = ['accuracy', 'f1_weighted', 'precision_weighted', 'recall_weighted']
+
 
 def load_model():
     """Load trained model and metadata."""
@@ -41,86 +52,379 @@ def load_model():
 
 def generate_test_data(n_samples: int = 1000, seed: int = 123) -> pd.DataFrame:
     """Generate test data with different seed than training."""
-    np.random.seed(seed)
-    
-    data = {
-        'days_past_due': np.random.exponential(30, n_samples).astype(int).clip(0, 365),
-        'outstanding_balance': np.random.exponential(1000, n_samples).clip(100, 50000),
-        'payment_history_score': np.random.beta(5, 2, n_samples),
-        'contact_attempts': np.random.poisson(3, n_samples).clip(0, 20),
-        'last_payment_days_ago': np.random.exponential(45, n_samples).astype(int).clip(0, 365),
-        'account_age_months': np.random.exponential(24, n_samples).astype(int).clip(1, 120),
+    from ml.models.baseline.train import generate_synthetic_data
+    
+    return generate_synthetic_data(n_samples, seed)
+
+
+def iter_test_data(n_samples: int, chunk_size: int = 500_000, seed: int = 123) -> Iterator[pd.DataFrame]:
+    """Generate test data in chunks of at most chunk_size rows (chunk i uses seed + i)."""
+    for i, start in enumerate(range(0, n_samples, chunk_size)):
+        yield generate_test_data(min(chunk_size, n_samples - start), seed + i)
+
+
+class StreamingConfusionMatrix:
+    """
+    Confusion counts accumulated chunk by chunk.
+    
+    Rows are true labels and columns predicted labels, both in
+    label_classes order.
+    """
+    
+    def __init__(self, label_classes: list[str]):
+        self.label_classes = list(label_classes)
+        self.counts = np.zeros((len(label_classes), len(label_classes)), dtype=np.int64)
+    
+    @property
+    def n(self) -> int:
+        return int(self.counts.sum())
+    
+    def label_indices(self, labels) -> np.ndarray:
+        """Class index of each label; unknown labels raise ValueError."""
+        codes = pd.Categorical(labels, categories=self.label_classes).codes
+        if (codes < 0).any():
+            unknown = sorted(set(np.asarray(labels)[codes < 0]))
+            raise ValueError(f"Labels not in label_classes: {unknown}")
+        return codes.astype(np.int64)
+    
+    def update(self, y_true_idx: np.ndarray, y_pred_idx: np.ndarray):
+        """
+        Add one chunk.
+        
+        Args:
+            y_true_idx: True class indices (see label_indices)
+            y_pred_idx: Predicted class indices
+        """
+        k = len(self.label_classes)
+        cells = np.asarray(y_true_idx, dtype=np.int64) * k + np.asarray(y_pred_idx, dtype=np.int64)
+        self.counts += np.bincount(cells, minlength=k * k).reshape(k, k)
+    
+    def merge(self, other: 'StreamingConfusionMatrix'):
+        """Add counts accumulated elsewhere (e.g. another process)."""
+        if other.label_classes != self.label_classes:
+            raise ValueError("Cannot merge confusion matrices over different label classes")
+        self.counts += other.counts
+
+
+def metrics_from_confusion(counts: np.ndarray) -> dict:
+    """
+    Accuracy and per-class / support-weighted precision, recall and F1.
+    
+    Matches sklearn with zero_division=0. Leading axes are batch axes, so
+    a stack of bootstrap matrices (B, k, k) is scored in one pass.
+    
+    Args:
+        counts: Confusion counts (..., k, k), true labels on rows
+    
+    Returns:
+        Dict of arrays: accuracy, *_weighted (...,) and precision, recall,
+        f1, support (..., k)
+    """
+    counts = np.asarray(counts, dtype=np.float64)
+    tp = np.diagonal(counts, axis1=-2, axis2=-1)
+    support = counts.sum(axis=-1)
+    predicted = counts.sum(axis=-2)
+    n = support.sum(axis=-1)
+    
+    with np.errstate(divide='ignore', invalid='ignore'):
+        precision = np.where(predicted > 0, tp / predicted, 0.0)
+        recall = np.where(support > 0, tp / support, 0.0)
+        f1 = np.where(support + predicted > 0, 2 * tp / (support + predicted), 0.0)
+        weights = np.where(n[..., None] > 0, support / n[..., None], 0.0)
+        accuracy = np.where(n > 0, tp.sum(axis=-1) / n, 0.0)
+    
+    return {
+        'accuracy': accuracy,
+        'f1_weighted': (f1 * weights).sum(axis=-1),
+        'precision_weighted': (precision * weights).sum(axis=-1),
+        'recall_weighted': (recall * weights).sum(axis=-1),
+        'precision': precision,
+        'recall': recall,
+        'f1': f1,
+        'support': support,
     }
+
+
+def bootstrap_intervals(
+    counts: np.ndarray,
+    n_bootstrap: int = 1000,
+    confidence: float = 0.95,
+    seed: int = 0
+) -> dict:
+    """
+    Percentile bootstrap intervals of the weighted metrics.
     
-    df = pd.DataFrame(data)
+    Each replicate resamples the n evaluated rows with replacement, drawn
+    as one multinomial over the confusion cells; all replicates are drawn
+    and scored as a single (n_bootstrap, ..., k, k) array.
     
-    # Generate labels
-    labels = []
-    for _, row in df.iterrows():
-        if row['days_past_due'] > 90 and row['payment_history_score'] < 0.3:
-            labels.append('write_off')
-        elif row['days_past_due'] > 60 or row['outstanding_balance'] > 5000:
-            labels.append('escalate')
-        elif row['days_past_due'] < 30 and row['payment_history_score'] > 0.7:
-            labels.append('recover')
-        else:
-            labels.append('monitor')
+    Args:
+        counts: Confusion counts (k, k), or a stack (..., k, k) such as one
+            matrix per segment, resampled independently
     
-    df['label'] = labels
+    Returns:
+        {'confidence', 'n_bootstrap', metric: [low, high], ...}; for a
+        stack each metric holds one [low, high] per matrix
+    """
+    counts = np.asarray(counts, dtype=np.int64)
+    batch_shape, k = counts.shape[:-2], counts.shape[-1]
+    cells = counts.reshape(batch_shape + (k * k,))
+    n = cells.sum(axis=-1)
+    pvals = cells / np.maximum(n, 1)[..., None]
     
-    return df
+    rng = np.random.default_rng(seed)
+    samples = rng.multinomial(n, pvals, size=(n_bootstrap,) + batch_shape)
+    replicates = metrics_from_confusion(samples.reshape((n_bootstrap,) + counts.shape))
+    
+    tail = (1 - confidence) / 2 * 100
+    intervals = {'confidence': confidence, 'n_bootstrap': n_bootstrap}
+    for name in WEIGHTED_METRICS:
+        bounds = np.percentile(replicates[name], [tail, 100 - tail], axis=0)
+        intervals[name] = np.moveaxis(bounds, 0, -1).tolist()
+    return intervals
 
 
-def evaluate(model, metadata: dict, df: pd.DataFrame) -> dict:
-    """Run evaluation and return metrics."""
-    feature_names = metadata['feature_names']
-    label_classes = metadata['label_classes']
+# =============================================================================
+# Sliced evaluation
+# =============================================================================
+
+def slice_segments(spec: dict) -> list[str]:
+    """
+    Segment labels of a slice spec.
+    
+    A spec is {'name', 'feature', 'edges'} (as in config.yaml evaluation.slices)
+    with optional 'labels'. Edges are ascending cut points: [30, 60] gives
+    "<30", "30-60", ">=60", plus "missing" for NaN values.
+    """
+    edges = spec['edges']
+    labels = spec.get('labels') or (
+        [f"<{edges[0]:g}"]
+        + [f"{low:g}-{high:g}" for low, high in zip(edges, edges[1:])]
+        + [f">={edges[-1]:g}"]
+    )
+    if len(labels) != len(edges) + 1:
+        raise ValueError(f"Slice {spec['name']} needs {len(edges) + 1} labels, got {len(labels)}")
+    return list(labels) + ['missing']
+
+
+def slice_codes(spec: dict, values) -> np.ndarray:
+    """Segment index of each value (the last index is "missing")."""
+    values = np.asarray(values, dtype=np.float64)
+    codes = np.searchsorted(np.asarray(spec['edges'], dtype=np.float64), values, side='right')
+    codes[np.isnan(values)] = len(spec['edges']) + 1
+    return codes
+
+
+class SlicedConfusion:
+    """
+    One confusion matrix per segment of every slice, in a single pass.
+    
+    Each chunk's (segment, true, predicted) triples are encoded as one
+    integer and counted with a single bincount per slice, so adding a
+    slice never re-runs prediction or evaluation.
+    """
+    
+    def __init__(self, slices: list[dict], label_classes: list[str]):
+        self.slices = slices
+        self.label_classes = list(label_classes)
+        self.segments = {spec['name']: slice_segments(spec) for spec in slices}
+        k = len(label_classes)
+        self.counts = {
+            name: np.zeros((len(segments), k, k), dtype=np.int64)
+            for name, segments in self.segments.items()
+        }
     
-    X = df[feature_names]
-    y_true = df['label']
+    def update(self, df: pd.DataFrame, y_true_idx: np.ndarray, y_pred_idx: np.ndarray):
+        """Add one chunk, given its class indices (StreamingConfusionMatrix.label_indices)."""
+        k = len(self.label_classes)
+        cells = np.asarray(y_true_idx, dtype=np.int64) * k + np.asarray(y_pred_idx, dtype=np.int64)
+        for spec in self.slices:
+            counts = self.counts[spec['name']]
+            codes = slice_codes(spec, df[spec['feature']])
+            counts += np.bincount(codes * k * k + cells, minlength=counts.size).reshape(counts.shape)
     
-    # labels to indices conversion unused
+    def report(self, n_bootstrap: int = 1000, confidence: float = 0.95, seed: int = 0) -> list[dict]:
+        """
+        One row per non-empty segment: slice, feature, segment, n, the
+        weighted metrics and (with n_bootstrap) their interval bounds.
+        """
+        by_feature = {spec['name']: spec['feature'] for spec in self.slices}
+        rows = []
+        for name, counts in self.counts.items():
+            scores = metrics_from_confusion(counts)
+            intervals = bootstrap_intervals(counts, n_bootstrap, confidence, seed) if n_bootstrap else None
+            for i, segment in enumerate(self.segments[name]):
+                n = int(counts[i].sum())
+                if n == 0:
+                    continue
+                row = {'slice': name, 'feature': by_feature[name], 'segment': segment, 'n': n}
+                for metric in WEIGHTED_METRICS:
+                    row[metric] = float(scores[metric][i])
+                    if intervals:
+                        row[f'{metric}_low'], row[f'{metric}_high'] = intervals[metric][i]
+                rows.append(row)
+        return rows
 
 
+def save_slice_report(rows: list[dict], output_dir: Path, model_version: str = None) -> dict:
+    """
+    Write the slice rows as slice_metrics.json and slice_metrics.parquet.
     
-    # Predict
-    dtest = xgb.DMatrix(X, feature_names=feature_names)
-    y_pred_proba = model.predict(dtest)
-    y_pred_idx = y_pred_proba.argmax(axis=1)
-    y_pred = [label_classes[idx] for idx in y_pred_idx]
+    Both hold the same flat rows (plus model_version and evaluated_at), the
+    format PerformanceMonitor.ingest_slice_report reads.
     
-    # Metrics
-    metrics = {
-        'accuracy': float(accuracy_score(y_true, y_pred)),
-        'f1_weighted': float(f1_score(y_true, y_pred, average='weighted')),
-        'precision_weighted': float(precision_score(y_true, y_pred, average='weighted')),
-        'recall_weighted': float(recall_score(y_true, y_pred, average='weighted')),
-    }
+    Returns:
+        {'json': path, 'parquet': path}
+    """
+    evaluated_at = datetime.utcnow().isoformat()
+    rows = [{'model_version': model_version, 'evaluated_at': evaluated_at, **row} for row in rows]
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    
+    json_path = output_dir / "slice_metrics.json"
+    with open(json_path, 'w') as f:
+        json.dump(rows, f, indent=2)
+    
+    parquet_path = output_dir / "slice_metrics.parquet"
+    pd.DataFrame(rows).to_parquet(parquet_path, index=False)
+    
+    return {'json': str(json_path), 'parquet': str(parquet_path)}
+
+
+def predict_indices(model, feature_names: list[str], df: pd.DataFrame) -> np.ndarray:
+    """Predicted class index per row."""
+    proba = model.inplace_predict(df[feature_names].to_numpy(dtype=np.float32))
+    return proba.argmax(axis=1)
+
+
+def evaluate_chunks(
+    model,
+    metadata: dict,
+    chunks: Iterable[pd.DataFrame],
+    n_bootstrap: int = 1000,
+    confidence: float = 0.95,
+    seed: int = 0,
+    slices: list[dict] = None
+) -> dict:
+    """
+    Evaluate over a stream of labelled chunks.
+    
+    Only the confusion matrices are kept between chunks.
+    
+    Args:
+        model: Trained booster
+        metadata: Model metadata (feature_names, label_classes)
+        chunks: DataFrames with the model features and a 'label' column
+        n_bootstrap: Bootstrap replicates for the confidence intervals (0 to skip)
+        confidence: Interval coverage
+        seed: Bootstrap seed
+        slices: Slice specs; adds a 'slices' list of per-segment rows
+    """
+    feature_names = metadata['feature_names']
+    label_classes = metadata['label_classes']
+    
+    confusion = StreamingConfusionMatrix(label_classes)
+    sliced = SlicedConfusion(slices, label_classes) if slices else None
+    for chunk in chunks:
+        y_true_idx = confusion.label_indices(chunk['label'])
+        y_pred_idx = predict_indices(model, feature_names, chunk)
+        confusion.update(y_true_idx, y_pred_idx)
+        if sliced:
+            sliced.update(chunk, y_true_idx, y_pred_idx)
+    
+    scores = metrics_from_confusion(confusion.counts)
+    metrics = {name: float(scores[name]) for name in WEIGHTED_METRICS}
     
     # Per-class metrics
-    report = classification_report(y_true, y_pred, output_dict=True)
     metrics['per_class'] = {
         label: {
-            'precision': report[label]['precision'],
-            'recall': report[label]['recall'],
-            'f1': report[label]['f1-score'],
-            'support': report[label]['support']
+            'precision': float(scores['precision'][i]),
+            'recall': float(scores['recall'][i]),
+            'f1': float(scores['f1'][i]),
+            'support': int(scores['support'][i])
         }
-        for label in label_classes
+        for i, label in enumerate(label_classes)
     }
     
     # Confusion matrix
-    cm = confusion_matrix(y_true, y_pred, labels=label_classes)
     metrics['confusion_matrix'] = {
         'labels': label_classes,
-        'matrix': cm.tolist()
+        'matrix': confusion.counts.tolist()
     }
+    metrics['n_samples'] = confusion.n
+    
+    if n_bootstrap:
+        metrics['confidence_intervals'] = bootstrap_intervals(confusion.counts, n_bootstrap, confidence, seed)
+    
+    if sliced:
+        metrics['slices'] = sliced.report(n_bootstrap, confidence, seed)
     
     return metrics
 
 
-def main():
+def evaluate(model, metadata: dict, df: pd.DataFrame, n_bootstrap: int = 1000, slices: list[dict] = None) -> dict:
+    """Run evaluation and return metrics."""
+    return evaluate_chunks(model, metadata, [df], n_bootstrap=n_bootstrap, slices=slices)
+
+
+def regression_gate(
+    metrics: dict,
+    baseline: dict,
+    metric_names: Iterable[str] = ('accuracy', 'f1_weighted'),
+    max_drop: float = 0.01
+) -> dict:
+    """
+    Compare an evaluation against baseline metrics.
+    
+    A metric regresses only when the whole confidence interval is more
+    than max_drop below the baseline, so sampling noise alone never fails
+    the gate. Without intervals the point estimate is compared.
+    
+    Args:
+        metrics: Result of evaluate / evaluate_chunks
+        baseline: Baseline metric values (e.g. a previous evaluation.json)
+        metric_names: Metrics to check
+        max_drop: Tolerated absolute drop
+    
+    Returns:
+        {'passed': bool, 'checks': {metric: {...}}}
+    """
+    intervals = metrics.get('confidence_intervals', {})
+    checks = {}
+    for name in metric_names:
+        if name not in baseline:
+            continue
+        value = metrics[name]
+        low, high = intervals.get(name, [value, value])
+        checks[name] = {
+            'baseline': float(baseline[name]),
+            'value': value,
+            'interval': [low, high],
+            'regressed': high < baseline[name] - max_drop,
+        }
+    return {
+        'passed': not any(check['regressed'] for check in checks.values()),
+        'max_drop': max_drop,
+        'checks': checks,
+    }
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Evaluate the baseline model")
+    parser.add_argument('--n-samples', type=int, default=1000)
+    parser.add_argument('--chunk-size', type=int, default=500_000)
+    parser.add_argument('--n-bootstrap', type=int, default=1000)
+    parser.add_argument('--confidence', type=float, default=0.95)
+    parser.add_argument('--baseline', type=Path, default=None,
+                        help="Baseline metrics JSON (defaults to the training metrics in metadata.json)")
+    parser.add_argument('--max-drop', type=float, default=0.01)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
     """Main evaluation entrypoint."""
+    args = parse_args(argv)
+    
     logger.info("=" * 60)
     logger.info("INFLOW AI - Baseline Model Evaluation")
     logger.info("=" * 60)
@@ -129,23 +433,48 @@ def main():
     logger.info(f"Model: {metadata['name']} v{metadata['version']}")
     logger.info(f"Training metrics: {metadata['metrics']}")
     
-    logger.info("Generating test data...")
-    df = generate_test_data(n_samples=1000, seed=123)
+    from ml.models.baseline.train import load_config
+    
+    slices = load_config().get('evaluation', {}).get('slices')
+    
+    logger.info(f"Running evaluation on {args.n_samples} rows...")
+    start = time.perf_counter()
+    metrics = evaluate_chunks(
+        model, metadata,
+        iter_test_data(args.n_samples, args.chunk_size, seed=123),
+        n_bootstrap=args.n_bootstrap,
+        confidence=args.confidence,
+        slices=slices
+    )
+    elapsed = time.perf_counter() - start
     
-    logger.info("Running evaluation...")
-    metrics = evaluate(model, metadata, df)
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    else:
+        baseline = metadata['metrics']
+    metrics['regression_gate'] = regression_gate(metrics, baseline, max_drop=args.max_drop)
     
     # Save evaluation results
     eval_path = ARTIFACTS_DIR / "evaluation.json"
     with open(eval_path, 'w') as f:
         json.dump(metrics, f, indent=2)
+    if slices:
+        paths = save_slice_report(metrics['slices'], ARTIFACTS_DIR, metadata['version'])
+        logger.info(f"Slice metrics saved to {paths['parquet']}")
+    
+    intervals = metrics.get('confidence_intervals', {})
+    
+    def fmt(name):
+        low, high = intervals.get(name, [metrics[name], metrics[name]])
+        return f"{metrics[name]:.4f}  [{low:.4f}, {high:.4f}]"
     
     logger.info("=" * 60)
-    logger.info("Evaluation Results:")
-    logger.info(f"  Accuracy:  {metrics['accuracy']:.4f}")
-    logger.info(f"  F1 Score:  {metrics['f1_weighted']:.4f}")
-    logger.info(f"  Precision: {metrics['precision_weighted']:.4f}")
-    logger.info(f"  Recall:    {metrics['recall_weighted']:.4f}")
+    logger.info(f"Evaluation Results ({metrics['n_samples']} rows in {elapsed:.1f}s):")
+    logger.info(f"  Accuracy:  {fmt('accuracy')}")
+    logger.info(f"  F1 Score:  {fmt('f1_weighted')}")
+    logger.info(f"  Precision: {fmt('precision_weighted')}")
+    logger.info(f"  Recall:    {fmt('recall_weighted')}")
     logger.info("=" * 60)
     
     # Print classification report
@@ -153,8 +482,21 @@ def main():
     for label, m in metrics['per_class'].items():
         logger.info(f"  {label}: P={m['precision']:.2f} R={m['recall']:.2f} F1={m['f1']:.2f}")
     
+    if slices:
+        logger.info("\nPer-segment F1:")
+        for row in metrics['slices']:
+            logger.info(f"  {row['slice']:<20} {row['segment']:<12} n={row['n']:<9} F1={row['f1_weighted']:.4f}")
+    
+    gate = metrics['regression_gate']
+    for name, check in gate['checks'].items():
+        status = "REGRESSED" if check['regressed'] else "ok"
+        logger.info(f"  Gate {name}: baseline {check['baseline']:.4f} -> {fmt(name)} {status}")
+    if not gate['passed']:
+        logger.error(f"Regression gate failed (max drop {gate['max_drop']})")
+    
     return metrics
 
 
 if __name__ == "__main__":
-    main()
+    metrics = main()
+    raise SystemExit(0 if metrics['regression_gate']['passed'] else 1)
@@ -0,0 +1,144 @@
+"""
+Packed Model Artifact
+Single-file model artifact for fast cold starts.
+
+model.pack holds the UBJSON booster, the metadata, the label classes and
+explainer data (per-feature split thresholds and per-class expected
+values) in one file. Readers memory-map it: only the small JSON header is
+parsed, the booster is loaded from the mapped bytes and the arrays are
+zero-copy views, so nothing re-parses the verbose JSON model.
+
+Layout:
+    8 bytes   magic b"INFLPACK"
+    4 bytes   format version (uint32, little-endian)
+    4 bytes   header length (uint32, little-endian)
+    header    UTF-8 JSON: metadata, label_classes and
+              sections {name: {offset, length, ...}}
+    sections  64-byte aligned; offsets are relative to the first section
+
+The serving-side reader is services/inference-service/booster_model.py.
+"""
+
+import json
+import mmap
+import os
+import struct
+from pathlib import Path
+
+import numpy as np
+import xgboost as xgb
+
+PACK_FILE = "model.pack"
+PACK_MAGIC = b"INFLPACK"
+PACK_VERSION = 1
+ALIGNMENT = 64
+_PREAMBLE = struct.Struct("<8sII")
+
+
+def _aligned(n: int) -> int:
+    return (n + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+def split_thresholds(booster: xgb.Booster, n_features: int) -> list[np.ndarray]:
+    """Sorted float32 split thresholds per feature, from the booster's JSON model."""
+    trees = json.loads(booster.save_raw("json"))["learner"]["gradient_booster"]["model"]["trees"]
+    thresholds = [set() for _ in range(n_features)]
+    for tree in trees:
+        for left, feature, condition in zip(tree["left_children"], tree["split_indices"], tree["split_conditions"]):
+            if left != -1:
+                thresholds[feature].add(condition)
+    return [np.array(sorted(t), dtype=np.float32) for t in thresholds]
+
+
+def expected_values(booster: xgb.Booster, feature_names: list) -> np.ndarray:
+    """Per-class TreeSHAP expected value (the bias term of pred_contribs)."""
+    row = xgb.DMatrix(np.zeros((1, len(feature_names)), dtype=np.float32), feature_names=feature_names)
+    contribs = booster.predict(row, pred_contribs=True)
+    return np.ascontiguousarray(contribs.reshape(-1, len(feature_names) + 1)[:, -1], dtype=np.float32)
+
+
+def write_packed_artifact(output_dir: Path, booster: xgb.Booster, metadata: dict) -> Path:
+    """
+    Write model.pack next to the JSON artifacts.
+    
+    Args:
+        output_dir: Artifacts directory
+        booster: Trained booster
+        metadata: Model metadata (as metadata.json; needs feature_names
+            and label_classes)
+    
+    Returns:
+        Path of the packed artifact
+    """
+    feature_names = list(metadata["feature_names"])
+    thresholds = split_thresholds(booster, len(feature_names))
+    payloads = {
+        "booster": (bytes(booster.save_raw("ubj")), {"format": "ubj"}),
+        "split_thresholds": (
+            np.concatenate(thresholds).astype(np.float32).tobytes(),
+            {"dtype": "float32", "counts": [len(t) for t in thresholds]},
+        ),
+        "expected_values": (expected_values(booster, feature_names).tobytes(), {"dtype": "float32"}),
+    }
+    
+    sections, offset = {}, 0
+    for name, (data, info) in payloads.items():
+        sections[name] = {"offset": offset, "length": len(data), **info}
+        offset = _aligned(offset + len(data))
+    
+    header = json.dumps({
+        "metadata": metadata,
+        "label_classes": list(metadata["label_classes"]),
+        "sections": sections,
+    }).encode()
+    data_start = _aligned(_PREAMBLE.size + len(header))
+    
+    path = Path(output_dir) / PACK_FILE
+    tmp_path = path.with_suffix(".tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(_PREAMBLE.pack(PACK_MAGIC, PACK_VERSION, len(header)))
+        f.write(header)
+        for name, (data, _) in payloads.items():
+            f.seek(data_start + sections[name]["offset"])
+            f.write(data)
+    os.replace(tmp_path, path)
+    return path
+
+
+def read_packed_artifact(path: Path) -> dict:
+    """
+    Memory-map a packed artifact.
+    
+    Returns:
+        Dict with metadata, label_classes, booster, split_thresholds
+        (list of arrays), expected_values and the underlying mmap (keep it
+        referenced as long as the arrays are used)
+    """
+    with open(path, "rb") as f:
+        buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    
+    magic, version, header_length = _PREAMBLE.unpack_from(buffer, 0)
+    if magic != PACK_MAGIC or version != PACK_VERSION:
+        raise ValueError(f"{path} is not a version {PACK_VERSION} model pack")
+    header = json.loads(bytes(buffer[_PREAMBLE.size:_PREAMBLE.size + header_length]))
+    data_start = _aligned(_PREAMBLE.size + header_length)
+    sections = header["sections"]
+    
+    def section(name: str) -> memoryview:
+        start = data_start + sections[name]["offset"]
+        return memoryview(buffer)[start:start + sections[name]["length"]]
+    
+    booster = xgb.Booster()
+    booster.load_model(bytearray(section("booster")))
+    
+    flat = np.frombuffer(section("split_thresholds"), dtype=np.float32)
+    bounds = np.cumsum([0] + sections["split_thresholds"]["counts"])
+    
+    return {
+        "metadata": header["metadata"],
+        "label_classes": header["label_classes"],
+        "booster": booster,
+        "split_thresholds": [flat[a:b] for a, b in zip(bounds[:-1], bounds[1:])],
+        "expected_values": np.frombuffer(section("expected_values"), dtype=np.float32),
+        "mmap": buffer,
+    }
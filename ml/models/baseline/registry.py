@@ -0,0 +1,260 @@
+"""
+Model Registry Backends
+Local filesystem registry with the same interface as the MLflow ModelRegistry.
+
+The local registry needs no tracking server: artifacts are copied under
+the registry root and every model's versions and stages live in a single
+index.json, so stage lookups are one dict access on a cached index.
+Serving reads the same index (see services/inference-service/model_manager.py).
+
+Layout:
+    <root>/index.json
+    <root>/<model name>/<version>/model/   (model.json, metadata.json, ...)
+"""
+
+import fcntl
+import json
+import logging
+import os
+import shutil
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+MODEL_NAME = "inflow-baseline"
+# local:<dir> (or a directory path) for the file registry, else an MLflow tracking URI
+MODEL_REGISTRY_URI = os.getenv("MODEL_REGISTRY_URI", os.getenv("MLFLOW_TRACKING_URI", "http://localhost:5000"))
+INDEX_FORMAT_VERSION = 1
+
+
+class LocalModelRegistry:
+    """
+    File-backed model registry.
+    
+    Each stage holds one version. Promoting to Production archives the
+    previous Production version and remembers it, so rollback restores
+    it without scanning versions. Writers serialize on a lock file; the
+    index is replaced atomically, so readers never see a partial index.
+    """
+    
+    STAGES = ["None", "Staging", "Production", "Archived"]
+    
+    def __init__(self, root: str):
+        self.root = Path(root)
+        self.index_path = self.root / "index.json"
+        self._index: Optional[dict] = None
+        self._index_mtime: Optional[int] = None
+        logger.info(f"Using local model registry at {self.root}")
+    
+    def _read_index(self) -> dict:
+        """The index, re-read only when the file has changed."""
+        try:
+            mtime = self.index_path.stat().st_mtime_ns
+        except FileNotFoundError:
+            return {"format_version": INDEX_FORMAT_VERSION, "models": {}}
+        if mtime != self._index_mtime:
+            with open(self.index_path) as f:
+                self._index = json.load(f)
+            self._index_mtime = mtime
+        return self._index
+    
+    def _write_index(self, index: dict):
+        tmp_path = self.index_path.with_suffix(".tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(index, f, indent=2)
+        os.replace(tmp_path, self.index_path)
+        self._index = index
+        self._index_mtime = self.index_path.stat().st_mtime_ns
+    
+    @contextmanager
+    def _updating(self):
+        """Exclusive read-modify-write of the index."""
+        self.root.mkdir(parents=True, exist_ok=True)
+        with open(self.root / ".lock", "w") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            self._index_mtime = None
+            index = json.loads(json.dumps(self._read_index()))
+            yield index
+            self._write_index(index)
+    
+    def _model(self, index: dict, model_name: str) -> dict:
+        if model_name not in index["models"]:
+            raise KeyError(f"Model {model_name} is not registered")
+        return index["models"][model_name]
+    
+    def register_model(
+        self,
+        model_path: str,
+        model_name: str = MODEL_NAME,
+        metrics: Optional[dict] = None,
+        params: Optional[dict] = None,
+        tags: Optional[dict] = None
+    ) -> str:
+        """
+        Register a new model version by copying its artifacts.
+        
+        Args:
+            model_path: Path to model artifacts
+            model_name: Name in registry
+            metrics: Training metrics
+            params: Hyperparameters
+            tags: Additional tags
+        
+        Returns:
+            Version string
+        """
+        metadata_path = Path(model_path) / "metadata.json"
+        metadata = json.loads(metadata_path.read_text()) if metadata_path.exists() else {}
+        
+        with self._updating() as index:
+            model = index["models"].setdefault(
+                model_name, {"latest_version": 0, "stages": {}, "previous": {}, "versions": {}}
+            )
+            version = str(model["latest_version"] + 1)
+            relative = Path(model_name) / version / "model"
+            shutil.copytree(model_path, self.root / relative, dirs_exist_ok=True)
+            
+            model["latest_version"] = int(version)
+            model["versions"][version] = {
+                "version": version,
+                "stage": "None",
+                "created": int(time.time() * 1000),
+                "path": str(relative),
+                "metrics": metrics or {},
+                "params": params or {},
+                "tags": tags or {},
+                "metadata": metadata,
+            }
+        
+        logger.info(f"Registered {model_name} v{version}")
+        return version
+    
+    def promote_model(
+        self,
+        model_name: str,
+        version: str,
+        stage: str = "Staging"
+    ) -> bool:
+        """
+        Promote model to a stage.
+        
+        Args:
+            model_name: Name in registry
+            version: Version to promote
+            stage: Target stage (Staging, Production)
+        
+        Returns:
+            Success boolean
+        """
+        if stage not in self.STAGES:
+            raise ValueError(f"Invalid stage: {stage}. Must be one of {self.STAGES}")
+        version = str(version)
+        
+        with self._updating() as index:
+            model = self._model(index, model_name)
+            if version not in model["versions"]:
+                raise KeyError(f"{model_name} has no version {version}")
+            
+            entry = model["versions"][version]
+            if model["stages"].get(entry["stage"]) == version:
+                del model["stages"][entry["stage"]]
+            
+            replaced = model["stages"].get(stage)
+            if replaced and replaced != version:
+                # As MLflow's archive_existing_versions, only for Production
+                model["versions"][replaced]["stage"] = "Archived" if stage == "Production" else "None"
+                model["previous"][stage] = replaced
+            
+            entry["stage"] = stage
+            if stage not in ("None", "Archived"):
+                model["stages"][stage] = version
+        
+        logger.info(f"Promoted {model_name} v{version} to {stage}")
+        return True
+    
+    def rollback_model(
+        self,
+        model_name: str,
+        stage: str = "Production"
+    ) -> Optional[str]:
+        """
+        Rollback to the version previously in the stage.
+        
+        Args:
+            model_name: Name in registry
+            stage: Stage to rollback
+        
+        Returns:
+            New active version or None
+        """
+        model = self._model(self._read_index(), model_name)
+        previous = model["previous"].get(stage)
+        if not previous:
+            logger.error("No previous version to rollback to")
+            return None
+        
+        self.promote_model(model_name, previous, stage)
+        
+        logger.info(f"Rolled back {model_name} to v{previous}")
+        return previous
+    
+    def get_model_version(
+        self,
+        model_name: str,
+        stage: str = "Production"
+    ) -> Optional[str]:
+        """Get current version for a stage."""
+        model = self._read_index()["models"].get(model_name)
+        return model["stages"].get(stage) if model else None
+    
+    def get_model_uri(
+        self,
+        model_name: str,
+        stage: str = "Production"
+    ) -> Optional[str]:
+        """Get model URI for serving."""
+        version = self.get_model_version(model_name, stage)
+        if version:
+            return f"models:/{model_name}/{stage}"
+        return None
+    
+    def get_model_path(self, model_name: str, stage_or_version: str = "Production") -> Optional[Path]:
+        """Local artifacts directory of a stage or version."""
+        model = self._read_index()["models"].get(model_name)
+        if not model:
+            return None
+        version = model["stages"].get(stage_or_version, stage_or_version)
+        entry = model["versions"].get(str(version))
+        return self.root / entry["path"] if entry else None
+    
+    def list_versions(self, model_name: str) -> list:
+        """List all versions of a model."""
+        model = self._read_index()["models"].get(model_name, {"versions": {}})
+        return [
+            {
+                "version": v["version"],
+                "stage": v["stage"],
+                "created": v["created"],
+                "run_id": None
+            }
+            for v in model["versions"].values()
+        ]
+
+
+def open_registry(uri: str = MODEL_REGISTRY_URI):
+    """
+    Registry for a URI: local:<dir> or a directory path gives a
+    LocalModelRegistry, anything else the MLflow ModelRegistry.
+    """
+    if uri.startswith("local:"):
+        return LocalModelRegistry(uri[len("local:"):])
+    if "://" not in uri:
+        return LocalModelRegistry(uri)
+    
+    # Imported lazily: mlflow is not needed for the local registry
+    from ml.models.baseline.mlflow_integration import ModelRegistry
+    
+    return ModelRegistry(uri)
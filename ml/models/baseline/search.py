@@ -0,0 +1,404 @@
+"""
+Baseline Hyperparameter Search
+Random search over XGBoost parameters, run in parallel worker processes.
+
+Each worker reads the cached training dataset and builds its
+QuantileDMatrix (the quantile sketch) once, then reuses it for every trial
+it runs. Trials whose validation loss is above the median of finished
+trials at the same round are pruned. Every trial is appended to
+trials.jsonl, and the best one is saved like train.py's artifacts and,
+when configured and reachable, registered in the model registry.
+
+Usage: python -m ml.models.baseline.search --n-trials 32 --register
+"""
+
+import argparse
+import json
+import logging
+import math
+import multiprocessing
+import os
+import socket
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from pathlib import Path
+from typing import Optional
+from urllib.parse import urlparse
+
+import numpy as np
+import pandas as pd
+import xgboost as xgb
+from sklearn.model_selection import train_test_split
+from sklearn.preprocessing import LabelEncoder
+
+from ml.models.baseline.eval import WEIGHTED_METRICS, metrics_from_confusion
+from ml.models.baseline.registry import MODEL_REGISTRY_URI, open_registry
+from ml.models.baseline.train import (
+    OUTPUT_DIR,
+    build_training_dataset,
+    dataset_cache_path,
+    load_config,
+    save_artifacts,
+)
+
+logger = logging.getLogger(__name__)
+
+SEARCH_DIR = OUTPUT_DIR / "search"
+
+# Training data of this worker process, built once by init_worker
+_worker_data: dict = {}
+
+
+def split_dataset(df: pd.DataFrame, feature_names: list, test_size: float, seed: int) -> tuple:
+    """
+    Encode labels and split exactly as train_model does.
+    
+    Returns:
+        (label_encoder, X_train, X_valid, y_train, y_valid)
+    """
+    le = LabelEncoder()
+    y = le.fit_transform(df['label'])
+    X_train, X_valid, y_train, y_valid = train_test_split(
+        df[feature_names], y,
+        test_size=test_size,
+        random_state=seed,
+        stratify=y
+    )
+    return le, X_train, X_valid, y_train, y_valid
+
+
+def init_worker(dataset_path: str, feature_names: list, test_size: float, seed: int, max_bin: int, nthread: int):
+    """Process pool initializer: build this worker's DMatrices once."""
+    df = pd.read_parquet(dataset_path)
+    le, X_train, X_valid, y_train, y_valid = split_dataset(df, feature_names, test_size, seed)
+    
+    dtrain = xgb.QuantileDMatrix(X_train, label=y_train, max_bin=max_bin, nthread=nthread)
+    _worker_data.update(
+        dtrain=dtrain,
+        dvalid=xgb.QuantileDMatrix(X_valid, label=y_valid, ref=dtrain, nthread=nthread),
+        y_valid=y_valid,
+        n_classes=len(le.classes_),
+        nthread=nthread,
+        builds=_worker_data.get('builds', 0) + 1,
+    )
+
+
+class MedianPruning(xgb.callback.TrainingCallback):
+    """
+    Stop training when the validation loss is above the median of earlier
+    trials' losses at the same round.
+    """
+    
+    def __init__(
+        self,
+        reference_curves: list,
+        metric: str,
+        warmup_rounds: int = 10,
+        check_every: int = 5,
+        min_trials: int = 3
+    ):
+        """
+        Args:
+            reference_curves: Per-round validation loss of finished trials
+            metric: Eval metric to compare (lower is better)
+            warmup_rounds: Never prune before this round
+            check_every: Compare every this many rounds
+            min_trials: Only prune once this many trials reached the round
+        """
+        super().__init__()
+        self.reference_curves = reference_curves
+        self.metric = metric
+        self.warmup_rounds = warmup_rounds
+        self.check_every = check_every
+        self.min_trials = min_trials
+        self.pruned_at: Optional[int] = None
+    
+    def after_iteration(self, model, epoch: int, evals_log) -> bool:
+        if epoch < self.warmup_rounds or (epoch - self.warmup_rounds) % self.check_every:
+            return False
+        reached = [curve[epoch] for curve in self.reference_curves if len(curve) > epoch]
+        if len(reached) < self.min_trials:
+            return False
+        if evals_log['valid'][self.metric][-1] > np.median(reached):
+            self.pruned_at = epoch
+            return True
+        return False
+
+
+def run_trial(
+    trial_id: int,
+    params: dict,
+    max_rounds: int,
+    early_stopping_rounds: int,
+    reference_curves: list,
+    pruning: dict
+) -> dict:
+    """
+    Train one configuration on this worker's cached DMatrices.
+    
+    Returns:
+        Trial dict; completed trials carry validation metrics and the
+        model (UBJSON bytes, truncated to the best iteration)
+    """
+    data = _worker_data
+    metric = params['eval_metric']
+    train_params = {
+        **params,
+        'objective': 'multi:softprob',
+        'num_class': data['n_classes'],
+        'nthread': data['nthread'],
+    }
+    pruner = MedianPruning(reference_curves, metric, **pruning)
+    evals_log = {}
+    
+    start = time.perf_counter()
+    booster = xgb.train(
+        train_params,
+        data['dtrain'],
+        num_boost_round=max_rounds,
+        evals=[(data['dvalid'], 'valid')],
+        early_stopping_rounds=early_stopping_rounds,
+        evals_result=evals_log,
+        callbacks=[pruner],
+        verbose_eval=False
+    )
+    curve = [float(v) for v in evals_log['valid'][metric]]
+    
+    result = {
+        'trial_id': trial_id,
+        'status': 'pruned' if pruner.pruned_at is not None else 'complete',
+        'rounds': len(curve),
+        'best_iteration': int(np.argmin(curve)),
+        'best_score': min(curve),
+        'curve': curve,
+        'duration_s': time.perf_counter() - start,
+        'worker_pid': os.getpid(),
+        'dataset_builds': data['builds'],
+    }
+    if result['status'] == 'complete':
+        booster = booster[:result['best_iteration'] + 1]
+        y_pred = booster.predict(data['dvalid']).argmax(axis=1)
+        k = data['n_classes']
+        counts = np.bincount(data['y_valid'] * k + y_pred, minlength=k * k).reshape(k, k)
+        scores = metrics_from_confusion(counts)
+        result['metrics'] = {name: float(scores[name]) for name in WEIGHTED_METRICS}
+        result['model'] = bytes(booster.save_raw('ubj'))
+    return result
+
+
+def sample_trials(space: dict, n_trials: int, seed: int = 0) -> list[dict]:
+    """
+    Random configurations from a search space.
+    
+    Each parameter is {'choices': [...]}, or {'low', 'high'} sampled
+    uniformly (log-uniformly with 'log': true).
+    """
+    rng = np.random.default_rng(seed)
+    trials = []
+    for _ in range(n_trials):
+        params = {}
+        for name, dist in space.items():
+            if 'choices' in dist:
+                params[name] = dist['choices'][rng.integers(len(dist['choices']))]
+            elif dist.get('log'):
+                params[name] = math.exp(rng.uniform(math.log(dist['low']), math.log(dist['high'])))
+            else:
+                params[name] = float(rng.uniform(dist['low'], dist['high']))
+        trials.append(params)
+    return trials
+
+
+def tracking_server_reachable(tracking_uri: str, timeout: float = 2.0) -> bool:
+    """Whether an HTTP tracking server accepts connections (local stores always do)."""
+    parsed = urlparse(tracking_uri)
+    if parsed.scheme not in ('http', 'https'):
+        return True
+    port = parsed.port or (443 if parsed.scheme == 'https' else 80)
+    try:
+        with socket.create_connection((parsed.hostname, port), timeout=timeout):
+            return True
+    except OSError:
+        return False
+
+
+def register_best(model_dir: Path, metrics: dict, params: dict, tracking_uri: str = MODEL_REGISTRY_URI) -> Optional[str]:
+    """
+    Register the best trial via register_model of the configured registry.
+    
+    Returns:
+        Registered version, or None when MLflow is unavailable (the search
+        result is kept locally either way)
+    """
+    if not tracking_server_reachable(tracking_uri):
+        logger.warning(f"MLflow at {tracking_uri} is unreachable; best trial kept in {model_dir} only")
+        return None
+    try:
+        registry = open_registry(tracking_uri)
+        return registry.register_model(str(model_dir), metrics=metrics, params=params, tags={'source': 'search'})
+    except Exception as e:
+        logger.warning(f"Could not register best trial: {e}")
+        return None
+
+
+def run_search(
+    config: dict,
+    n_trials: Optional[int] = None,
+    parallelism: Optional[int] = None,
+    output_dir: Optional[Path] = None,
+    register: Optional[bool] = None,
+    tracking_uri: str = MODEL_REGISTRY_URI
+) -> dict:
+    """
+    Run the search configured in config['search'].
+    
+    Trials are submitted as workers free up, each with the loss curves of
+    all trials finished so far for pruning.
+    
+    Args:
+        config: Training config with a search section
+        n_trials, parallelism, register: Override the search section
+        output_dir: Where trials.jsonl, search.json and best/ are written
+            (default: artifacts/search/<timestamp>)
+        tracking_uri: Registry for registration (MLflow URI or local:<dir>)
+    
+    Returns:
+        Search summary (also written to search.json)
+    """
+    search = config['search']
+    n_trials = n_trials or search['n_trials']
+    parallelism = min(parallelism or search.get('parallelism') or os.cpu_count() or 1, n_trials)
+    register = search.get('register', False) if register is None else register
+    output_dir = Path(output_dir or SEARCH_DIR / time.strftime('%Y%m%d-%H%M%S'))
+    output_dir.mkdir(parents=True, exist_ok=True)
+    
+    df = build_training_dataset(config)
+    feature_names = [f['name'] for f in config['features']]
+    base_params = {k: v for k, v in config['hyperparameters'].items() if k != 'n_estimators'}
+    trials = list(enumerate(sample_trials(search['space'], n_trials, search.get('seed', 0))))
+    
+    initargs = (
+        str(dataset_cache_path(config)),
+        feature_names,
+        config['training']['test_size'],
+        config['training']['random_seed'],
+        search.get('max_bin', 256),
+        max(1, (os.cpu_count() or 1) // parallelism),
+    )
+    logger.info(f"Running {n_trials} trials on {parallelism} workers")
+    
+    start = time.perf_counter()
+    results, pending = [], {}
+    best, best_model = None, None
+    with ProcessPoolExecutor(
+        parallelism,
+        mp_context=multiprocessing.get_context('spawn'),
+        initializer=init_worker,
+        initargs=initargs
+    ) as pool, open(output_dir / "trials.jsonl", 'w') as trials_log:
+        while trials or pending:
+            while trials and len(pending) < parallelism:
+                trial_id, params = trials.pop(0)
+                curves = [r['curve'] for r in results if 'curve' in r]
+                future = pool.submit(
+                    run_trial, trial_id, {**base_params, **params},
+                    search['max_rounds'], search['early_stopping_rounds'],
+                    curves, search.get('pruning', {})
+                )
+                pending[future] = (trial_id, params)
+            
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                trial_id, params = pending.pop(future)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    logger.error(f"Trial {trial_id} failed: {e}")
+                    result = {'trial_id': trial_id, 'status': 'failed', 'error': str(e)}
+                result['params'] = params
+                model = result.pop('model', None)
+                if result['status'] == 'complete' and (best is None or result['best_score'] < best['best_score']):
+                    best, best_model = result, model
+                results.append(result)
+                
+                trials_log.write(json.dumps({k: v for k, v in result.items() if k != 'curve'}) + "\n")
+                trials_log.flush()
+                logger.info(
+                    f"Trial {trial_id}: {result['status']}"
+                    + (f" after {result['rounds']} rounds, loss={result['best_score']:.4f}" if 'rounds' in result else "")
+                )
+    
+    summary = {
+        'n_trials': n_trials,
+        'parallelism': parallelism,
+        'duration_s': time.perf_counter() - start,
+        'status_counts': {
+            status: sum(r['status'] == status for r in results) for status in ('complete', 'pruned', 'failed')
+        },
+        'best': {k: v for k, v in best.items() if k != 'curve'} if best else None,
+        'registered_version': None,
+        'output_dir': str(output_dir),
+    }
+    
+    if best:
+        booster = xgb.Booster()
+        booster.load_model(bytearray(best_model))
+        best_config = {
+            **config,
+            'hyperparameters': {
+                **config['hyperparameters'], **best['params'], 'n_estimators': best['best_iteration'] + 1
+            },
+        }
+        # The split the workers trained on (see init_worker)
+        le, X_train, _, _, _ = split_dataset(
+            df, feature_names, config['training']['test_size'], config['training']['random_seed']
+        )
+        save_artifacts(
+            booster, le, best['metrics'], feature_names, best_config, output_dir / "best", reference_data=X_train
+        )
+        if register:
+            summary['registered_version'] = register_best(
+                output_dir / "best", best['metrics'], best_config['hyperparameters'], tracking_uri
+            )
+    
+    with open(output_dir / "search.json", 'w') as f:
+        json.dump(summary, f, indent=2)
+    
+    return summary
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Hyperparameter search for the baseline model")
+    parser.add_argument('--n-trials', type=int, default=None)
+    parser.add_argument('--parallelism', type=int, default=None)
+    parser.add_argument('--output-dir', type=Path, default=None)
+    parser.add_argument('--register', action='store_true', default=None,
+                        help="Register the best trial in MODEL_REGISTRY_URI (skipped when unreachable)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """Search entrypoint."""
+    args = parse_args(argv)
+    
+    logger.info("=" * 60)
+    logger.info("INFLOW AI - Baseline Hyperparameter Search")
+    logger.info("=" * 60)
+    
+    summary = run_search(load_config(), args.n_trials, args.parallelism, args.output_dir, args.register)
+    
+    logger.info("=" * 60)
+    logger.info(f"{summary['n_trials']} trials in {summary['duration_s']:.1f}s: {summary['status_counts']}")
+    if summary['best']:
+        best = summary['best']
+        logger.info(f"Best trial {best['trial_id']}: loss={best['best_score']:.4f} F1={best['metrics']['f1_weighted']:.4f}")
+        logger.info(f"Params: {best['params']}")
+    if summary['registered_version']:
+        logger.info(f"Registered version {summary['registered_version']}")
+    logger.info(f"Results in {summary['output_dir']}")
+    logger.info("=" * 60)
+    
+    return summary
+
+
+if __name__ == "__main__":
+    main()
@@ -5,6 +5,7 @@ Reproducible training with seeded randomness.
 
 import os
 import json
+import hashlib
 import logging
 from datetime import datetime
 from pathlib import Path
@@ -27,6 +28,10 @@ logger = logging.getLogger(__name__)
 SCRIPT_DIR = Path(__file__).parent
 CONFIG_PATH = SCRIPT_DIR / "config.yaml"
 OUTPUT_DIR = SCRIPT_DIR / "artifacts"
+DATASET_CACHE_DIR = SCRIPT_DIR / ".cache" / "datasets"
+
+# Bump when dataset building changes so stale cached datasets are not reused
+DATASET_BUILDER_VERSION = 1
 
 
 def load_config() -> dict:
@@ -54,18 +59,126 @@ def generate_synthetic_data(n_samples: int = 5000, seed: int = 42) -> pd.DataFra
     df = pd.DataFrame(data)
     
     # Generate labels based on rules (simulating real outcomes)
-    labels = []
-    for _, row in df.iterrows():
-        if row['days_past_due'] > 90 and row['payment_history_score'] < 0.3:
-            labels.append('write_off')
-        elif row['days_past_due'] > 60 or row['outstanding_balance'] > 5000:
-            labels.append('escalate')
-        elif row['days_past_due'] < 30 and row['payment_history_score'] > 0.7:
-            labels.append('recover')
-        else:
-            labels.append('monitor')
-    
-    df['label'] = labels
+    df['label'] = label_outcomes(df)
+    
+    return df
+
+
+def label_outcomes(df: pd.DataFrame) -> np.ndarray:
+    """
+    Rule-based outcome labels, evaluated column-wise.
+    
+    Rules are checked in order and the first match wins:
+    write_off, escalate, recover, otherwise monitor.
+    """
+    dpd = df['days_past_due'].to_numpy()
+    score = df['payment_history_score'].to_numpy()
+    balance = df['outstanding_balance'].to_numpy()
+    
+    return np.select(
+        [
+            (dpd > 90) & (score < 0.3),
+            (dpd > 60) | (balance > 5000),
+            (dpd < 30) & (score > 0.7),
+        ],
+        ['write_off', 'escalate', 'recover'],
+        default='monitor'
+    ).astype(object)
+
+
+def _file_digest(path: Path) -> str:
+    """SHA-256 of a file's contents."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _dataset_sources(data_config: dict) -> list[Path]:
+    """Files the dataset is built from (none for synthetic data)."""
+    if data_config.get('source', 'synthetic') == 'synthetic':
+        return []
+    
+    from ml.features.historical import DEFAULT_FEATURE_REFS, DEFAULT_FEATURE_VIEWS
+    from ml.features.streaming import DATA_DIR
+    
+    repo_path = Path(data_config.get('feature_repo_path') or DATA_DIR.parent)
+    views = {ref.split(':')[0] for ref in data_config.get('feature_refs') or DEFAULT_FEATURE_REFS}
+    return [Path(data_config['labels_path'])] + [
+        repo_path / v.batch_source.path for v in DEFAULT_FEATURE_VIEWS if v.name in views
+    ]
+
+
+def dataset_cache_key(config: dict) -> str:
+    """
+    Content address of the training dataset.
+    
+    Covers everything the dataset depends on: the data config, model
+    features, random seed and the contents of every source file.
+    """
+    data_config = config.get('data', {})
+    payload = {
+        'builder_version': DATASET_BUILDER_VERSION,
+        'data': {k: v for k, v in data_config.items() if k != 'cache_dir'},
+        'features': [f['name'] for f in config['features']],
+        'random_seed': config['training']['random_seed'],
+        'sources': [_file_digest(p) for p in _dataset_sources(data_config)],
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def dataset_cache_path(config: dict) -> Path:
+    """Where build_training_dataset materializes the dataset for this config."""
+    cache_dir = Path(config.get('data', {}).get('cache_dir') or DATASET_CACHE_DIR)
+    return cache_dir / f"{dataset_cache_key(config)}.parquet"
+
+
+def build_training_dataset(config: dict, rebuild: bool = False) -> pd.DataFrame:
+    """
+    Build the training set once and reuse it across runs.
+    
+    The dataset is materialized to <cache_dir>/<cache key>.parquet, so
+    repeated training runs and hyperparameter sweeps with the same config
+    and source data skip rebuilding it.
+    
+    Args:
+        config: Training config; the optional `data` section selects the
+            source (synthetic, or features joined point-in-time onto a
+            labels file)
+        rebuild: Ignore any cached copy
+    
+    Returns:
+        DataFrame with the model features and a label column
+    """
+    data_config = config.get('data', {})
+    cache_path = dataset_cache_path(config)
+    cache_dir = cache_path.parent
+    
+    if cache_path.exists() and not rebuild:
+        logger.info(f"Loading cached training dataset {cache_path.name}")
+        return pd.read_parquet(cache_path)
+    
+    feature_names = [f['name'] for f in config['features']]
+    if data_config.get('source', 'synthetic') == 'synthetic':
+        df = generate_synthetic_data(
+            n_samples=data_config.get('n_samples', 5000),
+            seed=config['training']['random_seed']
+        )
+    else:
+        from ml.features.historical import HistoricalFeatureJoiner
+        from ml.features.streaming import DATA_DIR
+        
+        joiner = HistoricalFeatureJoiner(repo_path=data_config.get('feature_repo_path') or DATA_DIR.parent)
+        labels = pd.read_parquet(data_config['labels_path'])
+        df = joiner.get_historical_features(labels, data_config.get('feature_refs'))
+    df = df[feature_names + ['label']].reset_index(drop=True)
+    
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    tmp_path = cache_path.with_name(cache_path.name + ".tmp")
+    df.to_parquet(tmp_path, index=False)
+    os.replace(tmp_path, cache_path)
+    logger.info(f"Cached training dataset ({len(df)} rows) as {cache_path.name}")
     
     return df
 
@@ -73,13 +186,10 @@ def generate_synthetic_data(n_samples: int = 5000, seed: int = 42) -> pd.DataFra
 def train_model(config: dict) -> tuple:
     """
     Train XGBoost model.
-    Returns (model, label_encoder, metrics)
+    Returns (model, label_encoder, metrics, feature_names, X_train)
     """
-    logger.info("Generating training data...")
-    df = generate_synthetic_data(
-        n_samples=5000,
-        seed=config['training']['random_seed']
-    )
+    logger.info("Building training data...")
+    df = build_training_dataset(config)
     
     # Prepare features and labels
     feature_names = [f['name'] for f in config['features']]
@@ -133,15 +243,30 @@ def train_model(config: dict) -> tuple:
     
     logger.info(f"Metrics: {metrics}")
     
-    return model, le, metrics, feature_names
+    return model, le, metrics, feature_names, X_train
 
 
-def save_artifacts(model, label_encoder, metrics: dict, feature_names: list, config: dict):
-    """Save model and metadata."""
-    OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+def save_artifacts(
+    model,
+    label_encoder,
+    metrics: dict,
+    feature_names: list,
+    config: dict,
+    output_dir: Path = None,
+    reference_data=None
+):
+    """
+    Save model and metadata (to OUTPUT_DIR unless output_dir is given).
+    
+    reference_data (the training feature matrix, columns in feature_names
+    order) is saved as the drift reference serving sketches are binned on;
+    without it no drift_reference.json is written.
+    """
+    output_dir = Path(output_dir or OUTPUT_DIR)
+    output_dir.mkdir(parents=True, exist_ok=True)
     
     # Save model
-    model_path = OUTPUT_DIR / "model.json"
+    model_path = output_dir / "model.json"
     model.save_model(str(model_path))
     logger.info(f"Model saved to {model_path}")
     
@@ -157,16 +282,35 @@ def save_artifacts(model, label_encoder, metrics: dict, feature_names: list, con
         'hyperparameters': config['hyperparameters'],
     }
     
-    metadata_path = OUTPUT_DIR / "metadata.json"
+    metadata_path = output_dir / "metadata.json"
     with open(metadata_path, 'w') as f:
         json.dump(metadata, f, indent=2)
     logger.info(f"Metadata saved to {metadata_path}")
     
     # Save label encoder classes
-    labels_path = OUTPUT_DIR / "labels.json"
+    labels_path = output_dir / "labels.json"
     with open(labels_path, 'w') as f:
         json.dump({'classes': list(label_encoder.classes_)}, f)
     
+    # Single-file artifact (UBJ booster, metadata, explainer data) for serving
+    from ml.models.baseline.packing import write_packed_artifact
+    
+    pack_path = write_packed_artifact(output_dir, model, metadata)
+    logger.info(f"Packed artifact saved to {pack_path}")
+    
+    # Reference distributions (quantile bins) for serving-side drift sketches
+    if reference_data is not None:
+        from ml.monitoring.drift_monitor import DataDriftMonitor
+        
+        monitor = DataDriftMonitor()
+        monitor.set_reference_matrix(np.asarray(reference_data, dtype=np.float64), feature_names)
+        reference_path = output_dir / "drift_reference.json"
+        with open(reference_path, 'w') as f:
+            json.dump(monitor.reference_stats, f)
+        logger.info(f"Drift reference saved to {reference_path}")
+    else:
+        logger.warning("No reference data given, drift_reference.json not written")
+    
     return metadata
 
 
@@ -179,8 +323,8 @@ def main():
     config = load_config()
     logger.info(f"Model: {config['model']['name']} v{config['model']['version']}")
     
-    model, le, metrics, feature_names = train_model(config)
-    metadata = save_artifacts(model, le, metrics, feature_names, config)
+    model, le, metrics, feature_names, X_train = train_model(config)
+    metadata = save_artifacts(model, le, metrics, feature_names, config, reference_data=X_train)
     
     logger.info("=" * 60)
     logger.info("Training complete!")
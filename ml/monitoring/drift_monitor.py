@@ -1,10 +1,24 @@
 """
 ML Monitoring Module
 Tracks data drift and model performance decay.
+
+Drift of production traffic, from the sketch files serving replicas write
+per window:
+    python -m ml.monitoring.drift_monitor \
+        --reference ml/models/baseline/artifacts/drift_reference.json \
+        --sketches '/tmp/inflow/drift/sketch-3f9a1c07d2be-1700000100-*.json'
+
+Sketch files are named sketch-<model id>-<window start>-<replica>.json,
+with the first 12 hex digits of the serving model's content hash (or its
+version for models without one).
 """
 
+import argparse
+import glob
+import json
 import logging
 from datetime import datetime
+from pathlib import Path
 from typing import Optional
 
 import numpy as np
@@ -13,32 +27,290 @@ logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
+SKETCH_FORMAT_VERSION = 1
+
+
+class FeatureSketch:
+    """
+    Mergeable streaming sketch of feature distributions.
+    
+    Per feature: counts over fixed bins (the reference quantile cuts of
+    DataDriftMonitor, plus a missing-value bin) and running count, mean,
+    M2, min and max. Updating costs the same for every row, quantiles are
+    read off the binned counts, and two sketches over the same cuts merge
+    exactly, so serving replicas can each keep one and ship only the
+    sketch at every window boundary.
+    
+    Serving keeps the same sketch format in
+    services/inference-service/drift_sketch.py.
+    """
+    
+    def __init__(self, feature_names: list[str], cuts: list, model_version: Optional[str] = None):
+        """
+        Args:
+            feature_names: Sketched features
+            cuts: Ascending bin cut points per feature
+            model_version: Model whose inputs are sketched
+        """
+        self.feature_names = list(feature_names)
+        self.cuts = [np.asarray(c, dtype=np.float64) for c in cuts]
+        self.model_version = model_version
+        # Content hash of the serving model; versions can collide, ids don't
+        self.model_id: Optional[str] = None
+        self.sizes = np.array([len(c) + 2 for c in self.cuts], dtype=np.int64)
+        self.offsets = np.concatenate([[0], np.cumsum(self.sizes)[:-1]]).astype(np.int64)
+        # Cuts padded with +inf: a row's bins are counts of cuts <= value
+        width = max((len(c) for c in self.cuts), default=0)
+        self._cut_matrix = np.full((len(self.cuts), width), np.inf)
+        for k, c in enumerate(self.cuts):
+            self._cut_matrix[k, :len(c)] = c
+        
+        n_features = len(self.feature_names)
+        self.counts = np.zeros(int(self.sizes.sum()), dtype=np.int64)
+        self.n = np.zeros(n_features, dtype=np.int64)
+        self.mean = np.zeros(n_features)
+        self.m2 = np.zeros(n_features)
+        self.min = np.full(n_features, np.inf)
+        self.max = np.full(n_features, -np.inf)
+        self.window_start: Optional[float] = None
+        self.window_end: Optional[float] = None
+        self.replicas: list[str] = []
+    
+    @classmethod
+    def from_reference(cls, reference_stats: dict, feature_names: list[str], model_version: Optional[str] = None):
+        """Empty sketch over the bins of DataDriftMonitor reference histograms."""
+        return cls(
+            feature_names,
+            [reference_stats[name]["histogram"]["cuts"] for name in feature_names],
+            model_version
+        )
+    
+    def update(self, row: np.ndarray):
+        """Add one row (values in feature_names order; NaN is missing)."""
+        row = np.asarray(row, dtype=np.float64)
+        present = ~np.isnan(row)
+        bins = (self._cut_matrix <= row[:, None]).sum(axis=1)
+        self.counts[np.where(present, bins + self.offsets, self.offsets + self.sizes - 1)] += 1
+        
+        self.n += present
+        delta = np.where(present, row - self.mean, 0.0)
+        self.mean += delta / np.maximum(self.n, 1)
+        self.m2 += delta * np.where(present, row - self.mean, 0.0)
+        self.min = np.fmin(self.min, row)
+        self.max = np.fmax(self.max, row)
+    
+    def update_matrix(self, X: np.ndarray):
+        """Add every row of a (rows, features) array."""
+        X = np.asarray(X, dtype=np.float64)
+        if not len(X):
+            return
+        missing = np.isnan(X)
+        codes = np.empty(X.shape, dtype=np.int64)
+        for k, cuts in enumerate(self.cuts):
+            codes[:, k] = np.searchsorted(cuts, X[:, k], side="right") + self.offsets[k]
+        codes[missing] = np.broadcast_to(self.offsets + self.sizes - 1, X.shape)[missing]
+        self.counts += np.bincount(codes.ravel(), minlength=len(self.counts))
+        
+        n = (~missing).sum(axis=0)
+        with np.errstate(all="ignore"):
+            mean = np.nan_to_num(np.nanmean(X, axis=0))
+            m2 = np.nan_to_num(np.nanvar(X, axis=0)) * n
+            low, high = np.nanmin(X, axis=0), np.nanmax(X, axis=0)
+        self._combine(n, mean, m2, low, high)
+    
+    def _combine(self, n, mean, m2, low, high):
+        """Fold in the moments of another sample (parallel variance formula)."""
+        total = self.n + n
+        delta = mean - self.mean
+        share = np.divide(n, total, out=np.zeros(len(total)), where=total > 0)
+        self.mean = self.mean + delta * share
+        self.m2 = self.m2 + m2 + delta ** 2 * self.n * share
+        self.n = total
+        self.min = np.fmin(self.min, low)
+        self.max = np.fmax(self.max, high)
+    
+    def merge(self, other: "FeatureSketch") -> "FeatureSketch":
+        """
+        Add another sketch over the same features and bins (e.g. another
+        replica's window) into this one.
+        
+        Returns:
+            self
+        """
+        if other.feature_names != self.feature_names or any(
+            not np.array_equal(a, b) for a, b in zip(other.cuts, self.cuts)
+        ):
+            raise ValueError("Sketches cover different features or bins")
+        if self.model_version and other.model_version and other.model_version != self.model_version:
+            raise ValueError(f"Cannot merge sketches of models {self.model_version} and {other.model_version}")
+        if self.model_id and other.model_id and other.model_id != self.model_id:
+            raise ValueError(
+                f"Cannot merge sketches of different models {self.model_id[:12]} and {other.model_id[:12]}"
+            )
+        
+        self.counts += other.counts
+        self._combine(other.n, other.mean, other.m2, other.min, other.max)
+        self.model_version = self.model_version or other.model_version
+        self.model_id = self.model_id or other.model_id
+        starts = [t for t in (self.window_start, other.window_start) if t is not None]
+        ends = [t for t in (self.window_end, other.window_end) if t is not None]
+        self.window_start = min(starts) if starts else None
+        self.window_end = max(ends) if ends else None
+        self.replicas = sorted(set(self.replicas) | set(other.replicas))
+        return self
+    
+    def value_counts(self, k: int) -> np.ndarray:
+        """Counts of feature k's value bins (missing excluded)."""
+        return self.counts[self.offsets[k]:self.offsets[k] + self.sizes[k] - 1]
+    
+    def stats(self) -> list[dict]:
+        """
+        Statistics per feature, as DataDriftMonitor.compute_stats; the
+        quartiles are interpolated within the sketch's bins.
+        """
+        stats = []
+        for k, cuts in enumerate(self.cuts):
+            low, high = (self.min[k], self.max[k]) if self.n[k] else (np.nan, np.nan)
+            counts = self.value_counts(k)
+            edges = np.concatenate([[min(low, cuts[0])], cuts, [max(high, cuts[-1])]]) \
+                if len(cuts) else np.array([low, high])
+            cdf = np.concatenate([[0.0], np.cumsum(counts)]) / max(counts.sum(), 1)
+            p25, median, p75 = np.interp([0.25, 0.5, 0.75], cdf, edges) if self.n[k] else (np.nan,) * 3
+            stats.append({
+                "mean": float(self.mean[k]) if self.n[k] else float("nan"),
+                "std": float(np.sqrt(self.m2[k] / self.n[k])) if self.n[k] else float("nan"),
+                "min": float(low),
+                "max": float(high),
+                "median": float(median),
+                "p25": float(p25),
+                "p75": float(p75),
+            })
+        return stats
+    
+    def to_dict(self) -> dict:
+        """JSON-serializable form (see from_dict)."""
+        return {
+            "format_version": SKETCH_FORMAT_VERSION,
+            "model_version": self.model_version,
+            "model_id": self.model_id,
+            "window_start": self.window_start,
+            "window_end": self.window_end,
+            "replicas": self.replicas,
+            "feature_names": self.feature_names,
+            "cuts": [c.tolist() for c in self.cuts],
+            "counts": self.counts.tolist(),
+            "n": self.n.tolist(),
+            "mean": self.mean.tolist(),
+            "m2": self.m2.tolist(),
+            "min": self.min.tolist(),
+            "max": self.max.tolist(),
+        }
+    
+    @classmethod
+    def from_dict(cls, data: dict) -> "FeatureSketch":
+        if data.get("format_version") != SKETCH_FORMAT_VERSION:
+            raise ValueError(f"Unsupported sketch format {data.get('format_version')}")
+        sketch = cls(data["feature_names"], data["cuts"], data.get("model_version"))
+        sketch.counts = np.asarray(data["counts"], dtype=np.int64)
+        sketch.n = np.asarray(data["n"], dtype=np.int64)
+        sketch.mean = np.asarray(data["mean"], dtype=np.float64)
+        sketch.m2 = np.asarray(data["m2"], dtype=np.float64)
+        sketch.min = np.asarray(data["min"], dtype=np.float64)
+        sketch.max = np.asarray(data["max"], dtype=np.float64)
+        sketch.window_start = data.get("window_start")
+        sketch.window_end = data.get("window_end")
+        sketch.replicas = list(data.get("replicas", []))
+        sketch.model_id = data.get("model_id")
+        return sketch
+
+
+def merge_sketch_files(paths: list) -> FeatureSketch:
+    """
+    Merge serialized sketches (e.g. every replica's file for one window).
+    
+    Args:
+        paths: JSON files written by FeatureSketch.to_dict
+    
+    Returns:
+        The merged sketch
+    """
+    merged = None
+    for path in paths:
+        with open(path) as f:
+            sketch = FeatureSketch.from_dict(json.load(f))
+        merged = sketch if merged is None else merged.merge(sketch)
+    if merged is None:
+        raise ValueError("No sketches to merge")
+    return merged
+
+
 class DataDriftMonitor:
     """
     Monitors feature distribution drift using statistical tests.
+    
+    Each reference distribution is kept as a quantile sketch (up to n_bins
+    reference quantiles used as bin cut points) and the histogram of the
+    reference data over those bins. Current data is binned on the same
+    cuts in one pass, and PSI, KS and Jensen-Shannon divergence are
+    computed from the two histograms for all features at once.
     """
     
-    def __init__(self, reference_stats: Optional[dict] = None):
+    def __init__(self, reference_stats: Optional[dict] = None, n_bins: int = 100, psi_bins: int = 10):
+        """
+        Args:
+            reference_stats: Saved reference_stats of another monitor
+            n_bins: Quantile bins per feature (KS / JS resolution)
+            psi_bins: PSI is computed over this many equal-mass groups of bins
+        """
         self.reference_stats = reference_stats or {}
+        self.n_bins = n_bins
+        self.psi_bins = psi_bins
         self.alerts = []
     
     def compute_stats(self, data: np.ndarray) -> dict:
         """Compute distribution statistics."""
+        data = np.asarray(data, dtype=np.float64)
+        p25, median, p75 = np.percentile(data, [25, 50, 75])
         return {
             "mean": float(np.mean(data)),
             "std": float(np.std(data)),
             "min": float(np.min(data)),
             "max": float(np.max(data)),
-            "median": float(np.median(data)),
-            "p25": float(np.percentile(data, 25)),
-            "p75": float(np.percentile(data, 75)),
+            "median": float(median),
+            "p25": float(p25),
+            "p75": float(p75),
         }
     
+    def compute_histogram(self, data: np.ndarray) -> dict:
+        """
+        Quantile sketch and histogram of a reference distribution.
+        
+        Returns:
+            {"cuts": ascending bin cut points (distinct reference quantiles),
+             "counts": values per bin (len(cuts) + 1), "missing": NaN count}
+        """
+        data = np.asarray(data, dtype=np.float64)
+        present = data[~np.isnan(data)]
+        cuts = np.unique(np.quantile(present, np.linspace(0, 1, self.n_bins + 1)[1:-1]))
+        counts = np.bincount(np.searchsorted(cuts, present, side="right"), minlength=len(cuts) + 1)
+        return {"cuts": cuts.tolist(), "counts": counts.tolist(), "missing": int(len(data) - len(present))}
+    
     def set_reference(self, feature_name: str, data: np.ndarray):
         """Set reference distribution for a feature."""
-        self.reference_stats[feature_name] = self.compute_stats(data)
+        data = np.asarray(data, dtype=np.float64)
+        present = data[~np.isnan(data)]
+        self.reference_stats[feature_name] = {
+            **self.compute_stats(present),
+            "histogram": self.compute_histogram(data),
+        }
         logger.info(f"Set reference for {feature_name}")
     
+    def set_reference_matrix(self, X: np.ndarray, feature_names: list[str]):
+        """Set references for every column of a (rows, features) array."""
+        X = np.asarray(X, dtype=np.float64)
+        for j, feature_name in enumerate(feature_names):
+            self.set_reference(feature_name, X[:, j])
+    
     def check_drift(
         self,
         feature_name: str,
@@ -56,34 +328,163 @@ class DataDriftMonitor:
         Returns:
             Drift report dict
         """
-        if feature_name not in self.reference_stats:
-            return {"error": f"No reference for {feature_name}"}
+        current = np.asarray(current_data, dtype=np.float64).reshape(-1, 1)
+        return self.check_drift_matrix(current, [feature_name], threshold)[feature_name]
+    
+    def check_drift_matrix(
+        self,
+        X: np.ndarray,
+        feature_names: list[str],
+        threshold: float = 0.1,
+        chunk_rows: int = 1_000_000
+    ) -> dict:
+        """
+        Check every column of a (rows, features) array in one pass.
+        
+        Args:
+            X: Current data, columns in feature_names order
+            feature_names: Feature of each column
+            threshold: PSI threshold (>0.1 = drift, >0.2 = significant)
+            chunk_rows: Rows binned at a time (bounds temporary memory)
+            
+        Returns:
+            Drift report dict per feature
+        """
+        X = np.asarray(X, dtype=np.float64)
+        reports = self._reference_errors(feature_names)
+        columns = [j for j, name in enumerate(feature_names) if name not in reports]
+        if not columns:
+            return reports
+        
+        sketch = self.sketch([feature_names[j] for j in columns])
+        for start in range(0, len(X), chunk_rows):
+            sketch.update_matrix(X[start:start + chunk_rows, columns])
+        reports.update(self.check_drift_sketch(sketch, threshold))
+        return reports
+    
+    def sketch(self, feature_names: list[str], model_version: Optional[str] = None) -> FeatureSketch:
+        """Empty streaming sketch over the reference bins of feature_names."""
+        return FeatureSketch.from_reference(self.reference_stats, feature_names, model_version)
+    
+    def _reference_errors(self, feature_names: list[str]) -> dict:
+        """Error reports for features without a usable reference."""
+        errors = {}
+        for name in feature_names:
+            if name not in self.reference_stats:
+                errors[name] = {"error": f"No reference for {name}"}
+            elif "histogram" not in self.reference_stats[name]:
+                errors[name] = {"error": f"Reference for {name} has no histogram; set it again"}
+        return errors
+    
+    def check_drift_sketch(self, sketch: FeatureSketch, threshold: float = 0.1) -> dict:
+        """
+        Check drift of streamed data, e.g. a window merged across replicas.
         
-        ref = self.reference_stats[feature_name]
-        current = self.compute_stats(current_data)
+        Args:
+            sketch: Sketch built over this monitor's reference bins
+            threshold: PSI threshold (>0.1 = drift, >0.2 = significant)
+            
+        Returns:
+            Drift report dict per feature
+        """
+        reports = self._reference_errors(sketch.feature_names)
+        columns = [k for k, name in enumerate(sketch.feature_names) if name not in reports]
+        if not columns:
+            return reports
         
-        # Simple mean shift detection
-        mean_shift = abs(current["mean"] - ref["mean"]) / (ref["std"] + 1e-6)
-        std_ratio = current["std"] / (ref["std"] + 1e-6)
+        names = [sketch.feature_names[k] for k in columns]
+        histograms = [self.reference_stats[name]["histogram"] for name in names]
+        for k, histogram in zip(columns, histograms):
+            if not np.array_equal(sketch.cuts[k], histogram["cuts"]):
+                raise ValueError(f"Sketch bins of {sketch.feature_names[k]} do not match the reference")
         
-        drift_detected = mean_shift > 2.0 or std_ratio > 2.0 or std_ratio < 0.5
+        reference = np.concatenate([h["counts"] + [h["missing"]] for h in histograms]).astype(np.float64)
+        current = np.concatenate([
+            sketch.counts[sketch.offsets[k]:sketch.offsets[k] + sketch.sizes[k]] for k in columns
+        ]).astype(np.float64)
+        scores = self._compare_histograms(reference, current, sketch.sizes[columns])
+        stats = sketch.stats()
         
-        report = {
-            "feature": feature_name,
-            "timestamp": datetime.utcnow().isoformat(),
-            "reference": ref,
-            "current": current,
-            "mean_shift_zscore": float(mean_shift),
-            "std_ratio": float(std_ratio),
-            "drift_detected": drift_detected,
-            "severity": "high" if mean_shift > 3.0 else "medium" if drift_detected else "low"
-        }
+        timestamp = datetime.utcnow().isoformat()
+        for i, (k, name) in enumerate(zip(columns, names)):
+            ref = {key: value for key, value in self.reference_stats[name].items() if key != "histogram"}
+            cur = stats[k]
+            mean_shift = abs(cur["mean"] - ref["mean"]) / (ref["std"] + 1e-6)
+            std_ratio = cur["std"] / (ref["std"] + 1e-6)
+            psi = float(scores["psi"][i])
+            drift_detected = psi > threshold
+            
+            report = {
+                "feature": name,
+                "timestamp": timestamp,
+                "reference": ref,
+                "current": cur,
+                "psi": psi,
+                "ks": float(scores["ks"][i]),
+                "js_divergence": float(scores["js"][i]),
+                "mean_shift_zscore": float(mean_shift),
+                "std_ratio": float(std_ratio),
+                "drift_detected": drift_detected,
+                "severity": "high" if psi > ALERT_THRESHOLDS["drift_psi"] else "medium" if drift_detected else "low"
+            }
+            
+            if drift_detected:
+                self.alerts.append(report)
+                logger.warning(f"Drift detected for {name}: PSI={psi:.3f}")
+            reports[name] = report
+        
+        return reports
+    
+    def _compare_histograms(self, reference: np.ndarray, current: np.ndarray, sizes: np.ndarray) -> dict:
+        """
+        PSI, KS and JS divergence per feature from end-to-end bin counts.
+        
+        PSI uses psi_bins groups of roughly equal reference mass (plus
+        missing), KS the CDF over the value bins, JS all bins (base 2).
+        """
+        n_features = len(sizes)
+        feature = np.repeat(np.arange(n_features), sizes)
+        position = np.arange(len(feature)) - np.repeat(np.cumsum(sizes) - sizes, sizes)
+        is_missing = position == sizes[feature] - 1
+        
+        ref_p = reference / np.maximum(np.bincount(feature, reference, n_features), 1)[feature]
+        cur_p = current / np.maximum(np.bincount(feature, current, n_features), 1)[feature]
+        
+        # PSI groups: reference CDF before each value bin, cut into psi_bins
+        ref_value = np.where(is_missing, 0.0, reference)
+        ref_value_total = np.maximum(np.bincount(feature, ref_value, n_features), 1)[feature]
+        before = (self._segment_cumsum(ref_value, sizes) - ref_value) / ref_value_total
+        group = np.where(is_missing, self.psi_bins, np.minimum((before * self.psi_bins).astype(np.int64), self.psi_bins - 1))
+        group_id = feature * (self.psi_bins + 1) + group
+        n_groups = n_features * (self.psi_bins + 1)
+        r = np.maximum(np.bincount(group_id, ref_p, n_groups), 1e-4)
+        c = np.maximum(np.bincount(group_id, cur_p, n_groups), 1e-4)
+        psi = np.bincount(np.arange(n_groups) // (self.psi_bins + 1), (c - r) * np.log(c / r), n_features)
+        
+        # KS over value bins (missing values excluded)
+        ref_cdf = self._segment_cumsum(ref_value, sizes) / ref_value_total
+        cur_value = np.where(is_missing, 0.0, current)
+        cur_cdf = self._segment_cumsum(cur_value, sizes) / np.maximum(np.bincount(feature, cur_value, n_features), 1)[feature]
+        ks = np.zeros(n_features)
+        np.maximum.at(ks, feature, np.abs(ref_cdf - cur_cdf))
         
-        if drift_detected:
-            self.alerts.append(report)
-            logger.warning(f"Drift detected for {feature_name}: shift={mean_shift:.2f}")
+        # Jensen-Shannon divergence
+        m = (ref_p + cur_p) / 2
+        with np.errstate(divide="ignore", invalid="ignore"):
+            terms = (
+                np.where(ref_p > 0, ref_p * np.log2(ref_p / m), 0.0)
+                + np.where(cur_p > 0, cur_p * np.log2(cur_p / m), 0.0)
+            ) / 2
+        js = np.bincount(feature, terms, n_features)
         
-        return report
+        return {"psi": psi, "ks": ks, "js": js}
+    
+    @staticmethod
+    def _segment_cumsum(values: np.ndarray, sizes: np.ndarray) -> np.ndarray:
+        """Cumulative sum restarting at each feature's first bin."""
+        total = np.cumsum(values)
+        starts = np.cumsum(sizes) - sizes
+        return total - np.repeat(total[starts] - values[starts], sizes)
 
 
 class PerformanceMonitor:
@@ -95,38 +496,79 @@ class PerformanceMonitor:
         self.metrics_history = []
         self.decay_threshold = 0.05  # 5% performance drop
     
-    def log_metrics(self, metrics: dict):
-        """Log metrics snapshot."""
+    def log_metrics(self, metrics: dict, segment: Optional[str] = None):
+        """Log metrics snapshot, optionally for one segment (e.g. "dpd_band=90+")."""
         entry = {
             "timestamp": datetime.utcnow().isoformat(),
             **metrics
         }
+        if segment is not None:
+            entry["segment"] = segment
         self.metrics_history.append(entry)
     
-    def check_decay(self, baseline_metric: str = "f1_weighted") -> dict:
+    def ingest_slice_report(self, path: str) -> int:
+        """
+        Log every segment of a sliced evaluation.
+        
+        Reads slice_metrics.json or slice_metrics.parquet as written by
+        ml/models/baseline/eval.py (one row per slice segment).
+        
+        Returns:
+            Number of segments logged
+        """
+        path = Path(path)
+        if path.suffix == ".parquet":
+            import pandas as pd
+            
+            rows = pd.read_parquet(path).to_dict("records")
+        else:
+            with open(path) as f:
+                rows = json.load(f)
+        
+        for row in rows:
+            metrics = {k: v for k, v in row.items() if k not in ("slice", "segment")}
+            self.log_metrics(metrics, segment=f"{row['slice']}={row['segment']}")
+        return len(rows)
+    
+    def segments(self) -> list[str]:
+        """Segments with logged metrics."""
+        return sorted({m["segment"] for m in self.metrics_history if "segment" in m})
+    
+    def check_decay(self, baseline_metric: str = "f1_weighted", segment: Optional[str] = None) -> dict:
         """
         Check for performance decay vs baseline.
         
+        Args:
+            baseline_metric: Metric to compare
+            segment: Compare this segment's history instead of the global one
+        
         Returns:
             Decay report dict
         """
-        if len(self.metrics_history) < 2:
+        history = [m for m in self.metrics_history if m.get("segment") == segment]
+        if len(history) < 2:
             return {"error": "Insufficient history"}
         
-        baseline = self.metrics_history[0].get(baseline_metric, 0)
-        current = self.metrics_history[-1].get(baseline_metric, 0)
+        baseline = history[0].get(baseline_metric, 0)
+        current = history[-1].get(baseline_metric, 0)
         
         decay = (baseline - current) / (baseline + 1e-6)
         decay_detected = decay > self.decay_threshold
         
         return {
             "metric": baseline_metric,
+            "segment": segment,
             "baseline": baseline,
             "current": current,
             "decay_percent": float(decay * 100),
             "decay_detected": decay_detected,
             "action": "retrain" if decay_detected else "none"
         }
+    
+    def check_segment_decay(self, baseline_metric: str = "f1_weighted") -> list[dict]:
+        """Decay reports for every segment with enough history."""
+        reports = [self.check_decay(baseline_metric, segment) for segment in self.segments()]
+        return [r for r in reports if "error" not in r]
 
 
 # Alert thresholds
@@ -137,3 +579,34 @@ ALERT_THRESHOLDS = {
     "error_rate": 0.01,
     "confidence_low_rate": 0.1,
 }
+
+
+def main(argv=None):
+    """Drift report of merged serving sketches against a training reference."""
+    parser = argparse.ArgumentParser(description="Drift of merged serving sketches")
+    parser.add_argument('--reference', type=Path, required=True,
+                        help="drift_reference.json saved with the model")
+    parser.add_argument('--sketches', nargs='+', required=True,
+                        help="Sketch files or glob patterns (one window, all replicas)")
+    parser.add_argument('--threshold', type=float, default=0.1, help="PSI drift threshold")
+    args = parser.parse_args(argv)
+    
+    paths = sorted({path for pattern in args.sketches for path in glob.glob(pattern)})
+    sketch = merge_sketch_files(paths)
+    with open(args.reference) as f:
+        monitor = DataDriftMonitor(json.load(f))
+    reports = monitor.check_drift_sketch(sketch, args.threshold)
+    
+    print(json.dumps({
+        "model_version": sketch.model_version,
+        "model_id": sketch.model_id,
+        "window_start": sketch.window_start,
+        "window_end": sketch.window_end,
+        "replicas": sketch.replicas,
+        "features": reports,
+    }, indent=2))
+    return 1 if monitor.alerts else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,258 @@
+"""
+Read-Through Feature Cache
+In-process LRU tier with per-FeatureView TTLs in front of a backing store.
+"""
+
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Optional, Protocol
+
+import numpy as np
+
+
+# Mirrors the FeatureView ttl values in ml/features/contracts/*.py
+FEATURE_VIEW_TTLS = {
+    "account_features": 1 * 24 * 3600,
+    "payment_history": 7 * 24 * 3600,
+    "creator_identity_v1": 365 * 24 * 3600,
+    "creator_preferences_v1": 30 * 24 * 3600,
+}
+
+# FeatureViews served by this service and the features each one provides
+SERVED_FEATURE_VIEWS = {
+    "account_features": [
+        "days_past_due",
+        "outstanding_balance",
+        "contact_attempts",
+        "last_payment_days_ago",
+        "account_age_months",
+    ],
+    "payment_history": ["payment_history_score"],
+}
+
+_MISSING = object()
+
+
+class FeatureBackend(Protocol):
+    """Backing store behind the cache."""
+
+    async def fetch(self, account_ids: list[str], features: list[str]) -> dict[str, Optional[dict]]:
+        """Return {account_id: {feature: value} or None if unknown}."""
+        ...
+
+
+class MmapBackend:
+    """Backend over the memory-mapped local online store."""
+
+    def __init__(self, store):
+        self.store = store
+
+    async def fetch(self, account_ids: list[str], features: list[str]) -> dict[str, Optional[dict]]:
+        values, found = self.store.get_many(account_ids, features)
+        columns = {name: values[name].tolist() for name in values}
+        return {
+            account_id: {name: column[i] for name, column in columns.items()} if found[i] else None
+            for i, account_id in enumerate(account_ids)
+        }
+
+
+class StaticBackend:
+    """Backend over an in-memory {account_id: {feature: value}} mapping (dev/testing)."""
+
+    def __init__(self, rows: dict[str, dict]):
+        self.rows = rows
+
+    async def fetch(self, account_ids: list[str], features: list[str]) -> dict[str, Optional[dict]]:
+        return {
+            account_id: (
+                {name: self.rows[account_id][name] for name in features if name in self.rows[account_id]}
+                if account_id in self.rows else None
+            )
+            for account_id in account_ids
+        }
+
+
+class LRUTTLCache:
+    """
+    Bounded LRU map whose entries also expire after a per-entry TTL.
+    """
+
+    def __init__(self, max_entries: int, clock: Callable[[], float] = time.monotonic):
+        self.max_entries = max_entries
+        self.clock = clock
+        self._entries: OrderedDict[Any, tuple[float, Any]] = OrderedDict()
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key) -> Any:
+        """Return the cached value, or _MISSING if absent or expired."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return _MISSING
+        expires_at, value = entry
+        if expires_at <= self.clock():
+            del self._entries[key]
+            self.expirations += 1
+            return _MISSING
+        self._entries.move_to_end(key)
+        return value
+
+    def put(self, key, value, ttl: float):
+        self._entries[key] = (self.clock() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        self._entries.clear()
+
+
+class ReadThroughFeatureCache:
+    """
+    Two-tier feature lookup: in-process LRU/TTL cache, then the backend.
+
+    Entries are cached per (FeatureView, account_id) with that view's TTL,
+    so a stale account_features row is refetched without dropping a still
+    valid payment_history row. Unknown accounts are cached for
+    negative_ttl seconds. Concurrent misses for the same key share one
+    in-flight backend fetch.
+    """
+
+    def __init__(
+        self,
+        backend: FeatureBackend,
+        max_entries: int = 100_000,
+        negative_ttl: float = 60.0,
+        view_ttls: dict[str, float] = FEATURE_VIEW_TTLS,
+        views: dict[str, list[str]] = SERVED_FEATURE_VIEWS,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.backend = backend
+        self.negative_ttl = negative_ttl
+        self.view_ttls = view_ttls
+        self.views = views
+        self._cache = LRUTTLCache(max_entries, clock)
+        self._inflight: dict[tuple[str, str], asyncio.Future] = {}
+        # Bumped by clear(); fetches started before a clear are not cached
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.backend_fetches = 0
+
+    async def get(self, account_id: str) -> tuple[Optional[dict], bool]:
+        """
+        Get features for one account.
+
+        Returns:
+            (features dict or None if unknown, cache_hit)
+        """
+        rows, hits = await self.get_many([account_id])
+        return rows[0], bool(hits[0])
+
+    async def get_many(self, account_ids: list[str]) -> tuple[list[Optional[dict]], np.ndarray]:
+        """
+        Get features for many accounts, fetching all misses per view at once.
+
+        Returns:
+            (features dict or None per account, cache_hit mask)
+        """
+        hits = np.ones(len(account_ids), dtype=bool)
+        per_view: dict[str, list] = {}
+
+        for view in self.views:
+            values = [self._cache.get((view, account_id)) for account_id in account_ids]
+            missing = [i for i, v in enumerate(values) if v is _MISSING]
+            if missing:
+                hits[missing] = False
+                loaded = await self._load(view, list(dict.fromkeys(account_ids[i] for i in missing)))
+                for i in missing:
+                    values[i] = loaded[account_ids[i]]
+            per_view[view] = values
+
+        hit_count = int(hits.sum())
+        self.hits += hit_count
+        self.misses += len(account_ids) - hit_count
+
+        rows = []
+        for i in range(len(account_ids)):
+            parts = [per_view[view][i] for view in self.views]
+            if all(part is None for part in parts):
+                rows.append(None)
+            else:
+                rows.append({k: v for part in parts if part for k, v in part.items()})
+        return rows, hits
+
+    async def _load(self, view: str, account_ids: list[str]) -> dict[str, Optional[dict]]:
+        """Fetch one view for cache misses, coalescing with in-flight fetches."""
+        loop = asyncio.get_running_loop()
+        waiting = {}
+        leading = {}
+        for account_id in account_ids:
+            key = (view, account_id)
+            if key in self._inflight:
+                waiting[account_id] = self._inflight[key]
+                self.coalesced += 1
+            else:
+                leading[account_id] = self._inflight[key] = loop.create_future()
+
+        results = {}
+        if leading:
+            generation = self.generation
+            self.backend_fetches += 1
+            try:
+                fetched = await self.backend.fetch(list(leading), self.views[view])
+                ttl = self.view_ttls[view]
+                for account_id, future in leading.items():
+                    value = fetched.get(account_id)
+                    if generation == self.generation:
+                        self._cache.put((view, account_id), value, ttl if value is not None else self.negative_ttl)
+                    future.set_result(value)
+                    results[account_id] = value
+            except Exception as e:
+                for future in leading.values():
+                    if not future.done():
+                        future.set_exception(e)
+                        future.exception()  # Mark retrieved; waiters re-raise it
+                raise
+            finally:
+                # Also reached when this fetch is cancelled: waiters then see a
+                # cancelled future and fetch again themselves
+                for account_id, future in leading.items():
+                    if self._inflight.get((view, account_id)) is future:
+                        del self._inflight[(view, account_id)]
+                    future.cancel()
+
+        for account_id, future in waiting.items():
+            try:
+                # Shielded: a cancelled waiter must not cancel the shared fetch
+                results[account_id] = await asyncio.shield(future)
+            except asyncio.CancelledError:
+                if not future.cancelled() or asyncio.current_task().cancelling():
+                    raise
+                results.update(await self._load(view, [account_id]))
+        return results
+
+    def clear(self):
+        """Drop all cached entries (e.g. after a new materialization)."""
+        self.generation += 1
+        self._cache.clear()
+
+    def stats(self) -> dict:
+        """Cache counters for health/metrics endpoints."""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self._cache.evictions,
+            "expirations": self._cache.expirations,
+            "coalesced": self.coalesced,
+            "backend_fetches": self.backend_fetches,
+            "entries": len(self._cache),
+        }
@@ -4,13 +4,21 @@ Provides feature vectors for inference.
 """
 
 import os
+import asyncio
 import logging
 from datetime import datetime
 from contextlib import asynccontextmanager
 
+from typing import Literal
+
+import numpy as np
 from fastapi import FastAPI
+from fastapi.responses import JSONResponse, PlainTextResponse
 from pydantic import BaseModel
 
+from feature_cache import MmapBackend, ReadThroughFeatureCache, StaticBackend
+from online_store import MmapOnlineStore
+
 # Configure structured logging
 logging.basicConfig(
     level=os.getenv("LOG_LEVEL", "INFO"),
@@ -27,6 +35,12 @@ class Config:
     SERVICE_NAME = "feature-service"
     SERVICE_VERSION = "0.1.0"
     FEATURE_STORE_URL = os.getenv("FEATURE_STORE_URL", "")
+    # Local memory-mapped store written by ml/features/online_store.py
+    ONLINE_STORE_PATH = os.getenv("ONLINE_STORE_PATH", "")
+    # How often to check the store for a newly materialized generation
+    ONLINE_STORE_REFRESH_SECONDS = float(os.getenv("ONLINE_STORE_REFRESH_SECONDS", "5"))
+    CACHE_MAX_ENTRIES = int(os.getenv("FEATURE_CACHE_MAX_ENTRIES", "100000"))
+    CACHE_NEGATIVE_TTL_SECONDS = float(os.getenv("FEATURE_CACHE_NEGATIVE_TTL_SECONDS", "60"))
 
 
 # =============================================================================
@@ -38,6 +52,8 @@ class HealthResponse(BaseModel):
     service: str
     version: str
     feature_store_connected: bool = False
+    cache_hit_rate: float = 0.0
+    cache: dict = {}
     timestamp: str
 
 
@@ -93,14 +109,111 @@ MOCK_FEATURES = {
 }
 
 
+# =============================================================================
+# Online Store
+# =============================================================================
+
+online_store: MmapOnlineStore | None = None
+feature_cache: ReadThroughFeatureCache | None = None
+
+FEATURE_FIELDS = [name for name in FeatureVector.model_fields if name != "account_id"]
+FEATURE_DEFAULTS = {name: FeatureVector.model_fields[name].default for name in FEATURE_FIELDS}
+
+# (stat name, Prometheus metric type) exported on /metrics
+METRICS = [
+    ("hits", "counter"),
+    ("misses", "counter"),
+    ("evictions", "counter"),
+    ("expirations", "counter"),
+    ("coalesced", "counter"),
+    ("backend_fetches", "counter"),
+    ("entries", "gauge"),
+    ("hit_rate", "gauge"),
+]
+
+
+def build_feature_cache() -> ReadThroughFeatureCache:
+    """Cache in front of the local online store when configured, otherwise mock data."""
+    if online_store is not None:
+        backend = MmapBackend(online_store)
+    else:
+        backend = StaticBackend({
+            account_id: features.model_dump(exclude={"account_id"})
+            for account_id, features in MOCK_FEATURES.items()
+        })
+    return ReadThroughFeatureCache(
+        backend,
+        max_entries=Config.CACHE_MAX_ENTRIES,
+        negative_ttl=Config.CACHE_NEGATIVE_TTL_SECONDS
+    )
+
+
+def refresh_online_store() -> bool:
+    """Switch to a newly materialized store generation and drop cached rows of the old one."""
+    if online_store is None or not online_store.refresh():
+        return False
+    feature_cache.clear()
+    logger.info(f"Serving online store generation {online_store.generation} ({len(online_store)} accounts)")
+    return True
+
+
+async def refresh_periodically():
+    while True:
+        await asyncio.sleep(Config.ONLINE_STORE_REFRESH_SECONDS)
+        try:
+            refresh_online_store()
+        except Exception as e:
+            logger.error(f"Online store refresh failed, still serving {online_store.generation}: {e}")
+
+
+async def lookup_features(account_id: str) -> tuple[FeatureVector, bool, bool]:
+    """
+    Resolve features for one account through the cache.
+    
+    Returns (features, found, cache_hit); unknown accounts get default features.
+    """
+    row, cache_hit = await feature_cache.get(account_id)
+    if row is None:
+        return FeatureVector(account_id=account_id), False, cache_hit
+    return FeatureVector(account_id=account_id, **row), True, cache_hit
+
+
+async def lookup_features_batch(account_ids: list[str]) -> tuple[dict[str, list], np.ndarray, np.ndarray]:
+    """
+    Resolve features for many accounts; all cache misses are fetched from
+    the backing store in one vectorized lookup per FeatureView.
+    
+    Returns:
+        ({feature: values in request order}, found mask, cache_hit mask);
+        missing accounts get the FeatureVector defaults
+    """
+    rows, cache_hits = await feature_cache.get_many(account_ids)
+    found = np.fromiter((row is not None for row in rows), dtype=bool, count=len(rows))
+    columns = {
+        name: [row.get(name, default) if row else default for row in rows]
+        for name, default in FEATURE_DEFAULTS.items()
+    }
+    return columns, found, cache_hits
+
+
 # =============================================================================
 # Application
 # =============================================================================
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    global online_store, feature_cache
     logger.info(f"Starting {Config.SERVICE_NAME} v{Config.SERVICE_VERSION}")
+    if Config.ONLINE_STORE_PATH and os.path.exists(os.path.join(Config.ONLINE_STORE_PATH, "CURRENT")):
+        online_store = MmapOnlineStore(Config.ONLINE_STORE_PATH)
+        logger.info(f"Serving features from local online store ({len(online_store)} accounts)")
+    else:
+        logger.info("No online store configured, serving mock features")
+    feature_cache = build_feature_cache()
+    refresher = asyncio.create_task(refresh_periodically()) if online_store is not None else None
     yield
+    if refresher:
+        refresher.cancel()
     logger.info(f"Shutting down {Config.SERVICE_NAME}")
 
 
@@ -118,30 +231,39 @@ app = FastAPI(
 @app.get("/health", response_model=HealthResponse)
 async def health_check():
     """Health check endpoint."""
+    stats = feature_cache.stats() if feature_cache else {}
     return HealthResponse(
         status="healthy",
         service=Config.SERVICE_NAME,
         version=Config.SERVICE_VERSION,
-        feature_store_connected=False,  # TODO: Check feature store
+        feature_store_connected=online_store is not None,
+        cache_hit_rate=stats.get("hit_rate", 0.0),
+        cache=stats,
         timestamp=datetime.utcnow().isoformat()
     )
 
 
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Cache counters in Prometheus text format."""
+    stats = feature_cache.stats() if feature_cache else {}
+    lines = []
+    for name, kind in METRICS:
+        metric = f"feature_cache_{name}" + ("_total" if kind == "counter" else "")
+        lines.append(f"# TYPE {metric} {kind}")
+        lines.append(f"{metric} {stats.get(name, 0)}")
+    return "\n".join(lines) + "\n"
+
+
 @app.get("/v1/features/{account_id}", response_model=FeatureResponse)
 async def get_features(account_id: str):
     """
     Get features for a single account.
-    STUB: Returns mock data or default features.
+    Unknown accounts get default features.
     """
     logger.info(f"Getting features for account: {account_id}")
     
-    if account_id in MOCK_FEATURES:
-        features = MOCK_FEATURES[account_id]
-        cache_hit = True
-    else:
-        # Return default features for unknown accounts
-        features = FeatureVector(account_id=account_id)
-        cache_hit = False
+    features, _, cache_hit = await lookup_features(account_id)
     
     return FeatureResponse(
         account_id=account_id,
@@ -152,31 +274,46 @@ async def get_features(account_id: str):
 
 
 @app.post("/v1/features/batch")
-async def get_features_batch(account_ids: list[str]):
+async def get_features_batch(
+    account_ids: list[str],
+    format: Literal["records", "columnar"] = "records"
+):
     """
     Get features for multiple accounts.
-    STUB: Returns mock/default data.
+    
+    Cache misses are fetched in one vectorized store lookup and all results
+    share one computed_at. Unknown accounts get default features and are listed in
+    not_found. format=columnar returns one array per feature instead of
+    one object per account, which is much cheaper for large batches.
     """
     logger.info(f"Getting features for {len(account_ids)} accounts")
     
-    results = []
-    not_found = []
+    columns, found, cache_hits = await lookup_features_batch(account_ids)
+    computed_at = datetime.utcnow().isoformat()
+    not_found = [a for a, ok in zip(account_ids, found) if not ok]
     
-    for account_id in account_ids:
-        if account_id in MOCK_FEATURES:
-            results.append(FeatureResponse(
-                account_id=account_id,
-                features=MOCK_FEATURES[account_id],
-                computed_at=datetime.utcnow().isoformat(),
-                cache_hit=True
-            ))
-        else:
-            results.append(FeatureResponse(
+    if format == "columnar":
+        return JSONResponse({
+            "account_ids": account_ids,
+            "features": columns,
+            "found": found.tolist(),
+            "cache_hit": cache_hits.tolist(),
+            "not_found": not_found,
+            "computed_at": computed_at,
+        })
+    
+    results = [
+        FeatureResponse(
+            account_id=account_id,
+            features=FeatureVector(
                 account_id=account_id,
-                features=FeatureVector(account_id=account_id),
-                computed_at=datetime.utcnow().isoformat(),
-                cache_hit=False
-            ))
+                **{name: columns[name][i] for name in FEATURE_FIELDS}
+            ),
+            computed_at=computed_at,
+            cache_hit=bool(cache_hits[i])
+        )
+        for i, account_id in enumerate(account_ids)
+    ]
     
     return {"results": results, "not_found": not_found}
 
@@ -0,0 +1,130 @@
+"""
+Memory-Mapped Online Store Reader
+Serves feature rows materialized by ml/features/online_store.py.
+
+The on-disk layout (CURRENT pointer, per-generation meta.json,
+account_id.npy, index.npy and columns/<feature>.npy) and the FNV-1a id hash
+must stay in sync with the writer in ml/features/online_store.py.
+"""
+
+import json
+import logging
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+FORMAT_VERSION = 1
+
+_FNV_OFFSET = np.uint64(0xcbf29ce484222325)
+_FNV_PRIME = np.uint64(0x100000001b3)
+
+
+def hash_ids(ids: np.ndarray) -> np.ndarray:
+    """64-bit FNV-1a over fixed-width byte strings, vectorized across rows."""
+    codes = ids.view(np.uint8).reshape(len(ids), ids.dtype.itemsize)
+    h = np.full(len(ids), _FNV_OFFSET, dtype=np.uint64)
+    for j in range(codes.shape[1]):
+        h ^= codes[:, j]
+        h *= _FNV_PRIME
+    return h
+
+
+class MmapOnlineStore:
+    """
+    Zero-copy reader for the local online store.
+
+    The index and feature columns are memory-mapped, so opening the store
+    costs O(1) regardless of how many accounts it holds, and lookups only
+    touch the pages they need.
+    """
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self.generation: Optional[str] = None
+        self._current_mtime: Optional[int] = None
+        self.refresh()
+
+    def refresh(self) -> bool:
+        """
+        Re-open the store if a newer generation was materialized.
+
+        Costs one stat() while the CURRENT pointer is unchanged. The previous
+        generation's arrays are dropped, so its memory maps close once no
+        lookup holds them any more.
+        """
+        mtime = (self.path / "CURRENT").stat().st_mtime_ns
+        if mtime == self._current_mtime:
+            return False
+        generation = (self.path / "CURRENT").read_text().strip()
+        if generation == self.generation:
+            self._current_mtime = mtime
+            return False
+
+        gen_dir = self.path / generation
+        meta = json.loads((gen_dir / "meta.json").read_text())
+        if meta["version"] != FORMAT_VERSION:
+            raise ValueError(f"Unsupported online store format: {meta['version']}")
+
+        self.meta = meta
+        self.feature_names = [f["name"] for f in meta["features"]]
+        self.account_ids = np.load(gen_dir / "account_id.npy", mmap_mode="r")
+        self.index = np.load(gen_dir / "index.npy", mmap_mode="r")
+        self.columns = {
+            name: np.load(gen_dir / "columns" / f"{name}.npy", mmap_mode="r")
+            for name in self.feature_names
+        }
+        self.generation = generation
+        self._current_mtime = mtime
+        logger.info(f"Opened online store generation {generation} ({meta['num_rows']} rows)")
+        return True
+
+    def __len__(self) -> int:
+        return self.meta["num_rows"]
+
+    def lookup(self, account_ids: list[str]) -> np.ndarray:
+        """Map account ids to row numbers (-1 when not found)."""
+        width = self.meta["id_width"]
+        encoded = np.char.encode(np.asarray(account_ids, dtype=str), "utf-8")
+        fits = np.char.str_len(encoded) <= width
+        keys = encoded.astype(f"S{width}")
+
+        mask = np.uint64(len(self.index) - 1)
+        slots = hash_ids(keys) & mask
+        rows = np.full(len(keys), -1, dtype=np.int64)
+        if self.meta["num_rows"] == 0:
+            return rows
+        pending = np.flatnonzero(fits)
+        while pending.size:
+            candidates = self.index[slots[pending]]
+            empty = candidates < 0
+            hit = ~empty & (self.account_ids[np.where(empty, 0, candidates)] == keys[pending])
+            rows[pending[hit]] = candidates[hit]
+            pending = pending[~empty & ~hit]
+            slots[pending] = (slots[pending] + np.uint64(1)) & mask
+        return rows
+
+    def get(self, account_id: str) -> Optional[dict]:
+        """Get one account's features as a dict, or None if absent."""
+        row = self.lookup([account_id])[0]
+        if row < 0:
+            return None
+        return {name: column[row].item() for name, column in self.columns.items()}
+
+    def get_many(self, account_ids: list[str], features: Optional[list[str]] = None) -> tuple[dict, np.ndarray]:
+        """
+        Vectorized lookup of many accounts.
+
+        Returns:
+            ({feature: values array}, found mask); values for missing rows
+            are undefined and should be masked by the caller
+        """
+        rows = self.lookup(account_ids)
+        found = rows >= 0
+        safe_rows = np.where(found, rows, 0)
+        names = [n for n in (features or self.feature_names) if n in self.columns]
+        if not len(self):
+            return {name: np.zeros(len(rows), dtype=self.columns[name].dtype) for name in names}, found
+        return {name: self.columns[name][safe_rows] for name in names}, found
@@ -0,0 +1,362 @@
+"""
+XGBoost Booster Model
+Serves the booster written by ml/models/baseline/train.py.
+
+Expects the artifacts layout from save_artifacts(): model.pack, or
+model.json (booster) and metadata.json (version, feature_names,
+label_classes, ...). model.pack is preferred when present. The optional
+drift_reference.json holds the training distributions for drift sketches.
+"""
+
+import hashlib
+import json
+import logging
+import mmap
+import operator
+import os
+import struct
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+import numpy as np
+import xgboost as xgb
+
+from drift_sketch import load_drift_reference
+
+logger = logging.getLogger(__name__)
+
+# Packed artifact format of ml/models/baseline/packing.py
+PACK_FILE = "model.pack"
+PACK_MAGIC = b"INFLPACK"
+PACK_VERSION = 1
+PACK_ALIGNMENT = 64
+_PACK_PREAMBLE = struct.Struct("<8sII")
+
+
+def read_model_pack(path: Path) -> dict:
+    """
+    Memory-map model.pack: parse its JSON header, load the UBJ booster
+    from the mapped bytes and view the explainer arrays without copying.
+
+    Returns:
+        Dict with metadata, booster, split_thresholds and the mmap backing
+        the arrays
+    """
+    with open(path, "rb") as f:
+        buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    magic, version, header_length = _PACK_PREAMBLE.unpack_from(buffer, 0)
+    if magic != PACK_MAGIC or version != PACK_VERSION:
+        raise ValueError(f"{path} is not a version {PACK_VERSION} model pack")
+    header = json.loads(bytes(buffer[_PACK_PREAMBLE.size:_PACK_PREAMBLE.size + header_length]))
+    data_start = -(-(_PACK_PREAMBLE.size + header_length) // PACK_ALIGNMENT) * PACK_ALIGNMENT
+    sections = header["sections"]
+
+    def section(name: str) -> memoryview:
+        start = data_start + sections[name]["offset"]
+        return memoryview(buffer)[start:start + sections[name]["length"]]
+
+    booster = xgb.Booster()
+    booster.load_model(bytearray(section("booster")))
+    flat = np.frombuffer(section("split_thresholds"), dtype=np.float32)
+    bounds = np.cumsum([0] + sections["split_thresholds"]["counts"])
+    return {
+        "metadata": header["metadata"],
+        "booster": booster,
+        "split_thresholds": [flat[a:b] for a, b in zip(bounds[:-1], bounds[1:])],
+        "mmap": buffer,
+    }
+
+
+class ExplanationCache:
+    """
+    Thread-safe LRU of explanations keyed by (quantized) feature vector.
+
+    Read on the event loop, written from inference threads. Each put is a
+    computed explanation, so misses are counted there rather than in get,
+    which may be called twice for one request (event loop, then worker).
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: bytes):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key: bytes, entry):
+        with self._lock:
+            self.misses += 1
+            if self.max_entries <= 0:
+                return
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+
+class BoosterModel:
+    """
+    Single-row XGBoost inference without per-request allocation.
+
+    Features are copied straight from the request object into a
+    preallocated float32 row (in metadata feature order) and scored with
+    Booster.inplace_predict, which skips DMatrix and pandas construction.
+    Each thread gets its own row buffer, so the model can be called from a
+    thread pool; XGBoost releases the GIL while predicting.
+
+    Explanations use the booster's native TreeSHAP (pred_contribs), which
+    also yields the prediction, and are cached per quantized feature vector.
+    Each feature is quantized to its bin between the model's split
+    thresholds: vectors in the same bins take the same path through every
+    tree, so they have identical predictions and SHAP values and the cache
+    is exact.
+    """
+
+    def __init__(self, model_dir: str, explain_cache_size: int = 10_000):
+        """
+        Args:
+            model_dir: Artifacts directory written by save_artifacts()
+            explain_cache_size: Max cached explanations (0 disables the cache)
+        """
+        self.model_dir = str(model_dir)
+        model_dir = Path(model_dir)
+        if (model_dir / PACK_FILE).exists():
+            self.artifact_format = "pack"
+            pack = read_model_pack(model_dir / PACK_FILE)
+            self.metadata = pack["metadata"]
+            self.booster = pack["booster"]
+            self._pack_buffer = pack["mmap"]
+            self.model_id = hashlib.sha256(self._pack_buffer).hexdigest()
+        else:
+            self.artifact_format = "json"
+            metadata_bytes = (model_dir / "metadata.json").read_bytes()
+            model_bytes = (model_dir / "model.json").read_bytes()
+            self.metadata = json.loads(metadata_bytes)
+            self.booster = xgb.Booster()
+            self.booster.load_model(bytearray(model_bytes))
+            self.model_id = hashlib.sha256(model_bytes + metadata_bytes).hexdigest()
+        # Metadata version; ModelManager may suffix it when another model
+        # with other artifacts (model_id: content hash) shares it
+        self.version = self.metadata["version"]
+        self.feature_names = list(self.metadata["feature_names"])
+        self.label_classes = list(self.metadata["label_classes"])
+        self._labels = np.array(self.label_classes, dtype=object)
+        self.drift_reference = load_drift_reference(model_dir)
+
+        self._local = threading.local()
+        self._get_features = operator.attrgetter(*self.feature_names)
+        if self.artifact_format == "pack":
+            self._split_thresholds = pack["split_thresholds"]
+        else:
+            self._split_thresholds = self._load_split_thresholds()
+        self.explanations = ExplanationCache(explain_cache_size)
+
+        # First calls initialize the predictors; keep them off the request path
+        warmup = np.zeros((1, len(self.feature_names)), dtype=np.float32)
+        self.booster.inplace_predict(warmup)
+        self.contributions_matrix(warmup)
+        self.loaded = True
+        logger.info(f"Loaded booster {self.version} from {model_dir} ({self.artifact_format})")
+
+    def _load_split_thresholds(self) -> list[np.ndarray]:
+        """Sorted float32 split thresholds per feature, from the booster's JSON model."""
+        trees = json.loads(self.booster.save_raw("json"))["learner"]["gradient_booster"]["model"]["trees"]
+        thresholds = [set() for _ in self.feature_names]
+        for tree in trees:
+            for left, feature, condition in zip(tree["left_children"], tree["split_indices"], tree["split_conditions"]):
+                if left != -1:
+                    thresholds[feature].add(condition)
+        return [np.array(sorted(t), dtype=np.float32) for t in thresholds]
+
+    def _fill_row(self, features) -> np.ndarray:
+        row = getattr(self._local, "row", None)
+        if row is None:
+            row = self._local.row = np.zeros((1, len(self.feature_names)), dtype=np.float32)
+        row[0] = self._get_features(features)
+        return row
+
+    def predict(self, features) -> tuple[str, float]:
+        """
+        Predict the action for one feature vector.
+        Returns (prediction, confidence)
+        """
+        probs = self.booster.inplace_predict(self._fill_row(features))[0]
+        best = int(probs.argmax())
+        return self.label_classes[best], float(probs[best])
+
+    def feature_matrix(self, features_list: list) -> np.ndarray:
+        """Stack feature vectors into a (rows, features) float32 matrix in metadata order."""
+        if not features_list:
+            return np.zeros((0, len(self.feature_names)), dtype=np.float32)
+        return np.array([self._get_features(f) for f in features_list], dtype=np.float32)
+
+    def predict_matrix(self, X: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Score a (rows, features) matrix in metadata feature order with one
+        booster call.
+
+        Returns:
+            (predicted label per row, confidence per row)
+        """
+        if not len(X):
+            return np.zeros(0, dtype=object), np.zeros(0, dtype=np.float32)
+        probs = self.booster.inplace_predict(X)
+        best = probs.argmax(axis=1)
+        return self._labels[best], probs[np.arange(len(best)), best]
+
+    def predict_many(self, features_list: list) -> list[tuple[str, float]]:
+        """Predict many feature vectors with one booster call."""
+        labels, confidence = self.predict_matrix(self.feature_matrix(features_list))
+        return list(zip(labels.tolist(), confidence.tolist()))
+
+    def contributions_matrix(self, X: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Native TreeSHAP for a (rows, features) matrix with one booster call.
+
+        The per-class contributions sum to the class margins, so the
+        prediction comes from the same call.
+
+        Returns:
+            (predicted label per row, confidence per row,
+             (rows, features) SHAP values towards each row's predicted class)
+        """
+        if not len(X):
+            return (
+                np.zeros(0, dtype=object),
+                np.zeros(0, dtype=np.float32),
+                np.zeros((0, len(self.feature_names)), dtype=np.float32)
+            )
+        # (rows, classes, features + bias) for the multi-class baseline
+        contribs = self.booster.predict(
+            xgb.DMatrix(X, feature_names=self.feature_names),
+            pred_contribs=True
+        )
+        margins = contribs.sum(axis=2)
+        probs = np.exp(margins - margins.max(axis=1, keepdims=True))
+        probs /= probs.sum(axis=1, keepdims=True)
+        best = probs.argmax(axis=1)
+        rows = np.arange(len(best))
+        return self._labels[best], probs[rows, best], contribs[rows, best, :-1]
+
+    def explain_key(self, features) -> tuple[bytes, np.ndarray]:
+        """
+        Cache key (split-threshold bin per feature) and a copy of the feature row.
+
+        XGBoost sends x < threshold left, so the bin is the number of
+        thresholds <= x; missing values get their own bin.
+        """
+        row = self._fill_row(features).copy()
+        bins = np.array([
+            np.searchsorted(thresholds, value, side="right")
+            for thresholds, value in zip(self._split_thresholds, row[0])
+        ])
+        bins[np.isnan(row[0])] = -1
+        return bins.tobytes(), row
+
+    def _explanation(self, entry, features) -> tuple[str, float, list[dict]]:
+        prediction, confidence, shap_values = entry
+        values = self._get_features(features)
+        explanation = [
+            {
+                "feature": name,
+                "value": values[i],
+                "shap_value": shap_values[i],
+                "contribution": "positive" if shap_values[i] >= 0 else "negative",
+            }
+            for i, name in enumerate(self.feature_names)
+        ]
+        explanation.sort(key=lambda item: abs(item["shap_value"]), reverse=True)
+        return prediction, confidence, explanation
+
+    def cached_explanation(self, features) -> tuple[str, float, list[dict]] | None:
+        """Explanation from the cache, or None on a miss. Cheap enough for the event loop."""
+        entry = self.explanations.get(self.explain_key(features)[0])
+        return None if entry is None else self._explanation(entry, features)
+
+    def explain(self, features) -> tuple[str, float, list[dict]]:
+        """
+        Predict and explain one feature vector.
+
+        Returns:
+            (prediction, confidence, per-feature SHAP contributions towards
+             the predicted class, sorted by |shap_value|)
+        """
+        key, row = self.explain_key(features)
+        entry = self.explanations.get(key)
+        if entry is None:
+            labels, confidence, shap_values = self.contributions_matrix(row)
+            entry = (labels[0], float(confidence[0]), shap_values[0].tolist())
+            self.explanations.put(key, entry)
+        return self._explanation(entry, features)
+
+    def explain_many(self, features_list: list) -> list[tuple[str, float, list[dict]]]:
+        """Predict and explain many feature vectors with one booster call."""
+        labels, confidence, shap_values = self.contributions_matrix(self.feature_matrix(features_list))
+        entries = zip(labels.tolist(), confidence.tolist(), shap_values.tolist())
+        return [self._explanation(entry, features) for entry, features in zip(entries, features_list)]
+
+    def get_shap_values(self, features) -> list[dict]:
+        """Per-feature SHAP contributions towards the predicted class."""
+        return self.explain(features)[2]
+
+
+# Explain worker process state: models by directory, most recently used last
+_worker_models: OrderedDict = OrderedDict()
+WORKER_MAX_MODELS = 4
+
+
+def init_explain_worker(nice: int = 0, model_dir: str | None = None):
+    """
+    Process pool initializer.
+
+    A positive nice value lowers the worker's CPU priority so bulk SHAP
+    work yields to request serving on shared cores. model_dir, if given,
+    is loaded up front.
+    """
+    if nice:
+        os.nice(nice)
+    if model_dir:
+        _worker_model(model_dir)
+
+
+def _worker_model(model_dir: str) -> BoosterModel:
+    """The worker's copy of a model, loaded on first use."""
+    model = _worker_models.get(model_dir)
+    if model is None:
+        model = _worker_models[model_dir] = BoosterModel(model_dir, explain_cache_size=0)
+        while len(_worker_models) > WORKER_MAX_MODELS:
+            _worker_models.popitem(last=False)
+    _worker_models.move_to_end(model_dir)
+    return model
+
+
+def abs_shap_sum_in_worker(model_dir: str, X: np.ndarray) -> np.ndarray:
+    """Summed |SHAP| per (feature, class) over the rows of X, for summary jobs."""
+    model = _worker_model(model_dir)
+    contribs = model.booster.predict(
+        xgb.DMatrix(X, feature_names=model.feature_names),
+        pred_contribs=True
+    )
+    # (rows, classes, features + bias) -> (features, classes)
+    return np.abs(contribs[:, :, :-1]).sum(axis=0).T
@@ -0,0 +1,264 @@
+"""
+Drift Sketches
+Streaming per-feature sketches of the traffic each replica serves.
+
+Every prediction adds its feature row to a sketch of the serving model:
+counts over the model's reference quantile bins (drift_reference.json,
+written at training time) plus running moments. At every window boundary
+the sketches are written as JSON and reset; ml/monitoring/drift_monitor.py
+merges the files of all replicas for a window and computes PSI, KS and JS
+drift from the merged sketch, so no raw feature rows leave the service.
+"""
+
+import asyncio
+import bisect
+import json
+import logging
+import math
+import operator
+import time
+from pathlib import Path
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Sketch format of ml/monitoring/drift_monitor.py (FeatureSketch.to_dict)
+SKETCH_FORMAT_VERSION = 1
+REFERENCE_FILE = "drift_reference.json"
+
+
+def load_drift_reference(model_dir: Path) -> dict | None:
+    """Reference distributions saved with the model, if any."""
+    path = Path(model_dir) / REFERENCE_FILE
+    if not path.exists():
+        return None
+    return json.loads(path.read_text())
+
+
+class FeatureSketch:
+    """
+    Sketch of one model's inputs over a window.
+
+    Per feature: counts over the reference bins (last bin: missing) and
+    count, mean, M2, min and max. A single row is added with a bisect and
+    a Welford step per feature.
+    """
+
+    def __init__(
+        self,
+        feature_names: list[str],
+        cuts: list[list[float]],
+        model_version: str,
+        replica: str,
+        model_id: str | None = None
+    ):
+        self.feature_names = list(feature_names)
+        self.cuts = [list(c) for c in cuts]
+        self.model_version = model_version
+        self.model_id = model_id
+        self.replica = replica
+        self._cut_arrays = [np.asarray(c, dtype=np.float64) for c in self.cuts]
+        self._offsets = []
+        size = 0
+        for c in self.cuts:
+            self._offsets.append(size)
+            size += len(c) + 2
+        self._missing = [offset + len(c) + 1 for offset, c in zip(self._offsets, self.cuts)]
+        self.counts = [0] * size
+        self.n = [0] * len(self.cuts)
+        self.mean = [0.0] * len(self.cuts)
+        self.m2 = [0.0] * len(self.cuts)
+        self.min = [math.inf] * len(self.cuts)
+        self.max = [-math.inf] * len(self.cuts)
+        self.rows = 0
+        self.window_start: float | None = None
+        self.window_end: float | None = None
+
+    def update(self, row):
+        """Add one row (values in feature_names order; NaN is missing)."""
+        self.rows += 1
+        for k, x in enumerate(row):
+            if x != x:
+                self.counts[self._missing[k]] += 1
+                continue
+            self.counts[self._offsets[k] + bisect.bisect_right(self.cuts[k], x)] += 1
+            n = self.n[k] = self.n[k] + 1
+            delta = x - self.mean[k]
+            self.mean[k] += delta / n
+            self.m2[k] += delta * (x - self.mean[k])
+            if x < self.min[k]:
+                self.min[k] = float(x)
+            if x > self.max[k]:
+                self.max[k] = float(x)
+
+    def update_matrix(self, X: np.ndarray):
+        """Add every row of a (rows, features) matrix."""
+        X = np.asarray(X, dtype=np.float64)
+        if not len(X):
+            return
+        self.rows += len(X)
+        missing = np.isnan(X)
+        codes = np.empty(X.shape, dtype=np.int64)
+        for k, cuts in enumerate(self._cut_arrays):
+            codes[:, k] = np.searchsorted(cuts, X[:, k], side="right") + self._offsets[k]
+        codes[missing] = np.broadcast_to(np.array(self._missing), X.shape)[missing]
+        for i, count in zip(*np.unique(codes, return_counts=True)):
+            self.counts[i] += int(count)
+
+        with np.errstate(all="ignore"):
+            means, variances = np.nanmean(X, axis=0), np.nanvar(X, axis=0)
+            lows, highs = np.nanmin(X, axis=0), np.nanmax(X, axis=0)
+        for k, n in enumerate((~missing).sum(axis=0).tolist()):
+            if not n:
+                continue
+            # Parallel variance formula
+            total = self.n[k] + n
+            delta = float(means[k]) - self.mean[k]
+            self.mean[k] += delta * n / total
+            self.m2[k] += float(variances[k]) * n + delta ** 2 * self.n[k] * n / total
+            self.n[k] = total
+            self.min[k] = min(self.min[k], float(lows[k]))
+            self.max[k] = max(self.max[k], float(highs[k]))
+
+    def to_dict(self) -> dict:
+        return {
+            "format_version": SKETCH_FORMAT_VERSION,
+            "model_version": self.model_version,
+            "model_id": self.model_id,
+            "window_start": self.window_start,
+            "window_end": self.window_end,
+            "replicas": [self.replica],
+            "feature_names": self.feature_names,
+            "cuts": self.cuts,
+            "counts": self.counts,
+            "n": self.n,
+            "mean": self.mean,
+            "m2": self.m2,
+            "min": self.min,
+            "max": self.max,
+        }
+
+
+class DriftSketchLog:
+    """
+    Per-model feature sketches, written once per window.
+
+    Windows are aligned to multiples of window_seconds since the epoch, so
+    the sketches of all replicas for a window cover the same interval and
+    merge into one. Sketches are keyed by the model's content id (model_id),
+    so two artifacts sharing a metadata version never share a sketch.
+    Models without a drift reference are not sketched.
+    """
+
+    def __init__(self, directory: str, replica: str, window_seconds: float = 300.0):
+        """
+        Args:
+            directory: Output directory for sketch-*.json files
+            replica: Name of this replica, recorded in every sketch
+            window_seconds: Window length
+        """
+        self.directory = Path(directory)
+        self.replica = replica
+        self.window_seconds = window_seconds
+        self.window_start = self._window_of(time.time())
+        # model id -> (sketch, feature getter), or None without a reference
+        self._sketches: dict[str, tuple | None] = {}
+        self._writes: set[asyncio.Task] = set()
+        self._ticker: asyncio.Task | None = None
+        self.rows_sketched = 0
+        self.files_written = 0
+
+    def _window_of(self, t: float) -> float:
+        return math.floor(t / self.window_seconds) * self.window_seconds
+
+    @staticmethod
+    def _key(model) -> str:
+        return getattr(model, "model_id", None) or model.version
+
+    def _sketch(self, model) -> tuple | None:
+        key = self._key(model)
+        if key not in self._sketches:
+            reference = getattr(model, "drift_reference", None)
+            entry = None
+            if reference and all(name in reference for name in model.feature_names):
+                sketch = FeatureSketch(
+                    model.feature_names,
+                    [reference[name]["histogram"]["cuts"] for name in model.feature_names],
+                    model.version,
+                    self.replica,
+                    getattr(model, "model_id", None)
+                )
+                sketch.window_start = self.window_start
+                entry = (sketch, operator.attrgetter(*model.feature_names))
+            self._sketches[key] = entry
+        if self._ticker is None:
+            self._ticker = asyncio.create_task(self._rotate_periodically())
+        return self._sketches[key]
+
+    def observe(self, model, features):
+        """Add one request's features to the sketch of the model that served it."""
+        entry = self._sketch(model)
+        if entry is not None:
+            sketch, get_features = entry
+            sketch.update(get_features(features))
+            self.rows_sketched += 1
+
+    def observe_matrix(self, model, X: np.ndarray):
+        """Add a (rows, features) matrix in the model's feature order."""
+        entry = self._sketch(model)
+        if entry is not None:
+            entry[0].update_matrix(X)
+            self.rows_sketched += len(X)
+
+    def sketches(self) -> list[dict]:
+        """Sketches of the current (partial) window."""
+        return [entry[0].to_dict() for entry in self._sketches.values() if entry is not None]
+
+    def rotate(self):
+        """Write the current window's non-empty sketches and start a new window."""
+        now = time.time()
+        sketches, self._sketches = self._sketches, {}
+        for entry in sketches.values():
+            if entry is None or not entry[0].rows:
+                continue
+            sketch = entry[0]
+            sketch.window_end = now
+            name = sketch.model_id[:12] if sketch.model_id else sketch.model_version
+            path = self.directory / f"sketch-{name}-{int(sketch.window_start)}-{self.replica}.json"
+            task = asyncio.create_task(asyncio.to_thread(self._write, path, sketch.to_dict()))
+            self._writes.add(task)
+            task.add_done_callback(self._writes.discard)
+        self.window_start = self._window_of(now)
+
+    def _write(self, path: Path, data: dict):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(data))
+        tmp_path.rename(path)
+        self.files_written += 1
+        logger.info(f"Wrote drift sketch {path.name}")
+
+    async def _rotate_periodically(self):
+        while True:
+            boundary = self.window_start + self.window_seconds
+            while time.time() < boundary:
+                await asyncio.sleep(boundary - time.time())
+            self.rotate()
+
+    async def close(self):
+        """Write the current window and wait for pending writes."""
+        if self._ticker:
+            self._ticker.cancel()
+        self.rotate()
+        if self._writes:
+            await asyncio.gather(*self._writes, return_exceptions=True)
+
+    def stats(self) -> dict:
+        return {
+            "window_start": self.window_start,
+            "window_seconds": self.window_seconds,
+            "models": sorted(entry[0].model_version for entry in self._sketches.values() if entry is not None),
+            "rows_sketched": self.rows_sketched,
+            "files_written": self.files_written,
+        }
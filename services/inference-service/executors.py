@@ -0,0 +1,86 @@
+"""
+Bounded Executors
+Run CPU-bound model work off the event loop with backpressure.
+"""
+
+import asyncio
+import functools
+import logging
+import threading
+from concurrent.futures import Executor, Future
+from typing import Any, Callable
+
+logger = logging.getLogger(__name__)
+
+
+class ExecutorSaturated(Exception):
+    """Raised when an executor already has max_pending calls queued or running."""
+
+    def __init__(self, name: str, max_pending: int):
+        super().__init__(f"{name} executor saturated ({max_pending} calls pending)")
+        self.name = name
+
+
+class BoundedExecutor:
+    """
+    Wraps a thread or process pool with a cap on queued + running calls.
+
+    Calls beyond the cap are rejected immediately with ExecutorSaturated
+    instead of queueing, so an overloaded worker sheds load quickly rather
+    than letting every request's latency grow without bound.
+    """
+
+    def __init__(self, name: str, executor: Executor, max_pending: int):
+        """
+        Args:
+            name: Label used in errors and stats
+            executor: Underlying pool
+            max_pending: Maximum calls queued or running at once
+        """
+        self.name = name
+        self.executor = executor
+        self.max_pending = max_pending
+        self._lock = threading.Lock()
+        self.pending = 0
+        self.completed = 0
+        self.rejected = 0
+
+    async def run(self, fn: Callable, *args) -> Any:
+        """
+        Run fn(*args) in the pool, or raise ExecutorSaturated if full.
+
+        A call counts as pending until the pool has finished (or dropped)
+        it, even if the awaiting request was cancelled, since it still
+        occupies a worker.
+        """
+        with self._lock:
+            if self.pending >= self.max_pending:
+                self.rejected += 1
+                raise ExecutorSaturated(self.name, self.max_pending)
+            self.pending += 1
+
+        try:
+            future = self.executor.submit(functools.partial(fn, *args))
+        except BaseException:
+            self._finished(None)
+            raise
+        future.add_done_callback(self._finished)
+        return await asyncio.wrap_future(future)
+
+    def _finished(self, future: Future | None):
+        """Done callback of the pool's future; runs in the worker (or the caller)."""
+        with self._lock:
+            self.pending -= 1
+            if future is not None and not future.cancelled():
+                self.completed += 1
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self) -> dict:
+        return {
+            "pending": self.pending,
+            "max_pending": self.max_pending,
+            "completed": self.completed,
+            "rejected": self.rejected,
+        }
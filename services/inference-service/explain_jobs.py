@@ -0,0 +1,239 @@
+"""
+SHAP Summary Jobs
+Population-level SHAP feature importance over large samples, computed in
+the background so serving traffic is never blocked.
+
+A job splits its sample into chunks, sums |SHAP| per (feature, class) for
+each chunk in the explain worker pool, and publishes the running feature
+importance after every chunk. When done, the importance JSON and a summary
+plot are written under the job's output directory.
+"""
+
+import asyncio
+import json
+import logging
+import time
+import uuid
+from collections import OrderedDict
+from pathlib import Path
+from typing import Awaitable, Callable
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class JobQueueFull(Exception):
+    """Raised when max_queued summary jobs are already waiting."""
+
+
+def feature_importance(abs_shap_sum: np.ndarray, feature_names: list[str]) -> dict:
+    """
+    Normalized global importance from summed |SHAP| per (feature, class).
+
+    Same result as ml/explainability/shap_summary.generate_feature_importance:
+    mean |SHAP| averaged across classes, normalized to sum to 1, sorted.
+    """
+    mean_abs_shap = abs_shap_sum.mean(axis=1)
+    total = mean_abs_shap.sum()
+    normalized = mean_abs_shap / total if total > 0 else mean_abs_shap
+    importance = {name: float(normalized[i]) for i, name in enumerate(feature_names)}
+    return dict(sorted(importance.items(), key=lambda x: x[1], reverse=True))
+
+
+def write_summary_artifacts(output_dir: str, importance: dict, mean_abs_shap: list,
+                            feature_names: list[str], label_classes: list[str]) -> dict:
+    """
+    Persist feature_importance.json and, if matplotlib is installed,
+    shap_summary.png (mean |SHAP| per feature stacked by class, like
+    shap.summary_plot for multi-class models).
+
+    Runs in an explain worker process. Returns artifact paths by name.
+    """
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    artifacts = {"importance": str(output_dir / "feature_importance.json")}
+    with open(artifacts["importance"], "w") as f:
+        json.dump(importance, f, indent=2)
+
+    try:
+        import matplotlib
+        matplotlib.use("Agg")
+        import matplotlib.pyplot as plt
+    except ImportError:
+        logger.warning("matplotlib not installed, skipping SHAP summary plot")
+        return artifacts
+
+    mean_abs_shap = np.asarray(mean_abs_shap)
+    order = np.argsort(mean_abs_shap.sum(axis=1))
+    fig, ax = plt.subplots(figsize=(10, 8))
+    left = np.zeros(len(order))
+    for k, label in enumerate(label_classes):
+        ax.barh([feature_names[i] for i in order], mean_abs_shap[order, k], left=left, label=label)
+        left += mean_abs_shap[order, k]
+    ax.set_xlabel("mean(|SHAP value|)")
+    ax.legend()
+    fig.tight_layout()
+    artifacts["plot"] = str(output_dir / "shap_summary.png")
+    fig.savefig(artifacts["plot"], dpi=150, bbox_inches="tight")
+    plt.close(fig)
+    return artifacts
+
+
+class SummaryJob:
+    """State of one summary job; partial results are published after every chunk."""
+
+    def __init__(self, X: np.ndarray, model):
+        self.job_id = uuid.uuid4().hex
+        self.model_version = model.version
+        self.model_dir = model.model_dir
+        self.feature_names = model.feature_names
+        self.label_classes = model.label_classes
+        self.X = X
+        self.status = "queued"
+        self.rows_total = len(X)
+        self.rows_done = 0
+        self.abs_shap_sum = np.zeros((len(self.feature_names), len(self.label_classes)))
+        self.feature_importance: dict = {}
+        self.artifacts: dict = {}
+        self.error: str | None = None
+        self.created_at = time.time()
+        self.finished_at: float | None = None
+        self.updated = asyncio.Event()
+
+    @property
+    def done(self) -> bool:
+        return self.status in ("completed", "failed")
+
+    def publish(self, status: str | None = None):
+        """Record a state change and wake anyone streaming this job."""
+        if status:
+            self.status = status
+        if self.done:
+            self.finished_at = time.time()
+            self.X = None
+        self.updated.set()
+        self.updated = asyncio.Event()
+
+    def to_dict(self) -> dict:
+        return {
+            "job_id": self.job_id,
+            "status": self.status,
+            "model_version": self.model_version,
+            "rows_done": self.rows_done,
+            "rows_total": self.rows_total,
+            "feature_importance": self.feature_importance,
+            "artifacts": self.artifacts,
+            "error": self.error,
+            "created_at": self.created_at,
+            "finished_at": self.finished_at,
+        }
+
+
+class SummaryJobManager:
+    """
+    Runs summary jobs one at a time, FIFO, with up to `parallelism` chunks
+    of the running job in flight in the worker pool.
+    """
+
+    def __init__(
+        self,
+        run_chunk: Callable[[str, np.ndarray], Awaitable[np.ndarray]],
+        write_artifacts: Callable[..., Awaitable[dict]],
+        output_dir: str,
+        chunk_size: int = 5000,
+        parallelism: int = 2,
+        max_queued: int = 8,
+        max_retained: int = 100
+    ):
+        """
+        Args:
+            run_chunk: Async fn(model_dir, X chunk) -> summed |SHAP| per (feature, class)
+            write_artifacts: Async wrapper around write_summary_artifacts
+            output_dir: Artifacts are written to output_dir/<job_id>/
+            chunk_size: Rows per worker call
+            parallelism: Chunks in flight at once
+            max_queued: Jobs waiting to run before submit raises JobQueueFull
+            max_retained: Finished jobs kept for status lookups
+        """
+        self.run_chunk = run_chunk
+        self.write_artifacts = write_artifacts
+        self.output_dir = Path(output_dir)
+        self.chunk_size = chunk_size
+        self.parallelism = parallelism
+        self.max_queued = max_queued
+        self.max_retained = max_retained
+        self.jobs: OrderedDict[str, SummaryJob] = OrderedDict()
+        self._queue: asyncio.Queue[SummaryJob] = asyncio.Queue()
+        self._runner: asyncio.Task | None = None
+
+    def submit(self, X: np.ndarray, model) -> SummaryJob:
+        """Queue a summary job over the rows of X (in model.feature_names order)."""
+        if self._queue.qsize() >= self.max_queued:
+            raise JobQueueFull(f"{self.max_queued} summary jobs already queued")
+
+        job = SummaryJob(X, model)
+        self.jobs[job.job_id] = job
+        self._evict_finished()
+        self._queue.put_nowait(job)
+        if self._runner is None:
+            self._runner = asyncio.create_task(self._run_jobs())
+        return job
+
+    def get(self, job_id: str) -> SummaryJob | None:
+        return self.jobs.get(job_id)
+
+    def _evict_finished(self):
+        finished = [job_id for job_id, job in self.jobs.items() if job.done]
+        for job_id in finished[:max(0, len(self.jobs) - self.max_retained)]:
+            del self.jobs[job_id]
+
+    async def _run_jobs(self):
+        while True:
+            job = await self._queue.get()
+            try:
+                await self._run(job)
+            except Exception as e:
+                logger.error(f"Summary job {job.job_id} failed: {e}")
+                job.error = str(e)
+                job.publish("failed")
+
+    async def _run(self, job: SummaryJob):
+        job.publish("running")
+        slots = asyncio.Semaphore(self.parallelism)
+
+        async def run_chunk(chunk: np.ndarray):
+            async with slots:
+                abs_shap_sum = await self.run_chunk(job.model_dir, chunk)
+            if job.done:
+                # Another chunk failed
+                return
+            job.abs_shap_sum += abs_shap_sum
+            job.rows_done += len(chunk)
+            job.feature_importance = feature_importance(job.abs_shap_sum, job.feature_names)
+            job.publish()
+
+        await asyncio.gather(*[
+            run_chunk(job.X[start:start + self.chunk_size])
+            for start in range(0, job.rows_total, self.chunk_size)
+        ])
+
+        mean_abs_shap = job.abs_shap_sum / max(job.rows_done, 1)
+        job.artifacts = await self.write_artifacts(
+            str(self.output_dir / job.job_id), job.feature_importance,
+            mean_abs_shap.tolist(), job.feature_names, job.label_classes
+        )
+        logger.info(f"Summary job {job.job_id} completed ({job.rows_done} rows)")
+        job.publish("completed")
+
+    async def close(self):
+        if self._runner:
+            self._runner.cancel()
+            try:
+                await self._runner
+            except asyncio.CancelledError:
+                pass
+
+    def stats(self) -> dict:
+        statuses = [job.status for job in self.jobs.values()]
+        return {status: statuses.count(status) for status in ("queued", "running", "completed", "failed")}
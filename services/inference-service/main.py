@@ -1,15 +1,32 @@
 """
-Inference Service - Model Loader Stub
+Inference Service - Model Loader
 Serves ML model predictions.
 """
 
 import os
+import json
+import asyncio
+import time
 import logging
+import multiprocessing
+import socket
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime
 from contextlib import asynccontextmanager
 
-from fastapi import FastAPI, HTTPException
-from pydantic import BaseModel
+import numpy as np
+import pyarrow as pa
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from pydantic import BaseModel, Field
+
+from booster_model import BoosterModel, abs_shap_sum_in_worker, init_explain_worker
+from drift_sketch import DriftSketchLog
+from executors import BoundedExecutor, ExecutorSaturated
+from explain_jobs import JobQueueFull, SummaryJobManager, write_summary_artifacts
+from micro_batcher import MicroBatcher
+from model_manager import LocalRegistryIndex, ModelManager, ModelNotFound, registry_uri, resolve_model_dir
+from traffic_split import PairedOutputLog, TrafficSplit
 
 # Configure structured logging
 logging.basicConfig(
@@ -26,8 +43,57 @@ logger = logging.getLogger(__name__)
 class Config:
     SERVICE_NAME = "inference-service"
     SERVICE_VERSION = "0.1.0"
+    # Initial default model: a directory with model.json and metadata.json
+    # from ml/models/baseline/train.py, a version directory under MODELS_ROOT,
+    # or a registry URI such as models:/inflow-baseline/Production
     MODEL_PATH = os.getenv("MODEL_PATH", "/models/baseline")
+    MODELS_ROOT = os.getenv("MODELS_ROOT", "/models")
+    MODEL_NAME = os.getenv("MODEL_NAME", "inflow-baseline")
+    MLFLOW_TRACKING_URI = os.getenv("MLFLOW_TRACKING_URI", "http://localhost:5000")
+    MODEL_DOWNLOAD_DIR = os.getenv("MODEL_DOWNLOAD_DIR", "/tmp/inflow/models")
+    # Local file registry (ml/models/baseline/registry.py); when set, models:/
+    # URIs are resolved from it instead of the MLflow tracking server
+    MODEL_REGISTRY_DIR = os.getenv("MODEL_REGISTRY_DIR")
+    # Version reported by the stub model when no trained model is available
     MODEL_VERSION = os.getenv("MODEL_VERSION", "v1.0.0-stub")
+    # Micro-batching of concurrent /v1/predict calls (max batch size 1 disables it)
+    PREDICT_MAX_BATCH_SIZE = int(os.getenv("PREDICT_MAX_BATCH_SIZE", "64"))
+    PREDICT_MAX_WAIT_US = int(os.getenv("PREDICT_MAX_WAIT_US", "500"))
+    # Model calls (including native SHAP) run in a thread pool, as XGBoost
+    # releases the GIL; bulk SHAP work goes to worker processes. Calls beyond
+    # MAX_PENDING are rejected with 503
+    INFERENCE_THREADS = int(os.getenv("INFERENCE_THREADS", "4"))
+    INFERENCE_MAX_PENDING = int(os.getenv("INFERENCE_MAX_PENDING", "256"))
+    EXPLAIN_PROCESSES = int(os.getenv("EXPLAIN_PROCESSES", "2"))
+    EXPLAIN_MAX_PENDING = int(os.getenv("EXPLAIN_MAX_PENDING", "16"))
+    # /v1/explain cache entries, keyed by split-threshold bin per feature
+    EXPLAIN_CACHE_SIZE = int(os.getenv("EXPLAIN_CACHE_SIZE", "10000"))
+    # Explain workers run at lower CPU priority than request serving
+    EXPLAIN_NICE = int(os.getenv("EXPLAIN_NICE", "10"))
+    # Background SHAP summary jobs (/v1/explain/summary)
+    SUMMARY_OUTPUT_DIR = os.getenv("SUMMARY_OUTPUT_DIR", "/tmp/inflow/shap-summaries")
+    SUMMARY_CHUNK_SIZE = int(os.getenv("SUMMARY_CHUNK_SIZE", "5000"))
+    SUMMARY_MAX_QUEUED = int(os.getenv("SUMMARY_MAX_QUEUED", "8"))
+    # Canary / shadow traffic to a candidate model, gated by the new_model_v2
+    # flag (same FF_ env override as services/common/feature_flags.py)
+    NEW_MODEL_V2 = os.getenv("FF_NEW_MODEL_V2", "false").lower() in ("true", "1", "yes")
+    CANDIDATE_MODEL = os.getenv("CANDIDATE_MODEL")  # model source, loaded at startup
+    CANARY_PERCENT = float(os.getenv("CANARY_PERCENT", "0"))
+    SHADOW_MODE = os.getenv("SHADOW_MODE", "false").lower() in ("true", "1", "yes")
+    # Shadow scores run in their own small pool, so they never take
+    # inference pool capacity from served requests; beyond the cap they are dropped
+    SHADOW_THREADS = int(os.getenv("SHADOW_THREADS", "1"))
+    SHADOW_MAX_IN_FLIGHT = int(os.getenv("SHADOW_MAX_IN_FLIGHT", "32"))
+    # Paired served/shadow outputs, as Parquet files
+    SHADOW_LOG_DIR = os.getenv("SHADOW_LOG_DIR", "/tmp/inflow/shadow")
+    SHADOW_LOG_MAX_ROWS = int(os.getenv("SHADOW_LOG_MAX_ROWS", "10000"))
+    SHADOW_LOG_FLUSH_SECONDS = float(os.getenv("SHADOW_LOG_FLUSH_SECONDS", "60"))
+    # Per-window feature sketches of served traffic, for drift monitoring
+    # (merged across replicas by ml/monitoring/drift_monitor.py)
+    DRIFT_SKETCHES = os.getenv("DRIFT_SKETCHES", "true").lower() in ("true", "1", "yes")
+    DRIFT_SKETCH_DIR = os.getenv("DRIFT_SKETCH_DIR", "/tmp/inflow/drift")
+    DRIFT_WINDOW_SECONDS = float(os.getenv("DRIFT_WINDOW_SECONDS", "300"))
+    REPLICA_ID = os.getenv("REPLICA_ID", socket.gethostname())
 
 
 # =============================================================================
@@ -40,6 +106,11 @@ class HealthResponse(BaseModel):
     version: str
     model_loaded: bool
     model_version: str
+    models: dict = {}
+    traffic: dict = {}
+    executors: dict = {}
+    explain_cache: dict = {}
+    summary_jobs: dict = {}
     timestamp: str
 
 
@@ -67,6 +138,27 @@ class PredictResponse(BaseModel):
     inference_time_ms: float
 
 
+class BatchPredictResponse(BaseModel):
+    results: list[PredictResponse]
+    total_time_ms: float
+
+
+class LoadModelRequest(BaseModel):
+    # Artifacts directory, version under MODELS_ROOT, or registry URI
+    source: str | None = None
+    # Registry stage of MODEL_NAME, used when source is not given
+    stage: str | None = None
+    make_default: bool = True
+
+
+class TrafficSettings(BaseModel):
+    # new_model_v2 flag
+    enabled: bool | None = None
+    candidate_version: str | None = None
+    canary_percent: float | None = Field(default=None, ge=0, le=100)
+    shadow: bool | None = None
+
+
 class ExplainResponse(BaseModel):
     request_id: str
     prediction: str
@@ -74,6 +166,24 @@ class ExplainResponse(BaseModel):
     feature_importance: list[dict]
 
 
+class BatchExplainResponse(BaseModel):
+    results: list[ExplainResponse]
+    total_time_ms: float
+
+
+class SummaryJobResponse(BaseModel):
+    job_id: str
+    status: str
+    model_version: str
+    rows_done: int
+    rows_total: int
+    feature_importance: dict
+    artifacts: dict
+    error: str | None = None
+    created_at: float
+    finished_at: float | None = None
+
+
 # =============================================================================
 # Stub Model
 # =============================================================================
@@ -81,9 +191,11 @@ class ExplainResponse(BaseModel):
 class StubModel:
     """
     Stub model that returns rule-based predictions.
-    Will be replaced with XGBoost in ML baseline phase.
+    Used when no trained model is found at Config.MODEL_PATH (dev/testing).
     """
     
+    feature_names = [name for name in FeatureVector.model_fields if name != "account_id"]
+    
     def __init__(self):
         self.version = Config.MODEL_VERSION
         self.loaded = True
@@ -108,6 +220,44 @@ class StubModel:
         # Default: monitor
         return "monitor", 0.60
     
+    def predict_many(self, features_list: list[FeatureVector]) -> list[tuple[str, float]]:
+        """Predict many feature vectors."""
+        return [self.predict(features) for features in features_list]
+    
+    def feature_matrix(self, features_list: list[FeatureVector]) -> np.ndarray:
+        """Stack feature vectors into a (rows, features) matrix."""
+        return np.array(
+            [[getattr(f, name) for name in self.feature_names] for f in features_list],
+            dtype=np.float32
+        ).reshape(len(features_list), len(self.feature_names))
+    
+    def predict_matrix(self, X: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Predict each row of a (rows, features) matrix."""
+        results = self.predict_many([
+            FeatureVector(account_id="", **{
+                name: int(value) if FeatureVector.model_fields[name].annotation is int else float(value)
+                for name, value in zip(self.feature_names, row)
+            })
+            for row in X
+        ])
+        return (
+            np.array([p for p, _ in results], dtype=object),
+            np.array([c for _, c in results], dtype=np.float32)
+        )
+    
+    def cached_explanation(self, features: FeatureVector) -> None:
+        """The stub has nothing worth caching."""
+        return None
+    
+    def explain(self, features: FeatureVector) -> tuple[str, float, list[dict]]:
+        """Returns (prediction, confidence, stub SHAP values)."""
+        prediction, confidence = self.predict(features)
+        return prediction, confidence, self.get_shap_values(features)
+    
+    def explain_many(self, features_list: list[FeatureVector]) -> list[tuple[str, float, list[dict]]]:
+        """Explain many feature vectors."""
+        return [self.explain(features) for features in features_list]
+    
     def get_shap_values(self, features: FeatureVector) -> list[dict]:
         """Stub SHAP values for explanation."""
         return [
@@ -118,8 +268,168 @@ class StubModel:
         ]
 
 
-# Global model instance
-model: StubModel | None = None
+ARROW_STREAM = "application/vnd.apache.arrow.stream"
+
+
+def columns_to_matrix(columns: dict, feature_names: list[str]) -> np.ndarray:
+    """
+    Build a (rows, features) float32 matrix from per-feature columns.
+    
+    Raises KeyError for a missing feature and ValueError for ragged columns.
+    Nulls become NaN, which the model treats as missing.
+    """
+    missing = [name for name in feature_names if name not in columns]
+    if missing:
+        raise KeyError(f"missing feature columns {missing}")
+    
+    lengths = {len(columns[name]) for name in feature_names}
+    if len(lengths) > 1:
+        raise ValueError("feature columns have different lengths")
+    
+    X = np.empty((lengths.pop() if lengths else 0, len(feature_names)), dtype=np.float32)
+    for j, name in enumerate(feature_names):
+        try:
+            X[:, j] = np.asarray(columns[name], dtype=np.float32)
+        except TypeError:
+            # JSON nulls
+            X[:, j] = np.array([np.nan if v is None else v for v in columns[name]], dtype=np.float32)
+    return X
+
+
+async def read_columnar(request: Request, feature_names: list[str]) -> tuple[list | None, np.ndarray]:
+    """
+    Parse a columnar request body, JSON {"request_ids": [...], "features":
+    {name: [values]}} or an Arrow IPC stream with one column per feature and
+    an optional request_id column.
+    
+    Returns:
+        (request_ids or None, (rows, features) matrix)
+    """
+    body = await request.body()
+    try:
+        if ARROW_STREAM in request.headers.get("content-type", ""):
+            table = pa.ipc.open_stream(body).read_all()
+            columns = {name: table.column(name).to_numpy() for name in table.column_names}
+            request_ids = columns.pop("request_id", None)
+        else:
+            payload = json.loads(body)
+            columns = payload["features"]
+            request_ids = payload.get("request_ids")
+        X = columns_to_matrix(columns, feature_names)
+    except (KeyError, ValueError, TypeError, pa.ArrowException) as e:
+        raise HTTPException(status_code=422, detail=f"Invalid columnar request: {e}")
+    
+    if request_ids is not None and len(request_ids) != len(X):
+        raise HTTPException(status_code=422, detail="request_ids length does not match feature columns")
+    return request_ids, X
+
+
+# Global state
+models: ModelManager | None = None
+predict_batcher: MicroBatcher | None = None
+inference_pool: BoundedExecutor | None = None
+explain_pool: BoundedExecutor | None = None
+shadow_pool: BoundedExecutor | None = None
+summary_jobs: SummaryJobManager | None = None
+traffic: TrafficSplit | None = None
+paired_log: PairedOutputLog | None = None
+drift_sketches: DriftSketchLog | None = None
+shadow_tasks: set[asyncio.Task] = set()
+local_registry: LocalRegistryIndex | None = (
+    LocalRegistryIndex(Config.MODEL_REGISTRY_DIR) if Config.MODEL_REGISTRY_DIR else None
+)
+
+
+def load_model(model_dir: str) -> BoosterModel:
+    """Load and warm the trained booster in model_dir."""
+    return BoosterModel(model_dir, explain_cache_size=Config.EXPLAIN_CACHE_SIZE)
+
+
+def resolve_model(source: str) -> str:
+    """Local artifacts directory for a model source (see model_manager.resolve_model_dir)."""
+    return resolve_model_dir(
+        source, Config.MODELS_ROOT, Config.MLFLOW_TRACKING_URI, Config.MODEL_DOWNLOAD_DIR, local_registry
+    )
+
+
+def get_model(version: str | None = None) -> BoosterModel | StubModel:
+    """The model a request should use; take it once and use it for the whole request."""
+    if models is None:
+        raise HTTPException(status_code=503, detail="Model not loaded")
+    return models.get(version)
+
+
+def get_batch_model(requests: list[PredictRequest]) -> BoosterModel | StubModel:
+    """The one model all rows of a batch request use."""
+    versions = {req.model_version for req in requests}
+    if len(versions) > 1:
+        raise HTTPException(status_code=422, detail="All rows of a batch must use the same model_version")
+    return get_model(versions.pop() if versions else None)
+
+
+def route_request(request: PredictRequest) -> tuple:
+    """
+    Pick the serving model and the shadow model (or None) for a /v1/predict call.
+    
+    Requests naming a model_version are never split.
+    
+    Returns:
+        (served model, shadow model or None, whether the candidate serves)
+    """
+    model = get_model(request.model_version)
+    if request.model_version is not None or not traffic.enabled:
+        return model, None, False
+    
+    candidate = models.versions.get(traffic.candidate_version)
+    if candidate is None or candidate is model:
+        traffic.count_unsplit(
+            f"candidate {traffic.candidate_version} is not loaded" if candidate is None
+            else f"candidate {traffic.candidate_version} is the serving model"
+        )
+        return model, None, False
+    
+    canary = traffic.is_canary(request.features.account_id)
+    served, other = (candidate, model) if canary else (model, candidate)
+    return served, other if traffic.shadow else None, canary
+
+
+async def score(model, features: FeatureVector) -> tuple[str, float]:
+    if predict_batcher:
+        return await predict_batcher.submit((model, features))
+    return await inference_pool.run(model.predict, features)
+
+
+async def run_shadow(request: PredictRequest, served: PredictResponse, shadow_model, canary: bool):
+    """Score a request on the shadow model and log the pair; never affects the response."""
+    try:
+        start = time.perf_counter()
+        prediction, confidence = await shadow_pool.run(shadow_model.predict, request.features)
+        shadow_ms = (time.perf_counter() - start) * 1000
+    except Exception as e:
+        logger.warning(f"Shadow scoring failed for {request.request_id}: {e}")
+        traffic.finish_shadow(scored=False)
+        return
+    
+    traffic.finish_shadow(scored=True)
+    paired_log.append(
+        time.time(), request.request_id, request.features.account_id, canary,
+        served.model_version, served.prediction, served.confidence, served.inference_time_ms,
+        shadow_model.version, prediction, confidence, shadow_ms
+    )
+
+
+async def run_predict_batch(items: list[tuple]) -> list[tuple[str, float]]:
+    """Micro-batch runner: one model call per model version in the batch."""
+    groups = {}
+    for i, (model, _) in enumerate(items):
+        groups.setdefault(id(model), (model, []))[1].append(i)
+    
+    results = [None] * len(items)
+    for model, rows in groups.values():
+        predictions = await inference_pool.run(model.predict_many, [items[i][1] for i in rows])
+        for i, prediction in zip(rows, predictions):
+            results[i] = prediction
+    return results
 
 
 # =============================================================================
@@ -128,12 +438,92 @@ model: StubModel | None = None
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    global model
+    global models, predict_batcher, inference_pool, explain_pool, shadow_pool, summary_jobs, traffic, paired_log, drift_sketches
     logger.info(f"Starting {Config.SERVICE_NAME} v{Config.SERVICE_VERSION}")
-    logger.info(f"Loading model from {Config.MODEL_PATH}")
-    model = StubModel()
-    logger.info(f"Model loaded: {model.version}")
+    models = ModelManager(load=load_model, resolve=resolve_model)
+    try:
+        await models.load(Config.MODEL_PATH, make_default=True)
+    except FileNotFoundError:
+        logger.warning(f"No trained model at {Config.MODEL_PATH}, serving stub model")
+        models.add(StubModel(), make_default=True)
+    
+    traffic = TrafficSplit(
+        enabled=Config.NEW_MODEL_V2,
+        canary_percent=Config.CANARY_PERCENT,
+        shadow=Config.SHADOW_MODE,
+        max_shadow_in_flight=Config.SHADOW_MAX_IN_FLIGHT
+    )
+    paired_log = PairedOutputLog(
+        Config.SHADOW_LOG_DIR,
+        max_rows=Config.SHADOW_LOG_MAX_ROWS,
+        flush_interval=Config.SHADOW_LOG_FLUSH_SECONDS
+    )
+    if Config.DRIFT_SKETCHES:
+        drift_sketches = DriftSketchLog(
+            Config.DRIFT_SKETCH_DIR,
+            replica=Config.REPLICA_ID,
+            window_seconds=Config.DRIFT_WINDOW_SECONDS
+        )
+    if Config.CANDIDATE_MODEL:
+        try:
+            candidate = await models.load(Config.CANDIDATE_MODEL)
+            if candidate is models.default:
+                logger.error(f"Candidate {Config.CANDIDATE_MODEL} is the default model, traffic is not split")
+            else:
+                traffic.candidate_version = candidate.version
+        except Exception as e:
+            logger.error(f"Candidate model not loaded, traffic is not split: {e}")
+    
+    inference_pool = BoundedExecutor(
+        "inference",
+        ThreadPoolExecutor(Config.INFERENCE_THREADS, thread_name_prefix="inference"),
+        Config.INFERENCE_MAX_PENDING
+    )
+    shadow_pool = BoundedExecutor(
+        "shadow",
+        ThreadPoolExecutor(Config.SHADOW_THREADS, thread_name_prefix="shadow"),
+        Config.SHADOW_MAX_IN_FLIGHT
+    )
+    # spawn, not fork: forking after XGBoost's OpenMP runtime has started can
+    # deadlock. Workers start on first use and load models by directory.
+    default = models.default
+    explain_pool = BoundedExecutor(
+        "explain",
+        ProcessPoolExecutor(
+            Config.EXPLAIN_PROCESSES,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=init_explain_worker,
+            initargs=(Config.EXPLAIN_NICE, default.model_dir if isinstance(default, BoosterModel) else None)
+        ),
+        Config.EXPLAIN_MAX_PENDING
+    )
+    summary_jobs = SummaryJobManager(
+        lambda model_dir, X: explain_pool.run(abs_shap_sum_in_worker, model_dir, X),
+        lambda *args: explain_pool.run(write_summary_artifacts, *args),
+        output_dir=Config.SUMMARY_OUTPUT_DIR,
+        chunk_size=Config.SUMMARY_CHUNK_SIZE,
+        parallelism=Config.EXPLAIN_PROCESSES,
+        max_queued=Config.SUMMARY_MAX_QUEUED
+    )
+    
+    if Config.PREDICT_MAX_BATCH_SIZE > 1:
+        predict_batcher = MicroBatcher(
+            run_predict_batch,
+            max_batch_size=Config.PREDICT_MAX_BATCH_SIZE,
+            max_wait_us=Config.PREDICT_MAX_WAIT_US
+        )
     yield
+    if shadow_tasks:
+        await asyncio.gather(*shadow_tasks, return_exceptions=True)
+    await paired_log.close()
+    if drift_sketches:
+        await drift_sketches.close()
+    if predict_batcher:
+        await predict_batcher.close()
+    await summary_jobs.close()
+    inference_pool.shutdown()
+    shadow_pool.shutdown()
+    explain_pool.shutdown()
     logger.info(f"Shutting down {Config.SERVICE_NAME}")
 
 
@@ -144,6 +534,19 @@ app = FastAPI(
 )
 
 
+@app.exception_handler(JobQueueFull)
+@app.exception_handler(ExecutorSaturated)
+async def saturated_handler(request: Request, exc: ExecutorSaturated | JobQueueFull):
+    """Shed load quickly instead of queueing when a pool or the summary job queue is full."""
+    logger.warning(f"Rejected {request.url.path}: {exc}")
+    return JSONResponse(status_code=503, content={"detail": str(exc)}, headers={"Retry-After": "1"})
+
+
+@app.exception_handler(ModelNotFound)
+async def model_not_found_handler(request: Request, exc: ModelNotFound):
+    return JSONResponse(status_code=404, content={"detail": str(exc)})
+
+
 # =============================================================================
 # Endpoints
 # =============================================================================
@@ -151,12 +554,20 @@ app = FastAPI(
 @app.get("/health", response_model=HealthResponse)
 async def health_check():
     """Health check endpoint."""
+    model = models.default if models else None
     return HealthResponse(
         status="healthy" if model and model.loaded else "unhealthy",
         service=Config.SERVICE_NAME,
         version=Config.SERVICE_VERSION,
         model_loaded=model.loaded if model else False,
         model_version=model.version if model else "none",
+        models=models.stats() if models else {},
+        traffic=traffic.stats() if traffic else {},
+        executors={
+            pool.name: pool.stats() for pool in (inference_pool, shadow_pool, explain_pool) if pool
+        },
+        explain_cache=model.explanations.stats() if isinstance(model, BoosterModel) else {},
+        summary_jobs=summary_jobs.stats() if summary_jobs else {},
         timestamp=datetime.utcnow().isoformat()
     )
 
@@ -165,58 +576,134 @@ async def health_check():
 async def predict(request: PredictRequest):
     """
     Run inference on input features.
-    STUB: Uses rule-based logic.
+    
+    With the new_model_v2 flag on, a share of accounts is served by the
+    candidate model (canary); in shadow mode the other model also scores
+    the request after the response is ready, and the pair is logged.
     """
-    if not model:
-        raise HTTPException(status_code=503, detail="Model not loaded")
+    model, shadow_model, canary = route_request(request)
     
-    start = datetime.utcnow()
-    prediction, confidence = model.predict(request.features)
-    elapsed = (datetime.utcnow() - start).total_seconds() * 1000
+    start = time.perf_counter()
+    prediction, confidence = await score(model, request.features)
+    elapsed = (time.perf_counter() - start) * 1000
+    if drift_sketches:
+        drift_sketches.observe(model, request.features)
     
     logger.info(f"Prediction: {request.request_id} -> {prediction} ({confidence:.2f})")
     
-    return PredictResponse(
+    response = PredictResponse(
         request_id=request.request_id,
         prediction=prediction,
         confidence=confidence,
         model_version=model.version,
         inference_time_ms=elapsed
     )
+    if shadow_model is not None and traffic.try_start_shadow():
+        task = asyncio.create_task(run_shadow(request, response, shadow_model, canary))
+        shadow_tasks.add(task)
+        task.add_done_callback(shadow_tasks.discard)
+    return response
 
 
-@app.post("/v1/predict/batch")
+@app.post("/v1/predict/batch", response_model=BatchPredictResponse)
 async def predict_batch(requests: list[PredictRequest]):
-    """Batch inference."""
-    if not model:
-        raise HTTPException(status_code=503, detail="Model not loaded")
+    """
+    Batch inference.
     
-    start = datetime.utcnow()
-    results = []
+    All rows are stacked into one matrix (in the model's feature order) and
+    scored with a single model call; each result reports its share of the
+    model call time.
+    """
+    model = get_batch_model(requests)
+    
+    start = time.perf_counter()
+    X = model.feature_matrix([req.features for req in requests])
+    model_start = time.perf_counter()
+    predictions, confidences = await inference_pool.run(model.predict_matrix, X)
+    model_ms = (time.perf_counter() - model_start) * 1000
+    if drift_sketches:
+        drift_sketches.observe_matrix(model, X)
+    per_row_ms = model_ms / max(len(requests), 1)
     
-    for req in requests:
-        prediction, confidence = model.predict(req.features)
-        results.append(PredictResponse(
+    results = [
+        PredictResponse(
             request_id=req.request_id,
             prediction=prediction,
             confidence=confidence,
             model_version=model.version,
-            inference_time_ms=0
-        ))
+            inference_time_ms=per_row_ms
+        )
+        for req, prediction, confidence in zip(requests, predictions.tolist(), confidences.tolist())
+    ]
     
-    elapsed = (datetime.utcnow() - start).total_seconds() * 1000
+    elapsed = (time.perf_counter() - start) * 1000
     
-    return {"results": results, "total_time_ms": elapsed}
+    return BatchPredictResponse(results=results, total_time_ms=elapsed)
+
+
+@app.post("/v1/predict/batch/columnar")
+async def predict_batch_columnar(request: Request, model_version: str | None = None):
+    """
+    Columnar batch inference for large batches.
+    
+    Accepts either JSON {"request_ids": [...], "features": {name: [values]}}
+    or an Arrow IPC stream (Content-Type: application/vnd.apache.arrow.stream)
+    with one column per feature and an optional request_id column. Columns
+    are converted straight to a NumPy matrix, skipping per-row validation.
+    Responds with parallel prediction/confidence arrays, as JSON or, when
+    the Accept header asks for it, as an Arrow IPC stream.
+    """
+    model = get_model(model_version)
+    
+    start = time.perf_counter()
+    request_ids, X = await read_columnar(request, model.feature_names)
+    
+    model_start = time.perf_counter()
+    predictions, confidences = await inference_pool.run(model.predict_matrix, X)
+    model_ms = (time.perf_counter() - model_start) * 1000
+    if drift_sketches:
+        drift_sketches.observe_matrix(model, X)
+    
+    if ARROW_STREAM in request.headers.get("accept", ""):
+        columns = {
+            "prediction": pa.array(predictions.tolist(), pa.string()),
+            "confidence": pa.array(confidences, pa.float32()),
+        }
+        if request_ids is not None:
+            columns = {"request_id": pa.array(np.asarray(request_ids).tolist(), pa.string()), **columns}
+        table = pa.table(columns).replace_schema_metadata({
+            "model_version": model.version,
+            "inference_time_ms": str(model_ms),
+        })
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        return Response(content=sink.getvalue().to_pybytes(), media_type=ARROW_STREAM)
+    
+    return JSONResponse({
+        "request_ids": None if request_ids is None else np.asarray(request_ids).tolist(),
+        "predictions": predictions.tolist(),
+        "confidences": confidences.tolist(),
+        "model_version": model.version,
+        "inference_time_ms": model_ms,
+        "total_time_ms": (time.perf_counter() - start) * 1000,
+    })
 
 
 @app.post("/v1/explain", response_model=ExplainResponse)
 async def explain(request: PredictRequest):
-    """Get prediction explanation with SHAP values."""
-    if not model:
-        raise HTTPException(status_code=503, detail="Model not loaded")
+    """
+    Get prediction explanation with SHAP values.
+    
+    Cache hits are answered on the event loop; misses run the booster's
+    native TreeSHAP in the inference pool, which also yields the prediction.
+    """
+    model = get_model(request.model_version)
     
-    prediction, confidence = model.predict(request.features)
-    shap_values = model.get_shap_values(request.features)
+    explanation = model.cached_explanation(request.features)
+    if explanation is None:
+        explanation = await inference_pool.run(model.explain, request.features)
+    prediction, confidence, shap_values = explanation
     
     return ExplainResponse(
         request_id=request.request_id,
@@ -226,6 +713,147 @@ async def explain(request: PredictRequest):
     )
 
 
+@app.post("/v1/explain/batch", response_model=BatchExplainResponse)
+async def explain_batch(requests: list[PredictRequest]):
+    """Explain many rows with one native TreeSHAP call."""
+    model = get_batch_model(requests)
+    
+    start = time.perf_counter()
+    explanations = await inference_pool.run(model.explain_many, [req.features for req in requests])
+    results = [
+        ExplainResponse(
+            request_id=req.request_id,
+            prediction=prediction,
+            confidence=confidence,
+            feature_importance=shap_values
+        )
+        for req, (prediction, confidence, shap_values) in zip(requests, explanations)
+    ]
+    
+    return BatchExplainResponse(results=results, total_time_ms=(time.perf_counter() - start) * 1000)
+
+
+@app.post("/v1/explain/summary", response_model=SummaryJobResponse, status_code=202)
+async def create_summary_job(request: Request, model_version: str | None = None):
+    """
+    Start a population-level SHAP summary over a large sample.
+    
+    Takes the same columnar body as /v1/predict/batch/columnar. SHAP values
+    are computed in chunks in the explain worker pool; poll
+    /v1/explain/summary/{job_id} or stream .../events for partial feature
+    importance. The final importance JSON and summary plot are written
+    under SUMMARY_OUTPUT_DIR/<job_id>/.
+    """
+    model = get_model(model_version)
+    if not isinstance(model, BoosterModel):
+        raise HTTPException(status_code=503, detail="SHAP summaries need a trained model")
+    
+    _, X = await read_columnar(request, model.feature_names)
+    if not len(X):
+        raise HTTPException(status_code=422, detail="Empty sample")
+    
+    job = summary_jobs.submit(X, model)
+    logger.info(f"Summary job {job.job_id} queued ({len(X)} rows)")
+    return SummaryJobResponse(**job.to_dict())
+
+
+def get_summary_job(job_id: str):
+    job = summary_jobs.get(job_id) if summary_jobs else None
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown summary job {job_id}")
+    return job
+
+
+@app.get("/v1/explain/summary/{job_id}", response_model=SummaryJobResponse)
+async def summary_job_status(job_id: str):
+    """Current status and (partial) feature importance of a summary job."""
+    return SummaryJobResponse(**get_summary_job(job_id).to_dict())
+
+
+@app.get("/v1/explain/summary/{job_id}/events")
+async def summary_job_events(job_id: str):
+    """Stream job updates as NDJSON, one line per completed chunk, until the job finishes."""
+    job = get_summary_job(job_id)
+    
+    async def events():
+        while True:
+            updated = job.updated
+            yield json.dumps(job.to_dict()) + "\n"
+            if job.done:
+                return
+            await updated.wait()
+    
+    return StreamingResponse(events(), media_type="application/x-ndjson")
+
+
+@app.get("/v1/models")
+async def list_models():
+    """Loaded model versions, the default, and loads in progress."""
+    return models.stats()
+
+
+@app.post("/v1/models", status_code=202)
+async def load_model_version(request: LoadModelRequest):
+    """
+    Load a model version in the background.
+    
+    The model is resolved, loaded and warmed off the event loop and only
+    then published (and made the default if make_default), so requests
+    never see a half-loaded model. Poll /v1/models for progress and errors.
+    """
+    if request.source is None and request.stage is None:
+        raise HTTPException(status_code=422, detail="Give a source or a registry stage")
+    source = request.source or registry_uri(Config.MODEL_NAME, request.stage)
+    models.load_in_background(source, request.make_default)
+    return {"source": source, "status": "loading"}
+
+
+@app.get("/v1/traffic")
+async def get_traffic():
+    """Canary / shadow settings, shadow counters and paired-output log state."""
+    return {**traffic.stats(), "paired_log": paired_log.stats()}
+
+
+@app.put("/v1/traffic")
+async def update_traffic(settings: TrafficSettings):
+    """
+    Change canary / shadow settings at runtime; the candidate must already
+    be loaded and must not be the default model.
+    """
+    if settings.candidate_version is not None and models.get(settings.candidate_version) is models.default:
+        raise HTTPException(
+            status_code=409,
+            detail=f"Candidate {settings.candidate_version} is the default model; nothing would be split"
+        )
+    traffic.update(**settings.model_dump())
+    return traffic.stats()
+
+
+@app.get("/v1/drift/sketches")
+async def get_drift_sketches():
+    """Feature sketches of the current (partial) window, one per served model version."""
+    if drift_sketches is None:
+        raise HTTPException(status_code=404, detail="Drift sketches are disabled")
+    return {**drift_sketches.stats(), "sketches": drift_sketches.sketches()}
+
+
+@app.post("/v1/models/{version}/default")
+async def set_default_model(version: str):
+    """Route unversioned requests to an already loaded version (e.g. to roll back)."""
+    models.set_default(version)
+    return models.stats()
+
+
+@app.delete("/v1/models/{version}")
+async def unload_model_version(version: str):
+    """Stop serving a version; requests already using it complete normally."""
+    try:
+        models.unload(version)
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return models.stats()
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8001)
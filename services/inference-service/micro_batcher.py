@@ -0,0 +1,104 @@
+"""
+Micro-Batcher
+Coalesces concurrent single-item calls into one batched call.
+"""
+
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable
+
+logger = logging.getLogger(__name__)
+
+
+class MicroBatcher:
+    """
+    Dynamic micro-batching for async request handlers.
+
+    Callers submit one item and await its result. Items are queued until
+    either max_batch_size items are waiting or max_wait_us has passed
+    since the first one arrived, then run_batch is called once with the
+    whole batch and each caller's future is resolved with its own result.
+    Batches run as separate tasks, so the next batch can fill while the
+    previous one is still being scored.
+    Under low load a request waits at most max_wait_us; under high load
+    the model runs far fewer, larger calls.
+    """
+
+    def __init__(
+        self,
+        run_batch: Callable[[list], Awaitable[list]],
+        max_batch_size: int = 64,
+        max_wait_us: int = 500
+    ):
+        """
+        Args:
+            run_batch: Async function mapping a list of items to a list of
+                results, in order
+            max_batch_size: Flush as soon as this many items are queued
+            max_wait_us: Flush this long after the first queued item
+        """
+        self.run_batch = run_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait_us = max_wait_us
+        self._pending: list[tuple[Any, asyncio.Future]] = []
+        self._timer: asyncio.TimerHandle | None = None
+        self._running: set[asyncio.Task] = set()
+        self.batches = 0
+        self.items = 0
+
+    async def submit(self, item: Any) -> Any:
+        """Queue one item and wait for its result."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((item, future))
+
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait_us / 1_000_000, self._flush)
+
+        return await future
+
+    def _flush(self):
+        """Start running everything queued so far as one batch."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+
+        self.batches += 1
+        self.items += len(batch)
+        task = asyncio.ensure_future(self._run(batch))
+        self._running.add(task)
+        task.add_done_callback(self._running.discard)
+
+    async def _run(self, batch: list[tuple[Any, asyncio.Future]]):
+        try:
+            results = await self.run_batch([item for item, _ in batch])
+        except Exception as e:
+            logger.warning(f"Batch of {len(batch)} failed: {e}")
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, future), result in zip(batch, results):
+            # Callers that disconnected have cancelled futures
+            if not future.done():
+                future.set_result(result)
+
+    async def close(self):
+        """Flush anything still queued and wait for running batches (on shutdown)."""
+        self._flush()
+        if self._running:
+            await asyncio.gather(*self._running, return_exceptions=True)
+
+    def stats(self) -> dict:
+        return {
+            "batches": self.batches,
+            "items": self.items,
+            "mean_batch_size": self.items / self.batches if self.batches else 0.0,
+        }
@@ -0,0 +1,237 @@
+"""
+Model Manager
+Holds several loaded model versions and swaps the default without a restart.
+
+Models are resolved from a local artifacts directory, a local file
+registry or an MLflow registry URI, loaded and warmed in a background thread, and only published once
+fully loaded. Requests take a reference to one model for their whole
+lifetime, so swapping the default never affects in-flight requests.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import tempfile
+from pathlib import Path
+from typing import Any, Callable
+
+logger = logging.getLogger(__name__)
+
+
+class ModelNotFound(Exception):
+    """Raised for a model version that is not loaded."""
+
+
+def registry_uri(model_name: str, stage: str = "Production") -> str:
+    """Registry URI of the model in a stage (as ModelRegistry.get_model_uri in ml/models/baseline)."""
+    return f"models:/{model_name}/{stage}"
+
+
+def has_artifacts(model_dir: str) -> bool:
+    """Whether a directory holds a model (model.pack or model.json)."""
+    return any(os.path.exists(os.path.join(model_dir, name)) for name in ("model.pack", "model.json"))
+
+
+class LocalRegistryIndex:
+    """
+    Reader of a local file registry (ml/models/baseline/registry.py).
+
+    index.json maps each model's stages to versions and versions to
+    artifact paths; it is cached and only re-read when the file changes,
+    so resolving a stage costs one stat().
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+        self.index_path = os.path.join(root, "index.json")
+        self._index: dict = {"models": {}}
+        self._index_mtime: int | None = None
+
+    def index(self) -> dict:
+        mtime = os.stat(self.index_path).st_mtime_ns
+        if mtime != self._index_mtime:
+            with open(self.index_path) as f:
+                self._index = json.load(f)
+            self._index_mtime = mtime
+        return self._index
+
+    def resolve(self, uri: str) -> str:
+        """
+        Artifacts directory for models:/name/stage or models:/name/version.
+
+        Raises:
+            FileNotFoundError: If the model, stage or version is not registered
+        """
+        name, _, stage_or_version = uri[len("models:/"):].partition("/")
+        try:
+            model = self.index()["models"][name]
+            version = model["stages"].get(stage_or_version, stage_or_version)
+            entry = model["versions"][version]
+        except (FileNotFoundError, KeyError):
+            raise FileNotFoundError(f"{uri} is not in the local registry at {self.root}") from None
+        return os.path.join(self.root, entry["path"])
+
+
+def resolve_model_dir(
+    source: str,
+    models_root: str,
+    tracking_uri: str,
+    download_dir: str,
+    local_registry: LocalRegistryIndex | None = None
+) -> str:
+    """
+    Local artifacts directory for a model source.
+
+    Args:
+        source: An artifacts directory, a version directory name under
+            models_root, or an MLflow URI (models:/name/stage, models:/name/3,
+            runs:/id/model)
+        models_root: Directory holding one artifacts directory per version
+        tracking_uri: MLflow tracking server, for registry URIs
+        download_dir: Where registry artifacts are downloaded
+        local_registry: Resolve models:/ URIs from this local registry
+            instead of MLflow (no network access)
+
+    Raises:
+        FileNotFoundError: If no artifacts are found for a local source
+    """
+    if local_registry and source.startswith("models:/"):
+        return local_registry.resolve(source)
+
+    if source.startswith(("models:/", "runs:/")):
+        # Imported lazily: only needed when serving from the registry
+        import mlflow
+
+        Path(download_dir).mkdir(parents=True, exist_ok=True)
+        local = mlflow.artifacts.download_artifacts(
+            artifact_uri=source,
+            tracking_uri=tracking_uri,
+            dst_path=tempfile.mkdtemp(dir=download_dir)
+        )
+        # register_model() logs the artifacts under a "model" directory
+        if not has_artifacts(local) and os.path.isdir(os.path.join(local, "model")):
+            local = os.path.join(local, "model")
+        return local
+
+    for candidate in (source, os.path.join(models_root, source)):
+        if has_artifacts(candidate):
+            return candidate
+    raise FileNotFoundError(f"No model artifacts for {source!r} (looked in {source} and {models_root})")
+
+
+def same_model(a, b) -> bool:
+    """Whether two loaded models come from the same artifacts (equal model_id)."""
+    a_id, b_id = getattr(a, "model_id", None), getattr(b, "model_id", None)
+    return a_id is not None and a_id == b_id
+
+
+class ModelManager:
+    """
+    Loaded model versions plus the default one.
+
+    The versions dict and the default are only ever replaced by a single
+    assignment on the event loop, after a model is fully loaded and warmed.
+    """
+
+    def __init__(self, load: Callable[[str], Any], resolve: Callable[[str], str]):
+        """
+        Args:
+            load: Blocking fn(model_dir) -> loaded, warmed model with a .version
+            resolve: Blocking fn(source) -> model_dir
+        """
+        self._load = load
+        self._resolve = resolve
+        self.versions: dict[str, Any] = {}
+        self.default_version: str | None = None
+        self.loading: dict[str, asyncio.Task] = {}
+        self.errors: dict[str, str] = {}
+
+    @property
+    def default(self):
+        return self.versions.get(self.default_version)
+
+    def get(self, version: str | None = None):
+        """The model for a request: the named version, or the default."""
+        model = self.versions.get(version or self.default_version)
+        if model is None:
+            raise ModelNotFound(f"Model version {version} is not loaded" if version else "No model loaded")
+        return model
+
+    def add(self, model, make_default: bool = False):
+        """
+        Publish an already loaded model.
+
+        Versions come from the model metadata, which different trainings can
+        share. A model whose version is already served by a different model
+        (other model_id, i.e. other artifacts) is published as
+        "<version>+<model_id prefix>" instead of replacing it; reloading the
+        same artifacts replaces the loaded copy.
+        """
+        loaded = self.versions.get(model.version)
+        if loaded is not None and loaded is not model and not same_model(loaded, model):
+            model_id = getattr(model, "model_id", None)
+            suffix = model_id[:12] if model_id else str(sum(v.startswith(f"{model.version}+") for v in self.versions) + 1)
+            logger.warning(
+                f"Model version {model.version} is already served by other artifacts; serving as {model.version}+{suffix}"
+            )
+            model.version = f"{model.version}+{suffix}"
+        self.versions = {**self.versions, model.version: model}
+        if make_default or self.default_version is None:
+            self.default_version = model.version
+        logger.info(f"Serving model {model.version}" + (" (default)" if self.default_version == model.version else ""))
+
+    async def load(self, source: str, make_default: bool = False):
+        """
+        Resolve, load and warm a model off the event loop, then publish it.
+
+        Concurrent loads of the same source share one load.
+        """
+        task = self.loading.get(source)
+        if task is None:
+            task = self.loading[source] = asyncio.create_task(self._load_source(source, make_default))
+            task.add_done_callback(lambda _: self.loading.pop(source, None))
+        return await asyncio.shield(task)
+
+    def load_in_background(self, source: str, make_default: bool = False) -> asyncio.Task:
+        """Start loading a model; failures are recorded in .errors."""
+        task = asyncio.ensure_future(self.load(source, make_default))
+        task.add_done_callback(lambda t: t.cancelled() or t.exception())
+        return task
+
+    async def _load_source(self, source: str, make_default: bool):
+        logger.info(f"Loading model from {source}")
+        self.errors.pop(source, None)
+        try:
+            model_dir = await asyncio.to_thread(self._resolve, source)
+            model = await asyncio.to_thread(self._load, model_dir)
+        except Exception as e:
+            logger.error(f"Failed to load model from {source}: {e}")
+            self.errors[source] = str(e)
+            raise
+        self.add(model, make_default)
+        return model
+
+    def set_default(self, version: str):
+        """Atomically route unversioned requests to an already loaded version."""
+        if version not in self.versions:
+            raise ModelNotFound(f"Model version {version} is not loaded")
+        self.default_version = version
+        logger.info(f"Default model is now {version}")
+
+    def unload(self, version: str):
+        """Stop serving a version. In-flight requests keep their reference."""
+        if version == self.default_version:
+            raise ValueError("Cannot unload the default model; set another default first")
+        if version not in self.versions:
+            raise ModelNotFound(f"Model version {version} is not loaded")
+        self.versions = {v: m for v, m in self.versions.items() if v != version}
+        logger.info(f"Unloaded model {version}")
+
+    def stats(self) -> dict:
+        return {
+            "default": self.default_version,
+            "versions": sorted(self.versions),
+            "loading": sorted(self.loading),
+            "errors": dict(self.errors),
+        }
@@ -0,0 +1,196 @@
+"""
+Traffic Splitting
+Canary and shadow traffic for a candidate model version (new_model_v2).
+
+Canary sends a fixed percentage of accounts to the candidate. Shadow also
+scores every request on the other model after the response is sent, and
+the paired outputs are written to Parquet for offline comparison of
+agreement and latency.
+"""
+
+import asyncio
+import logging
+import time
+import zlib
+from pathlib import Path
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+logger = logging.getLogger(__name__)
+
+
+class TrafficSplit:
+    """
+    Routing between the default model and a candidate version.
+
+    Canary routing hashes the account id, so an account always sees the
+    same model while the percentage is unchanged.
+    """
+
+    def __init__(self, enabled: bool = False, candidate_version: str | None = None,
+                 canary_percent: float = 0.0, shadow: bool = False, max_shadow_in_flight: int = 32):
+        """
+        Args:
+            enabled: The new_model_v2 flag; nothing is split while off
+            candidate_version: Loaded model version to canary / shadow
+            canary_percent: Share of accounts served by the candidate (0-100)
+            shadow: Also score every request on the other model, off the response path
+            max_shadow_in_flight: Shadow scores beyond this are dropped, not queued
+        """
+        self.enabled = enabled
+        self.candidate_version = candidate_version
+        self.canary_percent = canary_percent
+        self.shadow = shadow
+        self.max_shadow_in_flight = max_shadow_in_flight
+        self.shadow_in_flight = 0
+        self.shadow_scored = 0
+        self.shadow_dropped = 0
+        # Split requests served unsplit (candidate missing or the serving model)
+        self.unsplit = 0
+        self._unsplit_logged = False
+
+    def update(self, **settings):
+        for name, value in settings.items():
+            if value is not None:
+                setattr(self, name, value)
+        self._unsplit_logged = False
+        logger.info(f"Traffic split: {self.settings()}")
+
+    def is_canary(self, account_id: str) -> bool:
+        """Whether this account is served by the candidate."""
+        if not self.enabled or self.canary_percent <= 0:
+            return False
+        return zlib.crc32(account_id.encode()) % 10_000 < self.canary_percent * 100
+
+    def count_unsplit(self, reason: str):
+        """Count a request the split could not route; logged once per settings change."""
+        self.unsplit += 1
+        if not self._unsplit_logged:
+            self._unsplit_logged = True
+            logger.warning(f"Traffic split enabled but not splitting: {reason}")
+
+    def try_start_shadow(self) -> bool:
+        """Reserve a shadow slot; False (and counted as dropped) when at the limit."""
+        if self.shadow_in_flight >= self.max_shadow_in_flight:
+            self.shadow_dropped += 1
+            return False
+        self.shadow_in_flight += 1
+        return True
+
+    def finish_shadow(self, scored: bool):
+        self.shadow_in_flight -= 1
+        if scored:
+            self.shadow_scored += 1
+        else:
+            self.shadow_dropped += 1
+
+    def settings(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "candidate_version": self.candidate_version,
+            "canary_percent": self.canary_percent,
+            "shadow": self.shadow,
+        }
+
+    def stats(self) -> dict:
+        return {
+            **self.settings(),
+            "shadow_in_flight": self.shadow_in_flight,
+            "shadow_scored": self.shadow_scored,
+            "shadow_dropped": self.shadow_dropped,
+            "unsplit": self.unsplit,
+        }
+
+
+class PairedOutputLog:
+    """
+    Buffered Parquet log of (served, shadow) model outputs.
+
+    Rows are appended as tuples (O(1) per request) and written as one
+    zstd-compressed Parquet file per flush, off the event loop.
+    """
+
+    SCHEMA = pa.schema([
+        ("timestamp", pa.float64()),
+        ("request_id", pa.string()),
+        ("account_id", pa.string()),
+        ("canary", pa.bool_()),
+        ("served_version", pa.string()),
+        ("served_prediction", pa.string()),
+        ("served_confidence", pa.float32()),
+        ("served_ms", pa.float32()),
+        ("shadow_version", pa.string()),
+        ("shadow_prediction", pa.string()),
+        ("shadow_confidence", pa.float32()),
+        ("shadow_ms", pa.float32()),
+    ])
+
+    def __init__(self, directory: str, max_rows: int = 10_000, flush_interval: float = 60.0):
+        """
+        Args:
+            directory: Output directory for pairs-*.parquet files
+            max_rows: Flush once this many rows are buffered
+            flush_interval: Also flush buffered rows at least this often (seconds)
+        """
+        self.directory = Path(directory)
+        self.max_rows = max_rows
+        self.flush_interval = flush_interval
+        self._rows: list[tuple] = []
+        self._sequence = 0
+        self._writes: set[asyncio.Task] = set()
+        self._ticker: asyncio.Task | None = None
+        self.rows_written = 0
+        self.files_written = 0
+
+    def append(self, *row):
+        """Buffer one pair, in SCHEMA column order."""
+        self._rows.append(row)
+        if self._ticker is None:
+            self._ticker = asyncio.create_task(self._flush_periodically())
+        if len(self._rows) >= self.max_rows:
+            self.flush()
+
+    def flush(self):
+        """Write buffered rows to a new file in a worker thread."""
+        if not self._rows:
+            return
+        rows, self._rows = self._rows, []
+        self._sequence += 1
+        path = self.directory / f"pairs-{int(time.time())}-{self._sequence:06d}.parquet"
+        task = asyncio.create_task(asyncio.to_thread(self._write, path, rows))
+        self._writes.add(task)
+        task.add_done_callback(self._writes.discard)
+
+    def _write(self, path: Path, rows: list[tuple]):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        columns = [
+            pa.array(values, type=field.type)
+            for values, field in zip(zip(*rows), self.SCHEMA)
+        ]
+        table = pa.Table.from_arrays(columns, schema=self.SCHEMA)
+        tmp_path = path.with_suffix(".tmp")
+        pq.write_table(table, tmp_path, compression="zstd")
+        tmp_path.rename(path)
+        self.rows_written += len(rows)
+        self.files_written += 1
+
+    async def _flush_periodically(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            self.flush()
+
+    async def close(self):
+        """Flush remaining rows and wait for pending writes."""
+        if self._ticker:
+            self._ticker.cancel()
+        self.flush()
+        if self._writes:
+            await asyncio.gather(*self._writes, return_exceptions=True)
+
+    def stats(self) -> dict:
+        return {
+            "buffered": len(self._rows),
+            "rows_written": self.rows_written,
+            "files_written": self.files_written,
+        }
@@ -0,0 +1,79 @@
+"""
+Sharded Backfill Scaling Benchmark
+Reports ShardedBackfill throughput at 1, 2, 4 and N worker processes.
+
+Usage: python -m tests.benchmarks.bench_backfill --rows 1000000 --files 8
+"""
+
+import argparse
+import os
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from ml.features.backfill import ShardedBackfill
+from tests.benchmarks.bench_feature_pipeline import generate_records
+
+
+def write_inputs(work_dir: Path, rows: int, files: int, reference_date: datetime) -> list[Path]:
+    """Write synthetic raw records split across several Parquet files."""
+    per_file = rows // files
+    paths = []
+    for i in range(files):
+        records = generate_records(per_file, reference_date, seed=i)
+        for j, record in enumerate(records):
+            record['account_id'] = f'ACC{i:03d}{j:08d}'
+        path = work_dir / f'accounts-{i:03d}.parquet'
+        pq.write_table(pa.Table.from_pandas(pd.DataFrame(records), preserve_index=False), path)
+        paths.append(path)
+    return paths
+
+
+def run(rows: int, files: int, shards: int) -> dict:
+    reference_date = datetime(2024, 6, 15)
+    worker_counts = sorted({1, 2, 4, os.cpu_count() or 1})
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        work_dir = Path(tmp)
+        inputs = write_inputs(work_dir, rows, files, reference_date)
+        total = (rows // files) * files
+
+        baseline = None
+        for workers in worker_counts:
+            output = work_dir / f'features-{workers}.parquet'
+            runner = ShardedBackfill(reference_date=reference_date, workers=workers, num_shards=shards)
+            start = time.perf_counter()
+            runner.run(inputs, output)
+            elapsed = time.perf_counter() - start
+            results[workers] = total / elapsed
+
+            # Output must be identical regardless of worker count
+            features = pd.read_parquet(output).drop(columns=['created_at'])
+            if baseline is None:
+                baseline = features
+            else:
+                pd.testing.assert_frame_equal(features, baseline)
+
+            print(f"workers={workers:>3}: {elapsed:8.2f}s  {results[workers]:12,.0f} records/sec  "
+                  f"({results[workers] / results[1]:.2f}x)")
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--files', type=int, default=8)
+    parser.add_argument('--shards', type=int, default=64)
+    args = parser.parse_args()
+    run(args.rows, args.files, args.shards)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+Model Cold-Start Benchmark
+Time to first prediction for the packed artifact (model.pack) versus the
+JSON artifacts (model.json + metadata.json), each in a fresh interpreter.
+
+Usage: python -m tests.benchmarks.bench_cold_start --runs 5 --n-samples 20000
+"""
+
+import argparse
+import json
+import shutil
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+from unittest import mock
+
+import numpy as np
+
+from ml.models.baseline import train
+from tests.benchmarks.bench_micro_batching import SERVICE_DIR
+
+# Run in a fresh interpreter: imports, loads and scores one row
+COLD_START = """
+import json, sys, time
+start = time.perf_counter()
+sys.path.insert(0, sys.argv[2])
+from types import SimpleNamespace
+from booster_model import BoosterModel
+imported = time.perf_counter()
+model = BoosterModel(sys.argv[1])
+loaded = time.perf_counter()
+model.predict(SimpleNamespace(days_past_due=40, outstanding_balance=900.0, payment_history_score=0.6,
+                              contact_attempts=2, last_payment_days_ago=30, account_age_months=24))
+first = time.perf_counter()
+print(json.dumps({"import_ms": (imported - start) * 1e3, "load_ms": (loaded - imported) * 1e3,
+                  "first_prediction_ms": (first - start) * 1e3, "format": model.artifact_format}))
+"""
+
+
+def train_artifacts(work_dir: Path, n_samples: int) -> Path:
+    config = train.load_config()
+    config['data'] = {'source': 'synthetic', 'n_samples': n_samples, 'cache_dir': str(work_dir / 'cache')}
+    model, le, metrics, feature_names, X_train = train.train_model(config)
+    with mock.patch.object(train, 'OUTPUT_DIR', work_dir / 'artifacts'):
+        train.save_artifacts(model, le, metrics, feature_names, config, reference_data=X_train)
+    return work_dir / 'artifacts'
+
+
+def cold_start(model_dir: Path, runs: int) -> dict:
+    samples = [
+        json.loads(subprocess.run(
+            [sys.executable, '-c', COLD_START, str(model_dir), str(SERVICE_DIR)],
+            check=True, capture_output=True, text=True
+        ).stdout.strip().splitlines()[-1])
+        for _ in range(runs)
+    ]
+    result = {name: float(np.median([s[name] for s in samples])) for name in samples[0] if name != 'format'}
+    result['format'] = samples[0]['format']
+    return result
+
+
+def run(runs: int, n_samples: int) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        work_dir = Path(tmp)
+        artifacts = train_artifacts(work_dir, n_samples)
+
+        json_dir = work_dir / 'json'
+        json_dir.mkdir()
+        for name in ('model.json', 'metadata.json'):
+            shutil.copy(artifacts / name, json_dir)
+        pack_dir = work_dir / 'pack'
+        pack_dir.mkdir()
+        shutil.copy(artifacts / 'model.pack', pack_dir)
+
+        return {
+            'bytes': {
+                'json': sum((json_dir / name).stat().st_size for name in ('model.json', 'metadata.json')),
+                'pack': (pack_dir / 'model.pack').stat().st_size,
+            },
+            'json': cold_start(json_dir, runs),
+            'pack': cold_start(pack_dir, runs),
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--n-samples', type=int, default=20_000, help='Training rows (more rows, bigger trees)')
+    args = parser.parse_args()
+
+    results = run(args.runs, args.n_samples)
+
+    print(f"{'artifact':<10} {'size KB':>9} {'import ms':>10} {'load ms':>9} {'first prediction ms':>20}")
+    for name in ('json', 'pack'):
+        r = results[name]
+        print(f"{name:<10} {results['bytes'][name] / 1024:>9.0f} {r['import_ms']:>10.1f} "
+              f"{r['load_ms']:>9.1f} {r['first_prediction_ms']:>20.1f}")
+    print(f"Load speedup: {results['json']['load_ms'] / results['pack']['load_ms']:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+"""
+Feature Pipeline Benchmark
+Compares per-record and columnar FeaturePipeline.transform_batch throughput.
+
+Usage: python -m tests.benchmarks.bench_feature_pipeline --rows 200000
+"""
+
+import argparse
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from ml.features.pipeline import FeaturePipeline
+
+
+def generate_records(n: int, reference_date: datetime, seed: int = 42) -> list[dict]:
+    """Generate synthetic raw account records."""
+    rng = np.random.default_rng(seed)
+    due_offsets = rng.integers(-400, 30, n)
+    payment_offsets = rng.integers(0, 500, n)
+    open_offsets = rng.integers(30, 4000, n)
+    history_lengths = rng.integers(0, 12, n)
+    balances = rng.exponential(1000, n)
+    contacts = rng.poisson(3, n)
+
+    return [
+        {
+            'account_id': f'ACC{i:08d}',
+            'due_date': reference_date + timedelta(days=int(due_offsets[i])),
+            'outstanding_balance': float(balances[i]),
+            'payment_history': [{'on_time': bool(j % 3)} for j in range(history_lengths[i])],
+            'contact_attempts': int(contacts[i]),
+            'last_payment_date': reference_date - timedelta(days=int(payment_offsets[i])),
+            'open_date': reference_date - timedelta(days=int(open_offsets[i])),
+        }
+        for i in range(n)
+    ]
+
+
+def run(rows: int) -> dict:
+    reference_date = datetime(2024, 6, 15)
+    pipeline = FeaturePipeline(reference_date=reference_date)
+    records = generate_records(rows, reference_date)
+
+    results = {}
+    for mode, vectorized in [('per_record', False), ('columnar', True)]:
+        start = time.perf_counter()
+        pipeline.transform_batch(records, vectorized=vectorized)
+        elapsed = time.perf_counter() - start
+        results[mode] = rows / elapsed
+        print(f"{mode:>10}: {elapsed:8.3f}s  {rows / elapsed:12,.0f} records/sec")
+
+    # Columnar engine on data already in Arrow form (e.g. read from Parquet)
+    table = pa.Table.from_pandas(pd.DataFrame(records), preserve_index=False)
+    start = time.perf_counter()
+    pipeline.transform_columns(table)
+    elapsed = time.perf_counter() - start
+    results['arrow'] = rows / elapsed
+    print(f"{'arrow':>10}: {elapsed:8.3f}s  {rows / elapsed:12,.0f} records/sec")
+
+    for mode in ['columnar', 'arrow']:
+        print(f"{mode:>10} speedup: {results[mode] / results['per_record']:.1f}x")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=200_000)
+    args = parser.parse_args()
+    run(args.rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+Feature Validation Benchmark
+Compares per-row validate_features against the vectorized validate_batch.
+
+Usage: python -m tests.benchmarks.bench_feature_validation --rows 1000000
+"""
+
+import argparse
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from ml.features.pipeline import FeaturePipeline
+
+
+def generate_features(n: int, seed: int = 42) -> pd.DataFrame:
+    """Synthetic feature frame with ~1% out-of-range rows."""
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        'account_id': [f'ACC{i:08d}' for i in range(n)],
+        'days_past_due': rng.integers(0, 365, n),
+        'outstanding_balance': rng.exponential(1000, n),
+        'payment_history_score': rng.beta(5, 2, n),
+        'contact_attempts': rng.poisson(3, n),
+        'last_payment_days_ago': rng.integers(0, 365, n),
+        'account_age_months': rng.integers(1, 120, n),
+    })
+    bad = rng.random(n) < 0.01
+    df.loc[bad, 'payment_history_score'] = 1.5
+    return df
+
+
+def run(rows: int) -> dict:
+    pipeline = FeaturePipeline(reference_date=datetime(2024, 6, 15))
+    df = generate_features(rows)
+
+    start = time.perf_counter()
+    per_row = [i for i, row in enumerate(df.to_dict('records')) if pipeline.validate_features(row)]
+    per_row_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    report = pipeline.validate_batch(df, max_rows=rows)
+    batch_time = time.perf_counter() - start
+
+    assert report['invalid_rows'] == per_row
+    print(f" per_row: {per_row_time:8.3f}s  {rows / per_row_time:14,.0f} rows/sec")
+    print(f"   batch: {batch_time:8.3f}s  {rows / batch_time:14,.0f} rows/sec")
+    print(f" speedup: {per_row_time / batch_time:.1f}x  ({report['invalid_row_count']} invalid rows)")
+    return {'per_row': per_row_time, 'batch': batch_time}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    args = parser.parse_args()
+    run(args.rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Point-in-Time Join Benchmark
+Reports HistoricalFeatureJoiner throughput for a synthetic label set.
+
+Usage: python -m tests.benchmarks.bench_historical_join --labels 10000000 --feature-rows 2000000
+"""
+
+import argparse
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from ml.features.historical import HistoricalFeatureJoiner
+
+
+def write_sources(repo: Path, feature_rows: int, accounts: np.ndarray, start: datetime, rng):
+    """Write synthetic account_features and payment_history sources."""
+    (repo / 'data').mkdir()
+    timestamps = start + pd.to_timedelta(rng.integers(0, 365 * 86400, feature_rows), unit='s')
+    pd.DataFrame({
+        'account_id': accounts[rng.integers(0, len(accounts), feature_rows)],
+        'event_timestamp': timestamps,
+        'created_at': timestamps,
+        'days_past_due': rng.integers(0, 120, feature_rows),
+        'outstanding_balance': rng.random(feature_rows) * 5000,
+        'contact_attempts': rng.integers(0, 10, feature_rows),
+        'last_payment_days_ago': rng.integers(0, 365, feature_rows),
+        'account_age_months': rng.integers(1, 120, feature_rows),
+    }).to_parquet(repo / 'data' / 'account_features.parquet', index=False)
+    payment_rows = feature_rows // 4
+    pd.DataFrame({
+        'account_id': accounts[rng.integers(0, len(accounts), payment_rows)],
+        'event_timestamp': start + pd.to_timedelta(rng.integers(0, 365 * 86400, payment_rows), unit='s'),
+        'payment_history_score': rng.random(payment_rows),
+    }).to_parquet(repo / 'data' / 'payment_history.parquet', index=False)
+
+
+def run(labels: int, feature_rows: int, accounts: int) -> float:
+    rng = np.random.default_rng(0)
+    start = datetime(2024, 1, 1)
+    account_ids = np.array([f'ACC{i:08d}' for i in range(accounts)], dtype=object)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        repo = Path(tmp)
+        write_sources(repo, feature_rows, account_ids, start, rng)
+        entity_df = pd.DataFrame({
+            'account_id': account_ids[rng.integers(0, accounts, labels)],
+            'event_timestamp': start + pd.to_timedelta(rng.integers(0, 365 * 86400, labels), unit='s'),
+            'label': rng.integers(0, 4, labels),
+        })
+
+        joiner = HistoricalFeatureJoiner(repo_path=repo)
+        t0 = time.perf_counter()
+        result = joiner.get_historical_features(entity_df)
+        elapsed = time.perf_counter() - t0
+
+    matched = result['days_past_due'].notna().mean()
+    rate = labels / elapsed
+    print(f"labels={labels:,} feature_rows={feature_rows:,}: {elapsed:.2f}s  "
+          f"{rate:,.0f} labels/sec  ({matched:.1%} matched account_features)")
+    return rate
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--labels', type=int, default=1_000_000)
+    parser.add_argument('--feature-rows', type=int, default=500_000)
+    parser.add_argument('--accounts', type=int, default=100_000)
+    args = parser.parse_args()
+    run(args.labels, args.feature_rows, args.accounts)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""
+Micro-Batching Load Test
+Compares /v1/predict throughput and p50/p99 latency with and without
+micro-batching, using concurrent in-process clients against the ASGI app.
+
+Usage: python -m tests.benchmarks.bench_micro_batching --requests 5000 --concurrency 64
+"""
+
+import argparse
+import asyncio
+import importlib.util
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+from unittest import mock
+
+import httpx
+import numpy as np
+
+from ml.models.baseline import train
+
+SERVICE_DIR = Path(__file__).parents[2] / "services" / "inference-service"
+
+
+def train_baseline(work_dir: Path) -> Path:
+    """Train the baseline model into work_dir and return its artifacts directory."""
+    config = train.load_config()
+    config['data'] = {'source': 'synthetic', 'n_samples': 5000, 'cache_dir': str(work_dir / 'cache')}
+    model, le, metrics, feature_names, X_train = train.train_model(config)
+    with mock.patch.object(train, 'OUTPUT_DIR', work_dir / 'artifacts'):
+        train.save_artifacts(model, le, metrics, feature_names, config, reference_data=X_train)
+    return work_dir / 'artifacts'
+
+
+def load_inference_service(name: str, **env):
+    """Import inference-service's main.py under a unique module name."""
+    os.environ.update(env)
+    if str(SERVICE_DIR) not in sys.path:
+        sys.path.insert(0, str(SERVICE_DIR))
+    spec = importlib.util.spec_from_file_location(name, SERVICE_DIR / 'main.py')
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def make_payloads(n: int, seed: int = 0) -> list[dict]:
+    rng = np.random.default_rng(seed)
+    return [
+        {
+            'request_id': f'req-{i}',
+            'features': {
+                'account_id': f'ACC{i:08d}',
+                'days_past_due': int(rng.integers(0, 180)),
+                'outstanding_balance': float(rng.exponential(1000)),
+                'payment_history_score': float(rng.beta(5, 2)),
+                'contact_attempts': int(rng.poisson(3)),
+                'last_payment_days_ago': int(rng.integers(0, 365)),
+                'account_age_months': int(rng.integers(1, 120)),
+            },
+        }
+        for i in range(n)
+    ]
+
+
+async def load_test(service, payloads: list[dict], concurrency: int) -> tuple[float, np.ndarray]:
+    """Run payloads through /v1/predict with `concurrency` clients; returns (elapsed, latencies)."""
+    latencies = np.zeros(len(payloads))
+    queue = iter(range(len(payloads)))
+
+    async with service.lifespan(service.app):
+        transport = httpx.ASGITransport(app=service.app)
+        async with httpx.AsyncClient(transport=transport, base_url='http://bench') as client:
+            async def worker():
+                for i in queue:
+                    start = time.perf_counter()
+                    response = await client.post('/v1/predict', json=payloads[i])
+                    latencies[i] = time.perf_counter() - start
+                    response.raise_for_status()
+
+            start = time.perf_counter()
+            await asyncio.gather(*[worker() for _ in range(concurrency)])
+            elapsed = time.perf_counter() - start
+
+    return elapsed, latencies
+
+
+def run(requests: int, concurrency: int, max_batch_size: int, max_wait_us: int) -> dict:
+    payloads = make_payloads(requests)
+    results = {}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        model_dir = train_baseline(Path(tmp))
+        modes = {
+            'unbatched': {'PREDICT_MAX_BATCH_SIZE': '1'},
+            'micro-batched': {
+                'PREDICT_MAX_BATCH_SIZE': str(max_batch_size),
+                'PREDICT_MAX_WAIT_US': str(max_wait_us),
+            },
+        }
+        for mode, env in modes.items():
+            service = load_inference_service(
+                f"bench_inference_{mode.replace('-', '_')}", MODEL_PATH=str(model_dir), LOG_LEVEL='WARNING', **env
+            )
+            elapsed, latencies = asyncio.run(load_test(service, payloads, concurrency))
+            results[mode] = {
+                'throughput': requests / elapsed,
+                'p50_ms': float(np.percentile(latencies, 50) * 1000),
+                'p99_ms': float(np.percentile(latencies, 99) * 1000),
+            }
+            batching = service.predict_batcher.stats() if service.predict_batcher else {'mean_batch_size': 1.0}
+            print(f"{mode:>14}: {results[mode]['throughput']:10,.0f} req/s  "
+                  f"p50={results[mode]['p50_ms']:7.2f}ms  p99={results[mode]['p99_ms']:7.2f}ms  "
+                  f"mean batch={batching['mean_batch_size']:.1f}")
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--requests', type=int, default=5000)
+    parser.add_argument('--concurrency', type=int, default=64)
+    parser.add_argument('--max-batch-size', type=int, default=64)
+    parser.add_argument('--max-wait-us', type=int, default=500)
+    args = parser.parse_args()
+    run(args.requests, args.concurrency, args.max_batch_size, args.max_wait_us)
+
+
+if __name__ == "__main__":
+    main()
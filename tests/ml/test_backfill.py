@@ -0,0 +1,61 @@
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+
+from ml.features.backfill import ShardedBackfill, main, shard_ids
+from ml.features.pipeline import FeaturePipeline
+from tests.ml.test_pipeline import REFERENCE_DATE, make_records
+
+
+@pytest.fixture
+def input_files(tmp_path):
+    records = make_records(600, seed=21)
+    paths = []
+    for i in range(3):
+        path = tmp_path / f"accounts-{i}.parquet"
+        chunk = pd.DataFrame(records[i * 200:(i + 1) * 200])
+        pq.write_table(pa.Table.from_pandas(chunk, preserve_index=False), path)
+        paths.append(path)
+    return records, paths
+
+
+def test_shard_ids_are_stable():
+    ids = ['ACC001', 'ACC002', None]
+    assert shard_ids(ids, 8).tolist() == shard_ids(ids, 8).tolist()
+    assert shard_ids(ids, 8)[2] == shard_ids(['unknown'], 8)[0]
+    assert ((shard_ids(ids, 8) >= 0) & (shard_ids(ids, 8) < 8)).all()
+
+
+def test_output_independent_of_worker_count(input_files, tmp_path):
+    records, paths = input_files
+
+    outputs = []
+    for workers in [1, 3]:
+        output = tmp_path / f"features-{workers}.parquet"
+        runner = ShardedBackfill(reference_date=REFERENCE_DATE, workers=workers, num_shards=8, chunk_size=64)
+        assert runner.run(paths, output) == 600
+        outputs.append(pd.read_parquet(output).drop(columns=['created_at']))
+
+    pd.testing.assert_frame_equal(outputs[0], outputs[1])
+
+
+def test_backfill_matches_single_process_pipeline(input_files, tmp_path):
+    records, paths = input_files
+    output = tmp_path / "features.parquet"
+
+    main([str(p) for p in paths] + [
+        '--output', str(output), '--workers', '2', '--shards', '4',
+        '--reference-date', REFERENCE_DATE.isoformat(),
+    ])
+
+    expected = (
+        FeaturePipeline(reference_date=REFERENCE_DATE)
+        .transform_batch(records, vectorized=False)
+        .sort_values('account_id', ignore_index=True)
+    )
+    actual = (
+        pd.read_parquet(output)[FeaturePipeline.OUTPUT_COLUMNS]
+        .sort_values('account_id', ignore_index=True)
+    )
+    pd.testing.assert_frame_equal(actual, expected)
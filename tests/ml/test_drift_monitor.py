@@ -0,0 +1,123 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+from scipy.stats import ks_2samp
+
+from ml.monitoring.drift_monitor import DataDriftMonitor, FeatureSketch, PerformanceMonitor
+
+
+def slice_rows(dpd_90_f1):
+    return [
+        {'slice': 'dpd_band', 'segment': '0-29', 'n': 800, 'f1_weighted': 0.95},
+        {'slice': 'dpd_band', 'segment': '90+', 'n': 50, 'f1_weighted': dpd_90_f1},
+    ]
+
+
+def test_segment_decay_from_json_and_parquet(tmp_path):
+    with open(tmp_path / 'slice_metrics.json', 'w') as f:
+        json.dump(slice_rows(0.90), f)
+    pd.DataFrame(slice_rows(0.70)).to_parquet(tmp_path / 'slice_metrics.parquet')
+
+    monitor = PerformanceMonitor()
+    monitor.log_metrics({'f1_weighted': 0.94})
+    assert monitor.ingest_slice_report(tmp_path / 'slice_metrics.json') == 2
+    monitor.log_metrics({'f1_weighted': 0.93})
+    assert monitor.ingest_slice_report(tmp_path / 'slice_metrics.parquet') == 2
+
+    decay = {r['segment']: r for r in monitor.check_segment_decay()}
+
+    assert monitor.segments() == ['dpd_band=0-29', 'dpd_band=90+']
+    assert decay['dpd_band=90+']['decay_detected']
+    assert not decay['dpd_band=0-29']['decay_detected']
+    assert not monitor.check_decay()['decay_detected']
+    assert monitor.check_decay()['segment'] is None
+
+
+def test_compute_stats_matches_numpy():
+    data = np.random.default_rng(0).exponential(30, 10_001)
+    stats = DataDriftMonitor().compute_stats(data)
+
+    assert stats['median'] == np.median(data)
+    assert stats['p25'] == np.percentile(data, 25)
+    assert stats['p75'] == np.percentile(data, 75)
+
+
+def test_drift_scores_from_reference_sketch():
+    rng = np.random.default_rng(0)
+    reference = rng.normal(0, 1, 50_000)
+    same = rng.normal(0, 1, 50_000)
+    shifted = rng.normal(0.5, 1, 50_000)
+
+    monitor = DataDriftMonitor()
+    monitor.set_reference('balance', reference)
+    stable = monitor.check_drift('balance', same)
+    drifted = monitor.check_drift('balance', shifted)
+
+    assert stable['psi'] < 0.01 and not stable['drift_detected']
+    assert drifted['psi'] > 0.2 and drifted['severity'] == 'high'
+    assert abs(drifted['ks'] - ks_2samp(reference, shifted).statistic) < 0.01
+    assert drifted['js_divergence'] > stable['js_divergence']
+    assert abs(drifted['current']['median'] - np.median(shifted)) < 0.05
+    assert monitor.alerts == [drifted]
+
+
+def test_matrix_check_matches_per_feature_check():
+    rng = np.random.default_rng(1)
+    reference = np.column_stack([rng.normal(0, 1, 20_000), rng.poisson(3, 20_000), rng.exponential(30, 20_000)])
+    current = np.column_stack([rng.normal(0.2, 1, 30_000), rng.poisson(4, 30_000), rng.exponential(30, 30_000)])
+    names = ['a', 'b', 'c']
+
+    monitor = DataDriftMonitor()
+    monitor.set_reference_matrix(reference, names)
+    reports = monitor.check_drift_matrix(current, names, chunk_rows=7_000)
+
+    for j, name in enumerate(names):
+        single = monitor.check_drift(name, current[:, j])
+        for key in ('psi', 'ks', 'js_divergence', 'mean_shift_zscore'):
+            assert np.isclose(reports[name][key], single[key])
+    assert 'error' in monitor.check_drift_matrix(current[:, :1], ['unknown'])['unknown']
+
+
+def test_rising_missing_share_is_drift():
+    rng = np.random.default_rng(2)
+    current = rng.normal(0, 1, 20_000)
+    current[:4_000] = np.nan
+
+    monitor = DataDriftMonitor()
+    monitor.set_reference('score', rng.normal(0, 1, 20_000))
+    report = monitor.check_drift('score', current)
+
+    assert report['drift_detected']
+    assert report['ks'] < 0.05
+
+
+def test_streamed_and_merged_sketches_match_batch_check():
+    rng = np.random.default_rng(3)
+    names = ['a', 'b']
+    monitor = DataDriftMonitor()
+    monitor.set_reference_matrix(np.column_stack([rng.normal(0, 1, 20_000), rng.exponential(5, 20_000)]), names)
+    current = np.column_stack([rng.normal(0.3, 1, 3_000), rng.exponential(5, 3_000)])
+    current[::5, 1] = np.nan
+
+    streamed = monitor.sketch(names)
+    for row in current[:1_000]:
+        streamed.update(row)
+    other = monitor.sketch(names)
+    other.update_matrix(current[1_000:])
+    merged = streamed.merge(FeatureSketch.from_dict(json.loads(json.dumps(other.to_dict()))))
+
+    reports = monitor.check_drift_sketch(merged)
+    expected = monitor.check_drift_matrix(current, names)
+    for name in names:
+        for key in ('psi', 'ks', 'js_divergence'):
+            assert np.isclose(reports[name][key], expected[name][key])
+        assert np.isclose(reports[name]['current']['std'], np.nanstd(current[:, names.index(name)]))
+
+    other_monitor = DataDriftMonitor(n_bins=20)
+    other_monitor.set_reference_matrix(current, names)
+    with pytest.raises(ValueError):
+        merged.merge(other_monitor.sketch(names))
+    with pytest.raises(ValueError):
+        monitor.check_drift_sketch(other_monitor.sketch(names))
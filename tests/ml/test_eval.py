@@ -0,0 +1,144 @@
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.metrics import accuracy_score, classification_report, confusion_matrix, f1_score
+
+from ml.models.baseline.eval import (
+    bootstrap_intervals,
+    evaluate,
+    evaluate_chunks,
+    generate_test_data,
+    iter_test_data,
+    metrics_from_confusion,
+    regression_gate,
+    save_slice_report,
+    slice_codes,
+    slice_segments,
+)
+from ml.models.baseline.train import load_config, train_model
+
+SLICES = load_config()['evaluation']['slices']
+
+
+@pytest.fixture(scope="module")
+def trained(tmp_path_factory):
+    config = load_config()
+    config['data'] = {
+        'source': 'synthetic',
+        'n_samples': 5000,
+        'cache_dir': str(tmp_path_factory.mktemp('cache')),
+    }
+    model, le, metrics, feature_names, X_train = train_model(config)
+    metadata = {'feature_names': feature_names, 'label_classes': list(le.classes_), 'metrics': metrics}
+    return model, metadata
+
+
+def test_metrics_match_sklearn(trained):
+    model, metadata = trained
+    df = generate_test_data(n_samples=3000, seed=7)
+    y_pred = [metadata['label_classes'][i] for i in model.inplace_predict(df[metadata['feature_names']]).argmax(axis=1)]
+
+    metrics = evaluate(model, metadata, df)
+    report = classification_report(
+        df['label'], y_pred, labels=metadata['label_classes'], output_dict=True, zero_division=0
+    )
+
+    assert metrics['accuracy'] == pytest.approx(accuracy_score(df['label'], y_pred))
+    assert metrics['f1_weighted'] == pytest.approx(f1_score(df['label'], y_pred, average='weighted', zero_division=0))
+    assert metrics['confusion_matrix']['matrix'] == confusion_matrix(
+        df['label'], y_pred, labels=metadata['label_classes']
+    ).tolist()
+    for label, per_class in metrics['per_class'].items():
+        assert per_class['f1'] == pytest.approx(report[label]['f1-score'])
+        assert per_class['support'] == report[label]['support']
+
+
+def test_chunked_evaluation_matches_single_pass(trained):
+    model, metadata = trained
+    chunks = list(iter_test_data(2500, chunk_size=1000, seed=11))
+
+    chunked = evaluate_chunks(model, metadata, iter(chunks), n_bootstrap=0)
+    whole = evaluate(model, metadata, pd.concat(chunks, ignore_index=True), n_bootstrap=0)
+
+    assert [len(c) for c in chunks] == [1000, 1000, 500]
+    assert chunked == whole
+    assert chunked['n_samples'] == 2500
+
+
+def test_unknown_labels_raise(trained):
+    model, metadata = trained
+    df = generate_test_data(n_samples=10, seed=1)
+    df.loc[0, 'label'] = 'settled'
+
+    with pytest.raises(ValueError, match="settled"):
+        evaluate(model, metadata, df)
+
+
+def test_bootstrap_intervals_cover_and_shrink():
+    counts = np.array([[80, 10, 10], [5, 90, 5], [10, 10, 80]])
+
+    small = bootstrap_intervals(counts, n_bootstrap=2000)
+    large = bootstrap_intervals(counts * 100, n_bootstrap=2000)
+    point = metrics_from_confusion(counts)
+
+    for name in ('accuracy', 'f1_weighted'):
+        assert small[name][0] < point[name] < small[name][1]
+        assert large[name][0] < point[name] < large[name][1]
+        assert large[name][1] - large[name][0] < (small[name][1] - small[name][0]) / 5
+    batched = metrics_from_confusion(np.stack([counts, counts.T]))
+    assert batched['f1_weighted'][1] == pytest.approx(metrics_from_confusion(counts.T)['f1_weighted'])
+
+
+def test_regression_gate_ignores_noise_and_catches_drops():
+    metrics = {
+        'accuracy': 0.90,
+        'f1_weighted': 0.89,
+        'confidence_intervals': {'accuracy': [0.88, 0.92], 'f1_weighted': [0.87, 0.91]},
+    }
+
+    assert regression_gate(metrics, {'accuracy': 0.925, 'f1_weighted': 0.91}, max_drop=0.01)['passed']
+    failed = regression_gate(metrics, {'accuracy': 0.95, 'f1_weighted': 0.90}, max_drop=0.01)
+    assert not failed['passed']
+    assert failed['checks']['accuracy']['regressed']
+    assert not failed['checks']['f1_weighted']['regressed']
+
+
+def test_slice_segments_and_codes():
+    spec = {'name': 'dpd', 'feature': 'days_past_due', 'edges': [30, 60]}
+
+    assert slice_segments(spec) == ['<30', '30-60', '>=60', 'missing']
+    assert slice_codes(spec, [0, 29.9, 30, 59, 60, 400, np.nan]).tolist() == [0, 0, 1, 1, 2, 2, 3]
+    with pytest.raises(ValueError):
+        slice_segments({**spec, 'labels': ['low', 'high']})
+
+
+def test_sliced_metrics_match_per_segment_evaluation(trained):
+    model, metadata = trained
+    df = generate_test_data(n_samples=4000, seed=5)
+
+    rows = evaluate(model, metadata, df, n_bootstrap=200, slices=SLICES)['slices']
+
+    assert {row['slice'] for row in rows} == {spec['name'] for spec in SLICES}
+    for spec in SLICES:
+        slice_rows = [row for row in rows if row['slice'] == spec['name']]
+        assert sum(row['n'] for row in slice_rows) == len(df)
+        segments = np.array(slice_segments(spec))[slice_codes(spec, df[spec['feature']])]
+        for row in slice_rows:
+            expected = evaluate(model, metadata, df[segments == row['segment']], n_bootstrap=0)
+            assert row['n'] == expected['n_samples']
+            assert row['f1_weighted'] == pytest.approx(expected['f1_weighted'])
+            assert row['accuracy_low'] <= row['accuracy'] <= row['accuracy_high']
+
+
+def test_slice_report_files_round_trip(tmp_path, trained):
+    model, metadata = trained
+    rows = evaluate(model, metadata, generate_test_data(n_samples=500, seed=2), n_bootstrap=0, slices=SLICES)['slices']
+
+    paths = save_slice_report(rows, tmp_path, model_version='1.0.0')
+
+    from_parquet = pd.read_parquet(paths['parquet'])
+    assert len(from_parquet) == len(rows)
+    assert (from_parquet['model_version'] == '1.0.0').all()
+    assert from_parquet[['slice', 'segment', 'n']].to_dict('records') == [
+        {'slice': r['slice'], 'segment': r['segment'], 'n': r['n']} for r in rows
+    ]
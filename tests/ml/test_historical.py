@@ -0,0 +1,144 @@
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from ml.features.historical import HistoricalFeatureJoiner
+
+T0 = datetime(2024, 1, 10)
+
+
+@pytest.fixture
+def repo(tmp_path):
+    (tmp_path / "data").mkdir()
+    pd.DataFrame({
+        'account_id': ['A', 'A', 'A', 'B'],
+        'event_timestamp': [T0 - timedelta(days=2), T0, T0, T0 - timedelta(hours=1)],
+        'created_at': [T0, T0, T0 + timedelta(minutes=5), T0],
+        'days_past_due': [1, 2, 3, 10],
+        'outstanding_balance': [100.0, 200.0, 300.0, 1000.0],
+        'contact_attempts': [0, 0, 0, 0],
+        'last_payment_days_ago': [0, 0, 0, 0],
+        'account_age_months': [12, 12, 12, 12],
+    }).to_parquet(tmp_path / "data" / "account_features.parquet")
+    pd.DataFrame({
+        'account_id': ['A', 'B'],
+        'event_timestamp': [T0 - timedelta(days=5), T0 - timedelta(days=10)],
+        'payment_history_score': [0.8, 0.3],
+    }).to_parquet(tmp_path / "data" / "payment_history.parquet")
+    return tmp_path
+
+
+def test_point_in_time_semantics(repo):
+    entity_df = pd.DataFrame({
+        'account_id': ['A', 'A', 'B', 'A', 'C'],
+        'event_timestamp': [
+            T0 - timedelta(days=1),    # only the 2-days-old row is visible
+            T0 + timedelta(hours=1),   # two rows at T0: latest created_at wins
+            T0 + timedelta(hours=12),  # within account_features ttl (1 day)
+            T0 - timedelta(days=3),    # before any row
+            T0,                        # unknown account
+        ],
+        'label': [0, 1, 2, 3, 4],
+    })
+
+    result = HistoricalFeatureJoiner(repo_path=repo).get_historical_features(entity_df)
+
+    assert result['label'].tolist() == [0, 1, 2, 3, 4]
+    assert result['days_past_due'].tolist()[:3] == [1, 3, 10]
+    assert result['days_past_due'][3:].isna().all()
+    # payment_history ttl is 7 days: B's row is 10 days old
+    assert result['payment_history_score'].tolist()[:2] == [0.8, 0.8]
+    assert np.isnan(result['payment_history_score'][2])
+
+
+def test_ttl_boundary_and_exact_match(repo):
+    entity_df = pd.DataFrame({
+        'account_id': ['A', 'A', 'B'],
+        'event_timestamp': [T0, T0 + timedelta(days=1), T0 + timedelta(days=1, seconds=1)],
+    })
+
+    result = HistoricalFeatureJoiner(repo_path=repo).get_historical_features(
+        entity_df, ['account_features:days_past_due']
+    )
+
+    # Feature rows at the entity timestamp and exactly ttl old are included
+    assert result['days_past_due'].tolist()[:2] == [3, 3]
+    assert np.isnan(result['days_past_due'][2])
+
+
+def test_tz_aware_entities_and_full_names(repo):
+    entity_df = pd.DataFrame({
+        'account_id': ['A'],
+        'event_timestamp': pd.to_datetime([T0]).tz_localize('UTC').tz_convert('US/Eastern'),
+    })
+
+    result = HistoricalFeatureJoiner(repo_path=repo).get_historical_features(
+        entity_df, ['account_features:outstanding_balance'], full_feature_names=True
+    )
+
+    assert result['account_features__outstanding_balance'].tolist() == [300.0]
+
+
+def test_tz_aware_source(repo):
+    path = repo / "data" / "account_features.parquet"
+    source = pd.read_parquet(path)
+    source['event_timestamp'] = source['event_timestamp'].dt.tz_localize('UTC')
+    source.to_parquet(path)
+    entity_df = pd.DataFrame({
+        'account_id': ['A', 'A', 'B'],
+        'event_timestamp': [T0 - timedelta(days=1), T0 + timedelta(hours=1), T0 + timedelta(days=2)],
+    })
+
+    result = HistoricalFeatureJoiner(repo_path=repo).get_historical_features(
+        entity_df, ['account_features:days_past_due']
+    )
+
+    assert result['days_past_due'].tolist()[:2] == [1, 3]
+    assert np.isnan(result['days_past_due'][2])
+
+
+def test_matches_brute_force(tmp_path):
+    rng = np.random.default_rng(0)
+    (tmp_path / "data").mkdir()
+    m, n = 2000, 3000
+    ids = np.array([f"ACC{i:03d}" for i in range(50)], dtype=object)
+    source = pd.DataFrame({
+        'account_id': ids[rng.integers(0, 50, m)],
+        'event_timestamp': T0 + pd.to_timedelta(rng.integers(0, 30 * 24, m), unit='h'),
+        'created_at': T0 + pd.to_timedelta(rng.integers(0, 1000, m), unit='s'),
+        'days_past_due': np.arange(m),
+        'outstanding_balance': rng.random(m),
+        'contact_attempts': 0,
+        'last_payment_days_ago': 0,
+        'account_age_months': 1,
+    })
+    source.to_parquet(tmp_path / "data" / "account_features.parquet")
+    entity_df = pd.DataFrame({
+        'account_id': ids[rng.integers(0, 50, n)],
+        'event_timestamp': T0 + pd.to_timedelta(rng.integers(0, 31 * 24, n), unit='h'),
+    })
+
+    result = HistoricalFeatureJoiner(repo_path=tmp_path).get_historical_features(
+        entity_df, ['account_features:days_past_due']
+    )
+
+    expected = []
+    for account_id, ts in zip(entity_df['account_id'], entity_df['event_timestamp']):
+        window = source[
+            (source['account_id'] == account_id)
+            & (source['event_timestamp'] <= ts)
+            & (source['event_timestamp'] >= ts - timedelta(days=1))
+        ]
+        latest = window.sort_values(['event_timestamp', 'created_at']).tail(1)
+        expected.append(latest['days_past_due'].iloc[0] if len(latest) else np.nan)
+
+    np.testing.assert_array_equal(result['days_past_due'].to_numpy(), np.array(expected, dtype=float))
+
+
+def test_unknown_view(repo):
+    entity_df = pd.DataFrame({'account_id': ['A'], 'event_timestamp': [T0]})
+
+    with pytest.raises(ValueError, match="Unknown feature view"):
+        HistoricalFeatureJoiner(repo_path=repo).get_historical_features(entity_df, ['nope:x'])
@@ -0,0 +1,121 @@
+import importlib.util
+from datetime import timedelta
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from ml.features.feast_registry import FeastRegistry
+from ml.features.online_store import LocalOnlineStore, materialize_from_offline, write_online_store
+from ml.features.payment_state import PaymentAggregateStore
+from ml.features.pipeline import FeaturePipeline
+from tests.ml.test_pipeline import REFERENCE_DATE, make_records
+
+SERVICE_READER = Path(__file__).parents[2] / "services" / "feature-service" / "online_store.py"
+
+
+def load_service_reader():
+    spec = importlib.util.spec_from_file_location("feature_service_online_store", SERVICE_READER)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+@pytest.fixture
+def features():
+    return FeaturePipeline(reference_date=REFERENCE_DATE).transform_batch(make_records(5000))
+
+
+def test_lookup_round_trip(features, tmp_path):
+    write_online_store(features, tmp_path / "store")
+    store = LocalOnlineStore(tmp_path / "store")
+
+    assert len(store) == 5000
+    row = store.get('ACC00042')
+    expected = features.set_index('account_id').loc['ACC00042']
+    assert row['days_past_due'] == expected['days_past_due']
+    assert row['payment_history_score'] == expected['payment_history_score']
+    assert store.get('ACC99999') is None
+    assert store.get('ACC000420000') is None  # longer than the stored id width
+
+
+def test_get_many_matches_frame(features, tmp_path):
+    write_online_store(features, tmp_path / "store")
+    store = LocalOnlineStore(tmp_path / "store")
+    ids = ['MISSING'] + features['account_id'].sample(500, random_state=1).tolist()
+
+    values, found = store.get_many(ids)
+
+    assert not found[0] and found[1:].all()
+    expected = features.set_index('account_id').loc[ids[1:]]
+    for name in FeaturePipeline.FEATURE_SCHEMA:
+        np.testing.assert_array_equal(values[name][1:], expected[name].to_numpy())
+
+
+def test_refresh_picks_up_new_generation(features, tmp_path):
+    write_online_store(features.iloc[:10], tmp_path / "store")
+    store = LocalOnlineStore(tmp_path / "store")
+    assert store.get('ACC00100') is None
+
+    for _ in range(3):
+        write_online_store(features, tmp_path / "store")
+
+    assert store.refresh()
+    assert store.get('ACC00100') is not None
+    assert len([p for p in (tmp_path / "store").iterdir() if p.is_dir()]) == 2
+
+
+def test_service_reader_reads_store(features, tmp_path):
+    write_online_store(features, tmp_path / "store")
+    reader = load_service_reader().MmapOnlineStore(str(tmp_path / "store"))
+    local = LocalOnlineStore(tmp_path / "store")
+
+    ids = features['account_id'].tolist()[::7] + ['NOPE']
+    np.testing.assert_array_equal(reader.lookup(ids), local.lookup(ids))
+
+
+def test_empty_store_finds_nothing(features, tmp_path):
+    write_online_store(features.iloc[:0], tmp_path / "store")
+    store = LocalOnlineStore(tmp_path / "store")
+    reader = load_service_reader().MmapOnlineStore(str(tmp_path / "store"))
+
+    values, found = store.get_many(['ACC00001', 'ACC00002'])
+
+    assert len(store) == 0
+    assert store.get('ACC00001') is None
+    assert not found.any()
+    assert reader.get('ACC00001') is None
+    assert reader.lookup(['ACC00001', 'ACC00002']).tolist() == [-1, -1]
+    assert not reader.get_many(['ACC00001'])[1].any()
+
+
+def test_registry_materializes_local_store(tmp_path):
+    pipeline = FeaturePipeline(reference_date=REFERENCE_DATE)
+    records = make_records(200)
+    account_path = tmp_path / "account_features.parquet"
+    pipeline.write_parquet(iter(records), account_path)
+
+    payments = PaymentAggregateStore(tmp_path / "payment_state.parquet")
+    payments.update([
+        {'account_id': 'ACC00001', 'payment_date': REFERENCE_DATE, 'on_time': True, 'amount': 10.0},
+        {'account_id': 'ACC00001', 'payment_date': REFERENCE_DATE, 'on_time': False, 'amount': 30.0},
+    ])
+    payment_path = tmp_path / "payment_history.parquet"
+    payments.write_features(payment_path, event_timestamp=REFERENCE_DATE)
+
+    materialize_from_offline(
+        REFERENCE_DATE - timedelta(days=1), REFERENCE_DATE + timedelta(days=1),
+        tmp_path / "store", account_path, payment_path,
+    )
+
+    registry = FeastRegistry(local_online_store=str(tmp_path / "store"))
+    result = registry.get_online_features(
+        [{"account_id": "ACC00001"}, {"account_id": "ACC00002"}, {"account_id": "NOPE"}],
+        ["account_features:days_past_due", "payment_history:total_payments",
+         "payment_history:payment_history_score"],
+    )
+
+    expected = pipeline.transform_batch(records[1:3], vectorized=False)
+    assert result["days_past_due"] == expected['days_past_due'].tolist() + [None]
+    assert result["total_payments"] == [2, 0, None]
+    assert result["payment_history_score"] == [0.5, 0.5, None]
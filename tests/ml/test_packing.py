@@ -0,0 +1,49 @@
+import numpy as np
+import pytest
+import xgboost as xgb
+
+from ml.models.baseline.packing import (
+    PACK_FILE,
+    read_packed_artifact,
+    split_thresholds,
+    write_packed_artifact,
+)
+from ml.models.baseline.train import generate_synthetic_data, load_config, train_model
+
+
+@pytest.fixture(scope="module")
+def trained(tmp_path_factory):
+    config = load_config()
+    config['data'] = {
+        'source': 'synthetic',
+        'n_samples': 1000,
+        'cache_dir': str(tmp_path_factory.mktemp('cache')),
+    }
+    model, le, metrics, feature_names, X_train = train_model(config)
+    metadata = {'version': '1.0.0', 'feature_names': feature_names, 'label_classes': list(le.classes_)}
+    return model, metadata
+
+
+def test_pack_round_trip(tmp_path, trained):
+    model, metadata = trained
+    path = write_packed_artifact(tmp_path, model, metadata)
+    pack = read_packed_artifact(path)
+    X = generate_synthetic_data(200, seed=9)[metadata['feature_names']].to_numpy(dtype=np.float32)
+
+    assert path.name == PACK_FILE
+    assert pack['metadata'] == metadata
+    assert pack['label_classes'] == metadata['label_classes']
+    np.testing.assert_array_equal(pack['booster'].inplace_predict(X), model.inplace_predict(X))
+    for packed, expected in zip(pack['split_thresholds'], split_thresholds(model, len(metadata['feature_names']))):
+        np.testing.assert_array_equal(packed, expected)
+
+    contribs = model.predict(xgb.DMatrix(X, feature_names=metadata['feature_names']), pred_contribs=True)
+    np.testing.assert_allclose(pack['expected_values'], contribs[0, :, -1], rtol=1e-6)
+
+
+def test_rejects_other_files(tmp_path):
+    path = tmp_path / PACK_FILE
+    path.write_bytes(b'{"learner": {}}' + bytes(64))
+
+    with pytest.raises(ValueError):
+        read_packed_artifact(path)
@@ -0,0 +1,119 @@
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from ml.features.payment_state import PaymentAggregateStore
+from ml.features.pipeline import FeaturePipeline
+from tests.ml.test_pipeline import REFERENCE_DATE, make_records
+
+START = datetime(2024, 1, 1)
+
+
+def payment_events(start_day: int, days: int) -> list[dict]:
+    return [
+        {
+            'account_id': f'ACC{i % 5:03d}',
+            'payment_date': START + timedelta(days=day, hours=i),
+            'on_time': (day + i) % 3 != 0,
+            'amount': 100.0 + i,
+        }
+        for day in range(start_day, start_day + days)
+        for i in range(5)
+    ]
+
+
+@pytest.fixture
+def store(tmp_path):
+    return PaymentAggregateStore(tmp_path / "payment_state.parquet")
+
+
+def test_incremental_updates_match_full_rebuild(store, tmp_path):
+    store.update(payment_events(0, 10))
+    store.save()
+
+    reloaded = PaymentAggregateStore(store.path)
+    assert reloaded.update(payment_events(10, 5)) == 25
+
+    full = PaymentAggregateStore(tmp_path / "full.parquet")
+    full.update(payment_events(0, 15))
+
+    incremental = reloaded.to_features().sort_values('account_id', ignore_index=True)
+    expected = full.to_features().sort_values('account_id', ignore_index=True)
+    pd.testing.assert_frame_equal(incremental, expected)
+    assert reloaded.watermark == full.watermark
+
+
+def test_events_before_watermark_are_skipped(store):
+    store.update(payment_events(0, 10))
+    before = store.to_features()
+
+    assert store.update(payment_events(5, 3)) == 0
+    pd.testing.assert_frame_equal(store.to_features(), before)
+
+
+def test_more_events_at_the_watermark_are_applied_once(store, tmp_path, caplog):
+    day = [
+        {'account_id': 'ACC001', 'payment_date': START, 'on_time': True, 'amount': 50.0},
+        {'account_id': 'ACC002', 'payment_date': START, 'on_time': False, 'amount': 75.0},
+    ]
+    store.update(day[:1])
+    store.save()
+
+    reloaded = PaymentAggregateStore(store.path)
+    # Second batch for the same date; the first event is redelivered
+    assert reloaded.update(day) == 1
+    assert reloaded.update(day) == 0
+
+    full = PaymentAggregateStore(tmp_path / "full.parquet")
+    full.update(day)
+    pd.testing.assert_frame_equal(
+        reloaded.to_features().sort_values('account_id', ignore_index=True),
+        full.to_features().sort_values('account_id', ignore_index=True),
+    )
+
+    with caplog.at_level('WARNING', logger='ml.features.payment_state'):
+        late = dict(day[0], payment_date=START - timedelta(days=1))
+        assert reloaded.update([late]) == 0
+    assert "Skipped 1 payment events before the watermark" in caplog.text
+
+
+def test_feature_columns(store):
+    store.update([
+        {'account_id': 'ACC001', 'payment_date': START, 'on_time': True, 'amount': 50.0},
+        {'account_id': 'ACC001', 'payment_date': START + timedelta(days=30), 'on_time': False, 'amount': 150.0},
+        {'account_id': 'ACC002', 'payment_date': START, 'on_time': True},
+    ])
+
+    features = store.to_features().set_index('account_id')
+    assert features.loc['ACC001', 'total_payments'] == 2
+    assert features.loc['ACC001', 'missed_payments'] == 1
+    assert features.loc['ACC001', 'payment_history_score'] == 0.5
+    assert features.loc['ACC001', 'average_payment_amount'] == 100.0
+    assert features.loc['ACC001', 'last_payment_date'] == pd.Timestamp(START + timedelta(days=30))
+    assert features.loc['ACC002', 'payment_history_score'] == 1.0
+    assert features.loc['ACC002', 'average_payment_amount'] == 0.0
+
+    on_time, total = store.counts(['ACC001', 'MISSING'])
+    assert on_time.tolist() == [1, 0]
+    assert total.tolist() == [2, 0]
+
+
+def test_pipeline_uses_payment_state(store):
+    records = make_records(50)
+    events = [
+        {'account_id': r['account_id'], 'payment_date': START + timedelta(days=j), 'on_time': p['on_time']}
+        for r in records
+        for j, p in enumerate(r['payment_history'])
+    ]
+    store.update(events)
+
+    expected = FeaturePipeline(reference_date=REFERENCE_DATE).transform_batch(records, vectorized=False)
+    incremental = FeaturePipeline(reference_date=REFERENCE_DATE, payment_state=store)
+
+    pd.testing.assert_frame_equal(incremental.transform_batch(records), expected)
+    pd.testing.assert_frame_equal(incremental.transform_batch(records, vectorized=False), expected)
+    assert np.isclose(
+        incremental.transform_single({'account_id': 'NEW'})['payment_history_score'], 0.5
+    )
@@ -0,0 +1,183 @@
+import json
+import random
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+
+from ml.features.pipeline import FeaturePipeline
+
+REFERENCE_DATE = datetime(2024, 6, 15, 13, 30, 0, 250)
+
+
+@pytest.fixture
+def pipeline():
+    return FeaturePipeline(reference_date=REFERENCE_DATE)
+
+
+def make_records(n: int, seed: int = 7) -> list[dict]:
+    """Random raw account records, including optional and edge-case fields."""
+    rng = random.Random(seed)
+    records = []
+    for i in range(n):
+        record = {
+            'account_id': f'ACC{i:05d}',
+            'due_date': REFERENCE_DATE + timedelta(days=rng.randint(-400, 30), seconds=rng.randint(-86400, 86400)),
+            'outstanding_balance': round(rng.uniform(0, 10000), 2),
+            'payment_history': [{'on_time': rng.random() < 0.7} for _ in range(rng.randint(0, 12))],
+            'contact_attempts': rng.randint(0, 15),
+            'open_date': REFERENCE_DATE - timedelta(days=rng.randint(-5, 4000), microseconds=rng.randint(0, 10**6)),
+        }
+        if rng.random() < 0.8:
+            record['last_payment_date'] = REFERENCE_DATE - timedelta(days=rng.randint(-3, 500), hours=rng.randint(0, 23))
+        records.append(record)
+    return records
+
+
+def test_vectorized_matches_per_record(pipeline):
+    records = make_records(500)
+
+    expected = pipeline.transform_batch(records, vectorized=False)
+    actual = pipeline.transform_batch(records)
+
+    pd.testing.assert_frame_equal(actual, expected)
+
+
+def test_missing_fields_use_per_record_defaults(pipeline):
+    records = [
+        {'account_id': 'ACC001'},
+        {'due_date': REFERENCE_DATE - timedelta(days=3), 'payment_history': []},
+        {'account_id': 'ACC003', 'payment_history': [{}, {'on_time': True}]},
+    ]
+
+    expected = pipeline.transform_batch(records, vectorized=False)
+    actual = pipeline.transform_batch(records)
+
+    pd.testing.assert_frame_equal(actual, expected)
+    assert actual.loc[1, 'account_id'] == 'unknown'
+    assert actual.loc[0, 'last_payment_days_ago'] == 365
+    assert actual.loc[0, 'payment_history_score'] == 0.5
+
+
+def test_arrow_input_matches_per_record(pipeline):
+    records = make_records(200, seed=11)
+    table = pa.Table.from_pandas(pd.DataFrame(records), preserve_index=False)
+
+    expected = pipeline.transform_batch(records, vectorized=False)
+    actual = pipeline.transform_columns(table)
+
+    pd.testing.assert_frame_equal(actual, expected)
+
+
+def test_string_dates_are_parsed(pipeline):
+    records = make_records(50, seed=3)
+    columns = pd.DataFrame(records)
+    for name in ['due_date', 'last_payment_date', 'open_date']:
+        columns[name] = columns[name].map(lambda d: d.isoformat() if isinstance(d, datetime) else None)
+
+    expected = pipeline.transform_batch(records, vectorized=False)
+    actual = pipeline.transform_columns(columns)
+
+    pd.testing.assert_frame_equal(actual, expected)
+
+
+def test_empty_batch_has_schema_columns(pipeline):
+    df = pipeline.transform_batch([])
+
+    assert list(df.columns) == FeaturePipeline.OUTPUT_COLUMNS
+    assert len(df) == 0
+
+
+def test_stream_to_parquet_matches_batch(pipeline, tmp_path):
+    records = make_records(1000, seed=5)
+    output = tmp_path / "account_features.parquet"
+
+    rows = pipeline.write_parquet(iter(records), output, chunk_size=128)
+
+    written = pq.read_table(output)
+    assert rows == 1000
+    assert written.num_rows == 1000
+    assert pq.ParquetFile(output).metadata.num_row_groups == 8
+    assert {"event_timestamp", "created_at"} <= set(written.column_names)
+
+    expected = pipeline.transform_batch(records, vectorized=False)
+    actual = written.to_pandas()[FeaturePipeline.OUTPUT_COLUMNS]
+    pd.testing.assert_frame_equal(actual, expected)
+
+
+def test_stream_from_jsonl_and_parquet(pipeline, tmp_path):
+    records = make_records(300, seed=9)
+    jsonl_path = tmp_path / "accounts.jsonl"
+    with open(jsonl_path, "w") as f:
+        for record in records:
+            f.write(json.dumps(record, default=str) + "\n")
+    parquet_path = tmp_path / "accounts.parquet"
+    pq.write_table(pa.Table.from_pandas(pd.DataFrame(records), preserve_index=False), parquet_path)
+
+    expected = pipeline.transform_batch(records, vectorized=False)
+    for source in [jsonl_path, parquet_path]:
+        chunks = list(pipeline.transform_stream(source, chunk_size=100))
+        assert [len(c) for c in chunks] == [100, 100, 100]
+        pd.testing.assert_frame_equal(pd.concat(chunks, ignore_index=True), expected)
+
+
+def test_failed_stream_leaves_no_partial_file(pipeline, tmp_path):
+    output = tmp_path / "account_features.parquet"
+
+    def broken_source():
+        yield from make_records(10)
+        raise RuntimeError("upstream read failed")
+
+    with pytest.raises(RuntimeError):
+        pipeline.write_parquet(broken_source(), output, chunk_size=4)
+
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_validate_batch_clean_features(pipeline):
+    df = pipeline.transform_batch(make_records(100))
+
+    report = pipeline.validate_batch(df)
+
+    assert report['valid']
+    assert report['rows_checked'] == 100
+    assert report['invalid_rows'] == []
+
+
+def test_validate_batch_reports_violations(pipeline):
+    df = pipeline.transform_batch(make_records(10))
+    df.loc[2, 'payment_history_score'] = 1.5
+    df.loc[4, 'outstanding_balance'] = -10.0
+    df.loc[5, 'outstanding_balance'] = np.nan
+    df['contact_attempts'] = df['contact_attempts'].astype(object)
+    df.loc[7, 'contact_attempts'] = 'three'
+    df = df.drop(columns=['account_age_months']).assign(legacy_score=0.0)
+
+    report = pipeline.validate_batch(df)
+
+    assert not report['valid']
+    assert report['invalid_rows'] == [2, 4, 5, 7]
+    assert report['columns']['payment_history_score']['range_errors'] == 1
+    assert report['columns']['outstanding_balance'] == {
+        'dtype': 'float64', 'nulls': 1, 'type_errors': 0, 'range_errors': 1,
+    }
+    assert report['columns']['contact_attempts']['type_errors'] == 1
+    assert report['missing_columns'] == ['account_age_months']
+    assert report['unexpected_columns'] == ['legacy_score']
+
+
+def test_validate_batch_agrees_with_per_row(pipeline):
+    df = pipeline.transform_batch(make_records(200, seed=13))
+    df.loc[::17, 'payment_history_score'] = -0.2
+    df.loc[::23, 'outstanding_balance'] = -1.0
+
+    report = pipeline.validate_batch(df, max_rows=10_000)
+    per_row = [
+        i for i, row in zip(df.index, df.to_dict('records'))
+        if pipeline.validate_features(row)
+    ]
+
+    assert report['invalid_rows'] == per_row
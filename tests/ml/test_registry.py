@@ -0,0 +1,66 @@
+import json
+
+import pytest
+
+from ml.models.baseline.registry import LocalModelRegistry, open_registry
+
+
+def make_artifacts(path, version):
+    path.mkdir(parents=True)
+    (path / 'model.json').write_text('{}')
+    (path / 'metadata.json').write_text(json.dumps({'version': version}))
+    return path
+
+
+@pytest.fixture
+def registry(tmp_path):
+    return LocalModelRegistry(tmp_path / 'registry')
+
+
+def test_register_promote_and_rollback(tmp_path, registry):
+    for i in range(3):
+        assert registry.register_model(str(make_artifacts(tmp_path / f'v{i}', f'1.{i}.0')), 'm') == str(i + 1)
+
+    registry.promote_model('m', '1', 'Production')
+    registry.promote_model('m', '2', 'Staging')
+    registry.promote_model('m', '2', 'Production')
+
+    stages = {v['version']: v['stage'] for v in registry.list_versions('m')}
+    assert stages == {'1': 'Archived', '2': 'Production', '3': 'None'}
+    assert registry.get_model_version('m', 'Staging') is None
+    assert registry.get_model_uri('m') == 'models:/m/Production'
+
+    assert registry.rollback_model('m') == '1'
+    assert registry.get_model_version('m', 'Production') == '1'
+    assert json.loads((registry.get_model_path('m') / 'metadata.json').read_text())['version'] == '1.0.0'
+
+    with pytest.raises(ValueError):
+        registry.promote_model('m', '3', 'Live')
+    with pytest.raises(KeyError):
+        registry.promote_model('m', '9', 'Staging')
+
+
+def test_rollback_without_history(tmp_path, registry):
+    registry.register_model(str(make_artifacts(tmp_path / 'v0', '1.0.0')), 'm')
+    registry.promote_model('m', '1', 'Production')
+
+    assert registry.rollback_model('m') is None
+
+
+def test_index_is_cached_and_shared_between_instances(tmp_path, registry):
+    registry.register_model(str(make_artifacts(tmp_path / 'v0', '1.0.0')), 'm')
+    reader = LocalModelRegistry(registry.root)
+
+    assert reader.get_model_version('m', 'Production') is None
+    cached = reader._index
+    assert reader.get_model_version('m', 'Production') is None
+    assert reader._index is cached
+
+    registry.promote_model('m', '1', 'Production')
+
+    assert reader.get_model_version('m', 'Production') == '1'
+
+
+def test_open_registry_selects_local_backend(tmp_path):
+    assert isinstance(open_registry(f'local:{tmp_path}'), LocalModelRegistry)
+    assert isinstance(open_registry(str(tmp_path)), LocalModelRegistry)
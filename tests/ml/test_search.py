@@ -0,0 +1,65 @@
+import json
+
+import xgboost as xgb
+
+from ml.models.baseline.search import MedianPruning, run_search, sample_trials
+from ml.models.baseline.train import load_config
+
+SPACE = {
+    'max_depth': {'choices': [3, 4, 6]},
+    'learning_rate': {'low': 0.02, 'high': 0.3, 'log': True},
+    'subsample': {'low': 0.6, 'high': 1.0},
+}
+
+
+def test_sample_trials_is_seeded_and_in_bounds():
+    trials = sample_trials(SPACE, 50, seed=3)
+
+    assert trials == sample_trials(SPACE, 50, seed=3)
+    assert trials != sample_trials(SPACE, 50, seed=4)
+    assert {t['max_depth'] for t in trials} == {3, 4, 6}
+    assert all(0.02 <= t['learning_rate'] <= 0.3 and 0.6 <= t['subsample'] <= 1.0 for t in trials)
+
+
+def test_median_pruning_stops_trials_behind_the_median():
+    references = [[1.0 - 0.01 * i for i in range(30)] for _ in range(3)]
+    pruner = MedianPruning(references, 'mlogloss', warmup_rounds=10, check_every=5, min_trials=3)
+
+    behind = [pruner.after_iteration(None, epoch, {'valid': {'mlogloss': [2.0]}}) for epoch in range(20)]
+    ahead = MedianPruning(references, 'mlogloss', warmup_rounds=10).after_iteration(
+        None, 10, {'valid': {'mlogloss': [0.1]}}
+    )
+    too_few = MedianPruning(references[:2], 'mlogloss', warmup_rounds=10).after_iteration(
+        None, 10, {'valid': {'mlogloss': [2.0]}}
+    )
+
+    assert [epoch for epoch, stop in enumerate(behind) if stop] == [10, 15]
+    assert pruner.pruned_at == 15
+    assert not ahead
+    assert not too_few
+
+
+def test_search_runs_offline_and_saves_best_trial(tmp_path):
+    config = load_config()
+    config['data'] = {'source': 'synthetic', 'n_samples': 1000, 'cache_dir': str(tmp_path / 'cache')}
+    config['search'].update(max_rounds=30, space=SPACE, pruning={'warmup_rounds': 5, 'check_every': 5, 'min_trials': 1})
+
+    summary = run_search(
+        config, n_trials=4, parallelism=2, output_dir=tmp_path / 'search',
+        register=True, tracking_uri='http://127.0.0.1:9'
+    )
+    trials = [json.loads(line) for line in (tmp_path / 'search' / 'trials.jsonl').read_text().splitlines()]
+
+    assert len(trials) == 4
+    assert sum(summary['status_counts'].values()) == 4
+    assert all(t['dataset_builds'] == 1 for t in trials)
+    assert len({t['worker_pid'] for t in trials}) <= 2
+    assert summary['registered_version'] is None
+
+    best = summary['best']
+    completed = [t for t in trials if t['status'] == 'complete']
+    assert best['best_score'] == min(t['best_score'] for t in completed)
+    model = xgb.Booster(model_file=str(tmp_path / 'search' / 'best' / 'model.json'))
+    assert model.num_boosted_rounds() == best['best_iteration'] + 1
+    metadata = json.loads((tmp_path / 'search' / 'best' / 'metadata.json').read_text())
+    assert metadata['hyperparameters']['max_depth'] == best['params']['max_depth']
@@ -0,0 +1,99 @@
+import numpy as np
+import pytest
+
+from ml.explainability import shap_summary
+from ml.explainability.shap_summary import (
+    compute_shap_values,
+    explain_batch,
+    explain_single,
+    generate_feature_importance,
+    generate_sample_data,
+    get_explainer,
+    iter_feature_importance,
+    native_contributions,
+)
+from ml.models.baseline.train import load_config, train_model
+
+
+@pytest.fixture(scope="module")
+def trained(tmp_path_factory):
+    config = load_config()
+    config['data'] = {
+        'source': 'synthetic',
+        'n_samples': 1000,
+        'cache_dir': str(tmp_path_factory.mktemp('cache')),
+    }
+    model, le, metrics, feature_names, X_train = train_model(config)
+    return model, feature_names, list(le.classes_)
+
+
+def test_explainer_built_once_per_version(trained):
+    model, _, _ = trained
+
+    assert get_explainer(model, 'v1') is get_explainer(model, 'v1')
+    assert get_explainer(model, 'v2') is not get_explainer(model, 'v1')
+
+
+def test_explainer_cache_is_bounded_and_model_specific(trained):
+    model, _, _ = trained
+    other = model.copy()
+
+    for i in range(shap_summary.MAX_CACHED_EXPLAINERS + 3):
+        get_explainer(model, f'version-{i}')
+    first = get_explainer(model)
+
+    assert len(shap_summary._explainers) == shap_summary.MAX_CACHED_EXPLAINERS
+    assert 'version-0' not in shap_summary._explainers
+    assert get_explainer(model) is first
+    assert get_explainer(other, 'version-10') is not get_explainer(model, 'version-10')
+
+
+def test_native_matches_tree_explainer(trained):
+    model, feature_names, label_classes = trained
+    X = generate_sample_data(n_samples=20, seed=3)[feature_names]
+
+    for features in X.to_dict('records'):
+        native = explain_single(model, features, feature_names, label_classes)
+        reference = explain_single(model, features, feature_names, label_classes, native=False)
+
+        assert native['prediction'] == reference['prediction']
+        assert native['confidence'] == pytest.approx(reference['confidence'], rel=1e-5)
+        assert [c['feature'] for c in native['feature_contributions']] == \
+            [c['feature'] for c in reference['feature_contributions']]
+        assert [c['shap_value'] for c in native['feature_contributions']] == \
+            pytest.approx([c['shap_value'] for c in reference['feature_contributions']], abs=1e-5)
+
+
+def test_batch_matches_single(trained):
+    model, feature_names, label_classes = trained
+    X = generate_sample_data(n_samples=25, seed=4)[feature_names]
+
+    batch = explain_batch(model, X, feature_names, label_classes)
+
+    assert len(batch) == 25
+    assert batch[7] == explain_single(model, X.iloc[7].to_dict(), feature_names, label_classes)
+
+
+def test_feature_importance_from_tree_explainer(trained):
+    model, feature_names, _ = trained
+    X = generate_sample_data(n_samples=50)[feature_names]
+
+    _, shap_values = compute_shap_values(model, X, feature_names)
+    importance = generate_feature_importance(shap_values, feature_names)
+
+    assert set(importance) == set(feature_names)
+    assert sum(importance.values()) == pytest.approx(1.0)
+    assert list(importance.values()) == sorted(importance.values(), reverse=True)
+    assert np.isfinite(list(importance.values())).all()
+
+
+def test_chunked_importance_matches_full_sample(trained):
+    model, feature_names, _ = trained
+    X = generate_sample_data(n_samples=230, seed=5)[feature_names]
+
+    partials = list(iter_feature_importance(model, X, feature_names, chunk_size=100))
+    _, shap_values = native_contributions(model, X, feature_names)
+    expected = generate_feature_importance(list(shap_values.transpose(1, 0, 2)), feature_names)
+
+    assert [rows for rows, _ in partials] == [100, 200, 230]
+    assert partials[-1][1] == pytest.approx(expected)
@@ -0,0 +1,114 @@
+from datetime import datetime, timedelta
+
+import pandas as pd
+import pytest
+
+from ml.models.baseline.train import (
+    build_training_dataset,
+    dataset_cache_key,
+    generate_synthetic_data,
+    label_outcomes,
+    load_config,
+)
+
+
+def reference_labels(df):
+    labels = []
+    for _, row in df.iterrows():
+        if row['days_past_due'] > 90 and row['payment_history_score'] < 0.3:
+            labels.append('write_off')
+        elif row['days_past_due'] > 60 or row['outstanding_balance'] > 5000:
+            labels.append('escalate')
+        elif row['days_past_due'] < 30 and row['payment_history_score'] > 0.7:
+            labels.append('recover')
+        else:
+            labels.append('monitor')
+    return labels
+
+
+@pytest.fixture
+def config(tmp_path):
+    config = load_config()
+    config['data'] = {'source': 'synthetic', 'n_samples': 2000, 'cache_dir': str(tmp_path / 'cache')}
+    return config
+
+
+def test_vectorized_labels_match_rules():
+    df = generate_synthetic_data(n_samples=3000, seed=7)
+
+    assert label_outcomes(df).tolist() == reference_labels(df)
+
+    edge_cases = pd.DataFrame({
+        'days_past_due': [91, 91, 61, 10, 10, 30, 90],
+        'payment_history_score': [0.2, 0.5, 0.9, 0.9, 0.5, 0.9, 0.2],
+        'outstanding_balance': [100.0, 100.0, 100.0, 100.0, 6000.0, 100.0, 100.0],
+    })
+    assert label_outcomes(edge_cases).tolist() == reference_labels(edge_cases) == [
+        'write_off', 'escalate', 'escalate', 'recover', 'escalate', 'monitor', 'escalate'
+    ]
+
+
+def test_dataset_is_cached(config, tmp_path):
+    first = build_training_dataset(config)
+    cached = list((tmp_path / 'cache').glob('*.parquet'))
+
+    second = build_training_dataset(config)
+
+    assert len(cached) == 1
+    assert cached[0].stem == dataset_cache_key(config)
+    pd.testing.assert_frame_equal(first, second)
+
+
+def test_cache_key_tracks_config(config):
+    key = dataset_cache_key(config)
+    config['data']['n_samples'] = 3000
+    assert dataset_cache_key(config) != key
+    config['data']['n_samples'] = 2000
+    config['data']['cache_dir'] = '/elsewhere'
+    assert dataset_cache_key(config) == key
+
+
+def test_feature_source_dataset(config, tmp_path):
+    t0 = datetime(2024, 3, 1)
+    (tmp_path / 'data').mkdir()
+    pd.DataFrame({
+        'account_id': ['A', 'B'],
+        'event_timestamp': [t0, t0],
+        'created_at': [t0, t0],
+        'days_past_due': [95, 10],
+        'outstanding_balance': [800.0, 100.0],
+        'contact_attempts': [4, 1],
+        'last_payment_days_ago': [120, 5],
+        'account_age_months': [30, 6],
+    }).to_parquet(tmp_path / 'data' / 'account_features.parquet')
+    payments = tmp_path / 'data' / 'payment_history.parquet'
+    pd.DataFrame({
+        'account_id': ['A', 'B'],
+        'event_timestamp': [t0, t0],
+        'payment_history_score': [0.2, 0.9],
+    }).to_parquet(payments)
+    labels_path = tmp_path / 'labels.parquet'
+    pd.DataFrame({
+        'account_id': ['A', 'B'],
+        'event_timestamp': [t0 + timedelta(hours=1)] * 2,
+        'label': ['write_off', 'recover'],
+    }).to_parquet(labels_path)
+
+    config['data'].update({
+        'source': 'features',
+        'labels_path': str(labels_path),
+        'feature_repo_path': str(tmp_path),
+    })
+
+    df = build_training_dataset(config)
+    key = dataset_cache_key(config)
+
+    assert df['label'].tolist() == ['write_off', 'recover']
+    assert df['days_past_due'].tolist() == [95, 10]
+    assert df['payment_history_score'].tolist() == [0.2, 0.9]
+
+    # Changing a source file changes the cache key
+    pd.DataFrame({
+        'account_id': ['A'], 'event_timestamp': [t0], 'payment_history_score': [0.5]
+    }).to_parquet(payments)
+    assert dataset_cache_key(config) != key
@@ -0,0 +1,43 @@
+import importlib.util
+from pathlib import Path
+from unittest import mock
+
+import pytest
+
+from ml.models.baseline import train
+
+SERVICES_DIR = Path(__file__).parents[2] / "services"
+
+
+@pytest.fixture
+def load_service(monkeypatch):
+    """
+    Import a service's main.py under a unique module name.
+
+    Services are standalone directories (with hyphens in their names), so
+    their directory is put on sys.path for sibling imports.
+    """
+    def _load(service: str, **env):
+        for key, value in env.items():
+            monkeypatch.setenv(key, value)
+        service_dir = SERVICES_DIR / service
+        monkeypatch.syspath_prepend(str(service_dir))
+        name = service.replace("-", "_") + "_main"
+        spec = importlib.util.spec_from_file_location(name, service_dir / "main.py")
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        return module
+
+    return _load
+
+
+@pytest.fixture(scope="session")
+def baseline_model_dir(tmp_path_factory):
+    """Artifacts directory of a small baseline model trained once per session."""
+    work_dir = tmp_path_factory.mktemp("baseline")
+    config = train.load_config()
+    config["data"] = {"source": "synthetic", "n_samples": 2000, "cache_dir": str(work_dir / "cache")}
+    model, le, metrics, feature_names, X_train = train.train_model(config)
+    with mock.patch.object(train, "OUTPUT_DIR", work_dir / "artifacts"):
+        train.save_artifacts(model, le, metrics, feature_names, config, reference_data=X_train)
+    return work_dir / "artifacts"
@@ -0,0 +1,119 @@
+import asyncio
+import importlib.util
+import json
+from pathlib import Path
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from ml.monitoring.drift_monitor import DataDriftMonitor, FeatureSketch, merge_sketch_files
+
+SERVICE_SKETCH = Path(__file__).parents[2] / "services" / "inference-service" / "drift_sketch.py"
+
+
+def load_sketch_module():
+    spec = importlib.util.spec_from_file_location("inference_service_drift_sketch", SERVICE_SKETCH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+drift_sketch = load_sketch_module()
+
+NAMES = ["days_past_due", "outstanding_balance"]
+
+
+def reference_monitor(seed=0):
+    rng = np.random.default_rng(seed)
+    monitor = DataDriftMonitor()
+    monitor.set_reference_matrix(
+        np.column_stack([rng.integers(0, 180, 20_000), rng.exponential(1500, 20_000)]), NAMES
+    )
+    return monitor
+
+
+def traffic(n, seed=1, shift=0.0):
+    rng = np.random.default_rng(seed)
+    X = np.column_stack([rng.integers(0, 180, n) + shift, rng.exponential(1500, n)])
+    X[::9, 1] = np.nan
+    return X
+
+
+def test_serving_sketch_matches_ml_sketch():
+    monitor = reference_monitor()
+    X = traffic(2_000)
+    cuts = [monitor.reference_stats[name]["histogram"]["cuts"] for name in NAMES]
+    serving = drift_sketch.FeatureSketch(NAMES, cuts, "1.0.0", "replica-a")
+    for row in X[:500].tolist():
+        serving.update(row)
+    serving.update_matrix(X[500:])
+    expected = monitor.sketch(NAMES)
+    expected.update_matrix(X)
+
+    restored = FeatureSketch.from_dict(json.loads(json.dumps(serving.to_dict())))
+
+    assert restored.counts.tolist() == expected.counts.tolist()
+    assert np.allclose(restored.mean, expected.mean)
+    assert np.allclose(restored.m2, expected.m2)
+    assert restored.min.tolist() == expected.min.tolist()
+    assert restored.replicas == ["replica-a"]
+
+
+def test_replica_windows_merge_into_one_report(tmp_path):
+    monitor = reference_monitor()
+    model = SimpleNamespace(version="1.0.0", feature_names=NAMES, drift_reference=monitor.reference_stats)
+    stub = SimpleNamespace(version="stub", feature_names=NAMES)
+    X = traffic(4_000, shift=40)
+
+    async def replica(name, rows):
+        log = drift_sketch.DriftSketchLog(tmp_path, replica=name, window_seconds=3600)
+        for row in rows[:100]:
+            log.observe(model, SimpleNamespace(**dict(zip(NAMES, row))))
+            log.observe(stub, SimpleNamespace(**dict(zip(NAMES, row))))
+        log.observe_matrix(model, rows[100:])
+        stats = log.stats()
+        await log.close()
+        return stats
+
+    stats = [asyncio.run(replica("a", X[:2_000])), asyncio.run(replica("b", X[2_000:]))]
+    files = sorted(tmp_path.glob(f"sketch-1.0.0-{int(stats[0]['window_start'])}-*.json"))
+    merged = merge_sketch_files(files)
+    reports = monitor.check_drift_sketch(merged)
+
+    assert stats[0]["models"] == ["1.0.0"] and stats[0]["rows_sketched"] == 2_000
+    assert len(files) == 2 and merged.replicas == ["a", "b"]
+    assert merged.counts.sum() == 2 * len(X)
+    expected = reference_monitor().check_drift_matrix(X, NAMES)
+    for name in NAMES:
+        assert np.isclose(reports[name]["psi"], expected[name]["psi"])
+        assert np.isclose(reports[name]["current"]["std"], expected[name]["current"]["std"])
+    assert reports["days_past_due"]["drift_detected"]
+
+
+def test_models_sharing_a_version_are_sketched_apart(tmp_path):
+    monitor = reference_monitor()
+    models = [
+        SimpleNamespace(
+            version="1.0.0", model_id=model_id, feature_names=NAMES, drift_reference=monitor.reference_stats
+        )
+        for model_id in ("a" * 64, "b" * 64)
+    ]
+    X = traffic(300)
+
+    async def serve():
+        log = drift_sketch.DriftSketchLog(tmp_path, replica="a", window_seconds=3600)
+        log.observe_matrix(models[0], X[:100])
+        log.observe_matrix(models[1], X[100:])
+        sketches = log.sketches()
+        await log.close()
+        return sketches
+
+    sketches = asyncio.run(serve())
+    files = sorted(tmp_path.glob("sketch-*.json"))
+
+    assert [sum(s["counts"]) for s in sketches] == [100 * len(NAMES), 200 * len(NAMES)]
+    assert [f.name.split("-")[1] for f in files] == ["a" * 12, "b" * 12]
+    assert [FeatureSketch.from_dict(json.loads(f.read_text())).model_id for f in files] == ["a" * 64, "b" * 64]
+    with pytest.raises(ValueError):
+        merge_sketch_files(files)
@@ -0,0 +1,90 @@
+import asyncio
+import importlib.util
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+
+SERVICE_EXECUTORS = Path(__file__).parents[2] / "services" / "inference-service" / "executors.py"
+
+
+def load_executors_module():
+    spec = importlib.util.spec_from_file_location("inference_service_executors", SERVICE_EXECUTORS)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+executors = load_executors_module()
+
+
+def test_rejects_calls_beyond_max_pending():
+    pool = executors.BoundedExecutor("test", ThreadPoolExecutor(2), max_pending=2)
+
+    async def burst():
+        return await asyncio.gather(*[pool.run(time.sleep, 0.05) for _ in range(5)], return_exceptions=True)
+
+    results = asyncio.run(burst())
+
+    rejected = [r for r in results if isinstance(r, executors.ExecutorSaturated)]
+    assert len(rejected) == 3
+    assert pool.stats() == {"pending": 0, "max_pending": 2, "completed": 2, "rejected": 3}
+    pool.shutdown()
+
+
+def test_event_loop_stays_responsive():
+    pool = executors.BoundedExecutor("test", ThreadPoolExecutor(1), max_pending=4)
+
+    async def scenario():
+        slow = asyncio.ensure_future(pool.run(time.sleep, 0.2))
+        start = time.perf_counter()
+        await asyncio.sleep(0.01)
+        ticked = time.perf_counter() - start
+        await slow
+        return ticked
+
+    assert asyncio.run(scenario()) < 0.1
+    pool.shutdown()
+
+
+@pytest.mark.parametrize("path", ["/v1/predict", "/v1/explain"])
+def test_saturated_service_returns_503(load_service, baseline_model_dir, path):
+    service = load_service(
+        "inference-service",
+        MODEL_PATH=str(baseline_model_dir),
+        INFERENCE_MAX_PENDING="0",
+        PREDICT_MAX_BATCH_SIZE="1",
+    )
+    features = {"account_id": "ACC001", "days_past_due": 10}
+
+    with TestClient(service.app) as client:
+        response = client.post(path, json={"request_id": "r1", "features": features})
+        health = client.get("/health").json()
+
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "1"
+    assert health["executors"]["inference"]["rejected"] == 1
+
+
+def test_cancelled_callers_hold_capacity_until_the_call_finishes():
+    pool = executors.BoundedExecutor("test", ThreadPoolExecutor(1), max_pending=2)
+
+    async def scenario():
+        running = asyncio.ensure_future(pool.run(time.sleep, 0.1))
+        queued = asyncio.ensure_future(pool.run(time.sleep, 0.1))
+        await asyncio.sleep(0.02)
+        running.cancel()
+        queued.cancel()
+        await asyncio.sleep(0)
+        during = pool.pending
+        await asyncio.sleep(0.2)
+        return during
+
+    during = asyncio.run(scenario())
+
+    # The running call keeps its worker until it returns; the queued one is dropped
+    assert during == 1
+    assert pool.stats() == {"pending": 0, "max_pending": 2, "completed": 1, "rejected": 0}
+    pool.shutdown()
@@ -0,0 +1,89 @@
+import asyncio
+import importlib.util
+import json
+from pathlib import Path
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+SERVICE_JOBS = Path(__file__).parents[2] / "services" / "inference-service" / "explain_jobs.py"
+
+
+def load_jobs_module():
+    spec = importlib.util.spec_from_file_location("inference_service_explain_jobs", SERVICE_JOBS)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+explain_jobs = load_jobs_module()
+FEATURES = ["a", "b", "c"]
+CLASSES = ["x", "y"]
+MODEL = SimpleNamespace(version="v1", model_dir="/models/v1", feature_names=FEATURES, label_classes=CLASSES)
+
+
+async def fake_chunk(model_dir, X):
+    # |SHAP| of feature j equals column j, identical for both classes
+    await asyncio.sleep(0)
+    return np.repeat(np.abs(X).sum(axis=0)[:, None], len(CLASSES), axis=1)
+
+
+def make_manager(tmp_path, **kwargs):
+    async def write(*args):
+        return explain_jobs.write_summary_artifacts(*args)
+
+    return explain_jobs.SummaryJobManager(fake_chunk, write, str(tmp_path), **kwargs)
+
+
+def test_job_streams_partials_and_persists(tmp_path):
+    X = np.tile([1.0, 3.0, 0.0], (250, 1))
+
+    async def scenario():
+        manager = make_manager(tmp_path, chunk_size=100, parallelism=2)
+        job = manager.submit(X, MODEL)
+        seen = []
+        while not job.done:
+            updated = job.updated
+            await updated.wait()
+            seen.append(job.rows_done)
+        await manager.close()
+        return job, seen
+
+    job, seen = asyncio.run(scenario())
+
+    assert job.status == "completed"
+    assert job.rows_done == 250
+    assert seen == sorted(seen) and seen[-1] == 250
+    assert job.feature_importance == {"b": 0.75, "a": 0.25, "c": 0.0}
+    assert json.loads(Path(job.artifacts["importance"]).read_text()) == job.feature_importance
+    assert Path(job.artifacts["importance"]).parent.name == job.job_id
+
+
+def test_failed_chunk_fails_job(tmp_path):
+    async def failing(model_dir, X):
+        raise RuntimeError("worker died")
+
+    async def scenario():
+        manager = explain_jobs.SummaryJobManager(failing, None, str(tmp_path), chunk_size=10)
+        job = manager.submit(np.ones((30, 3)), MODEL)
+        while not job.done:
+            await job.updated.wait()
+        await manager.close()
+        return job
+
+    job = asyncio.run(scenario())
+
+    assert job.status == "failed"
+    assert "worker died" in job.error
+
+
+def test_queue_limit(tmp_path):
+    async def scenario():
+        manager = make_manager(tmp_path, max_queued=1)
+        manager.submit(np.ones((5, 3)), MODEL)
+        with pytest.raises(explain_jobs.JobQueueFull):
+            manager.submit(np.ones((5, 3)), MODEL)
+        await manager.close()
+
+    asyncio.run(scenario())
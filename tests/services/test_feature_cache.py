@@ -0,0 +1,210 @@
+import asyncio
+import importlib.util
+from datetime import timedelta
+from pathlib import Path
+
+import pytest
+
+from ml.features.contracts.account_features import account_features, payment_history_features
+from ml.features.contracts.creator_features import creator_identity_v1, creator_preferences_v1
+
+SERVICE_CACHE = Path(__file__).parents[2] / "services" / "feature-service" / "feature_cache.py"
+
+
+def load_cache_module():
+    spec = importlib.util.spec_from_file_location("feature_service_feature_cache", SERVICE_CACHE)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+feature_cache = load_cache_module()
+
+ROWS = {
+    "ACC1": {"days_past_due": 10, "outstanding_balance": 100.0, "payment_history_score": 0.9},
+    "ACC2": {"days_past_due": 20, "outstanding_balance": 200.0, "payment_history_score": 0.4},
+}
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class SlowBackend(feature_cache.StaticBackend):
+    """Counts fetches and yields to the event loop so requests overlap."""
+
+    def __init__(self, rows):
+        super().__init__(rows)
+        self.fetched = []
+
+    async def fetch(self, account_ids, features):
+        self.fetched.append(list(account_ids))
+        await asyncio.sleep(0.01)
+        return await super().fetch(account_ids, features)
+
+
+def make_cache(backend=None, **kwargs):
+    clock = FakeClock()
+    cache = feature_cache.ReadThroughFeatureCache(backend or SlowBackend(ROWS), clock=clock, **kwargs)
+    return cache, clock
+
+
+def test_ttls_match_feature_contracts():
+    for view in [account_features, payment_history_features, creator_identity_v1, creator_preferences_v1]:
+        assert timedelta(seconds=feature_cache.FEATURE_VIEW_TTLS[view.name]) == view.ttl
+
+
+def test_read_through_and_hit():
+    cache, _ = make_cache()
+
+    row, hit = asyncio.run(cache.get("ACC1"))
+    assert row["days_past_due"] == 10 and row["payment_history_score"] == 0.9
+    assert not hit
+
+    row, hit = asyncio.run(cache.get("ACC1"))
+    assert hit
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+
+
+def test_per_view_ttl_expiry():
+    cache, clock = make_cache()
+    asyncio.run(cache.get("ACC1"))
+    fetches = cache.backend_fetches
+
+    # account_features (1 day) expires, payment_history (7 days) does not
+    clock.now = 2 * 24 * 3600
+    row, hit = asyncio.run(cache.get("ACC1"))
+
+    assert not hit
+    assert cache.backend_fetches == fetches + 1
+    assert cache.stats()["expirations"] == 1
+    assert row["payment_history_score"] == 0.9
+
+
+def test_unknown_accounts_use_negative_ttl():
+    cache, clock = make_cache(negative_ttl=60)
+
+    assert asyncio.run(cache.get("NOPE")) == (None, False)
+    assert asyncio.run(cache.get("NOPE")) == (None, True)
+    clock.now = 61
+    assert asyncio.run(cache.get("NOPE")) == (None, False)
+
+
+def test_lru_eviction():
+    cache, _ = make_cache(max_entries=2, views={"account_features": ["days_past_due"]})
+
+    asyncio.run(cache.get("ACC1"))
+    asyncio.run(cache.get("ACC2"))
+    asyncio.run(cache.get("ACC1"))  # ACC2 is now least recently used
+    asyncio.run(cache.get("ACC3"))
+
+    assert cache.stats()["evictions"] == 1
+    assert asyncio.run(cache.get("ACC1"))[1]
+    assert not asyncio.run(cache.get("ACC2"))[1]
+
+
+def test_concurrent_misses_are_coalesced():
+    backend = SlowBackend(ROWS)
+    cache, _ = make_cache(backend, views={"account_features": ["days_past_due"]})
+
+    async def burst():
+        return await asyncio.gather(*[cache.get("ACC1") for _ in range(10)])
+
+    results = asyncio.run(burst())
+
+    assert backend.fetched == [["ACC1"]]
+    assert cache.stats()["coalesced"] == 9
+    assert all(row == {"days_past_due": 10} for row, _ in results)
+
+
+def test_batch_fetches_only_misses():
+    backend = SlowBackend(ROWS)
+    cache, _ = make_cache(backend, views={"account_features": ["days_past_due"]})
+    asyncio.run(cache.get("ACC1"))
+
+    rows, hits = asyncio.run(cache.get_many(["ACC1", "ACC2", "ACC2", "NOPE"]))
+
+    assert backend.fetched[-1] == ["ACC2", "NOPE"]
+    assert hits.tolist() == [True, False, False, False]
+    assert rows[1] == rows[2] == {"days_past_due": 20}
+    assert rows[3] is None
+
+
+def test_backend_errors_propagate_to_waiters():
+    class FailingBackend:
+        async def fetch(self, account_ids, features):
+            await asyncio.sleep(0.01)
+            raise ConnectionError("store down")
+
+    cache, _ = make_cache(FailingBackend(), views={"account_features": ["days_past_due"]})
+
+    async def burst():
+        return await asyncio.gather(cache.get("ACC1"), cache.get("ACC1"), return_exceptions=True)
+
+    results = asyncio.run(burst())
+
+    assert all(isinstance(r, ConnectionError) for r in results)
+    assert not cache._inflight
+    with pytest.raises(ConnectionError):
+        asyncio.run(cache.get("ACC1"))
+
+
+def test_fetch_started_before_clear_is_not_cached():
+    backend = SlowBackend(ROWS)
+    cache, _ = make_cache(backend, views={"account_features": ["days_past_due"]})
+
+    async def clear_during_fetch():
+        lookup = asyncio.ensure_future(cache.get("ACC1"))
+        await asyncio.sleep(0)
+        cache.clear()
+        return await lookup
+
+    row, _ = asyncio.run(clear_during_fetch())
+    _, hit = asyncio.run(cache.get("ACC1"))
+
+    assert row == {"days_past_due": 10}
+    assert not hit and len(backend.fetched) == 2
+
+
+def test_cancelled_fetch_releases_waiters():
+    backend = SlowBackend(ROWS)
+    cache, _ = make_cache(backend, views={"account_features": ["days_past_due"]})
+
+    async def cancel_leader():
+        leader = asyncio.ensure_future(cache.get("ACC1"))
+        await asyncio.sleep(0)
+        follower = asyncio.ensure_future(cache.get("ACC1"))
+        await asyncio.sleep(0)
+        leader.cancel()
+        row, _ = await asyncio.wait_for(follower, timeout=1)
+        return leader, row
+
+    leader, row = asyncio.run(cancel_leader())
+
+    assert leader.cancelled()
+    assert row == {"days_past_due": 10}
+    assert len(backend.fetched) == 2
+    assert not cache._inflight
+
+
+def test_cancelled_waiter_does_not_cancel_shared_fetch():
+    backend = SlowBackend(ROWS)
+    cache, _ = make_cache(backend, views={"account_features": ["days_past_due"]})
+
+    async def cancel_follower():
+        leader = asyncio.ensure_future(cache.get("ACC1"))
+        await asyncio.sleep(0)
+        follower = asyncio.ensure_future(cache.get("ACC1"))
+        await asyncio.sleep(0)
+        follower.cancel()
+        return await leader
+
+    row, _ = asyncio.run(cancel_follower())
+
+    assert row == {"days_past_due": 10}
+    assert backend.fetched == [["ACC1"]]
+    assert not cache._inflight
@@ -0,0 +1,108 @@
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from ml.features.online_store import write_online_store
+from ml.features.pipeline import FeaturePipeline
+from tests.ml.test_pipeline import REFERENCE_DATE, make_records
+
+
+@pytest.fixture
+def features():
+    return FeaturePipeline(reference_date=REFERENCE_DATE).transform_batch(make_records(300))
+
+
+@pytest.fixture
+def client(load_service, features, tmp_path):
+    write_online_store(features, tmp_path / "store")
+    service = load_service("feature-service", ONLINE_STORE_PATH=str(tmp_path / "store"))
+    with TestClient(service.app) as client:
+        yield client
+
+
+@pytest.fixture
+def mock_client(load_service):
+    service = load_service("feature-service", ONLINE_STORE_PATH="")
+    with TestClient(service.app) as client:
+        yield client
+
+
+def test_single_lookup_from_store(client, features):
+    body = client.get("/v1/features/ACC00010").json()
+
+    expected = features.set_index("account_id").loc["ACC00010"]
+    assert not body["cache_hit"]
+    assert body["features"]["days_past_due"] == expected["days_past_due"]
+    assert client.get("/v1/features/ACC00010").json()["cache_hit"]
+
+    health = client.get("/health").json()
+    assert health["feature_store_connected"]
+    assert health["cache_hit_rate"] == 0.5
+
+
+def test_batch_records(client, features):
+    ids = ["ACC00001", "UNKNOWN", "ACC00002"]
+
+    body = client.post("/v1/features/batch", json=ids).json()
+
+    assert body["not_found"] == ["UNKNOWN"]
+    assert [r["account_id"] for r in body["results"]] == ids
+    assert len({r["computed_at"] for r in body["results"]}) == 1
+    assert body["results"][1]["features"]["payment_history_score"] == 0.5
+    expected = features.set_index("account_id").loc["ACC00002"]
+    assert body["results"][2]["features"]["outstanding_balance"] == expected["outstanding_balance"]
+
+
+def test_batch_columnar(client, features):
+    ids = features["account_id"].tolist()[:50] + ["UNKNOWN"]
+
+    body = client.post("/v1/features/batch?format=columnar", json=ids).json()
+
+    assert body["account_ids"] == ids
+    assert body["not_found"] == ["UNKNOWN"]
+    assert body["found"] == [True] * 50 + [False]
+    assert body["features"]["contact_attempts"][:50] == features["contact_attempts"][:50].tolist()
+    assert body["features"]["account_age_months"][-1] == 12
+
+
+def test_batch_mock_fallback(mock_client):
+    body = mock_client.post("/v1/features/batch?format=columnar", json=["ACC001", "ACC999"]).json()
+
+    assert body["not_found"] == ["ACC999"]
+    assert body["features"]["days_past_due"] == [45, 0]
+
+
+def test_metrics_endpoint(client):
+    client.post("/v1/features/batch", json=["ACC00001", "ACC00002"])
+    client.post("/v1/features/batch", json=["ACC00001", "UNKNOWN"])
+
+    lines = dict(
+        line.split(" ") for line in client.get("/metrics").text.splitlines() if not line.startswith("#")
+    )
+
+    assert lines["feature_cache_hits_total"] == "1"
+    assert lines["feature_cache_misses_total"] == "3"
+    assert lines["feature_cache_entries"] == "6"
+
+
+def test_new_materialization_is_served_without_restart(load_service, features, tmp_path):
+    write_online_store(features, tmp_path / "store")
+    service = load_service(
+        "feature-service", ONLINE_STORE_PATH=str(tmp_path / "store"), ONLINE_STORE_REFRESH_SECONDS="0.05"
+    )
+    updated = features.assign(days_past_due=features["days_past_due"] + 1000)
+
+    with TestClient(service.app) as client:
+        before = client.get("/v1/features/ACC00010").json()["features"]["days_past_due"]
+        write_online_store(updated, tmp_path / "store")
+        deadline = time.time() + 5
+        after = before
+        while after == before and time.time() < deadline:
+            time.sleep(0.05)
+            after = client.get("/v1/features/ACC00010").json()["features"]["days_past_due"]
+        refreshed = service.refresh_online_store()
+
+    assert after == before + 1000
+    assert not refreshed
+    assert service.online_store.generation == (tmp_path / "store" / "CURRENT").read_text().strip()
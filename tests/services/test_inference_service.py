@@ -0,0 +1,407 @@
+import json
+import shutil
+import time
+from types import SimpleNamespace
+
+import numpy as np
+import pyarrow as pa
+import pytest
+import xgboost as xgb
+from fastapi.testclient import TestClient
+
+from ml.models.baseline.packing import write_packed_artifact
+
+FEATURES = {
+    "account_id": "ACC001",
+    "days_past_due": 95,
+    "outstanding_balance": 1200.0,
+    "payment_history_score": 0.2,
+    "contact_attempts": 4,
+    "last_payment_days_ago": 120,
+    "account_age_months": 30,
+}
+
+
+@pytest.fixture
+def service(load_service, baseline_model_dir):
+    return load_service("inference-service", MODEL_PATH=str(baseline_model_dir))
+
+
+@pytest.fixture
+def client(service):
+    with TestClient(service.app) as client:
+        yield client
+
+
+def test_serves_trained_booster(client, baseline_model_dir):
+    metadata = json.loads((baseline_model_dir / "metadata.json").read_text())
+
+    health = client.get("/health").json()
+    body = client.post("/v1/predict", json={"request_id": "r1", "features": FEATURES}).json()
+
+    assert health["model_loaded"]
+    assert health["model_version"] == metadata["version"]
+    assert body["model_version"] == metadata["version"]
+
+    booster = xgb.Booster(model_file=str(baseline_model_dir / "model.json"))
+    row = [[FEATURES[name] for name in metadata["feature_names"]]]
+    probs = booster.predict(xgb.DMatrix(np.array(row), feature_names=metadata["feature_names"]))[0]
+    assert body["prediction"] == metadata["label_classes"][int(probs.argmax())]
+    assert body["confidence"] == pytest.approx(float(probs.max()), rel=1e-5)
+
+
+def test_explain_uses_booster_contributions(client):
+    body = client.post("/v1/explain", json={"request_id": "r1", "features": FEATURES}).json()
+
+    names = [item["feature"] for item in body["feature_importance"]]
+    shap_values = [abs(item["shap_value"]) for item in body["feature_importance"]]
+    assert sorted(names) == sorted(name for name in FEATURES if name != "account_id")
+    assert shap_values == sorted(shap_values, reverse=True)
+
+
+def test_falls_back_to_stub_without_artifacts(load_service, tmp_path):
+    service = load_service("inference-service", MODEL_PATH=str(tmp_path))
+
+    with TestClient(service.app) as client:
+        body = client.post("/v1/predict", json={"request_id": "r1", "features": FEATURES}).json()
+        columnar = client.post("/v1/predict/batch/columnar", json={
+            "features": {name: [FEATURES[name]] for name in FEATURES if name != "account_id"}
+        }).json()
+
+    assert body["model_version"] == service.Config.MODEL_VERSION
+    assert columnar["predictions"] == [body["prediction"]]
+
+
+def test_micro_batched_predictions_match_unbatched(load_service, baseline_model_dir):
+    rows = [dict(FEATURES, days_past_due=d, payment_history_score=s) for d in (5, 45, 95) for s in (0.1, 0.9)]
+
+    predictions = {}
+    for batch_size in ("1", "32"):
+        service = load_service(
+            "inference-service", MODEL_PATH=str(baseline_model_dir), PREDICT_MAX_BATCH_SIZE=batch_size
+        )
+        with TestClient(service.app) as client:
+            predictions[batch_size] = [
+                client.post("/v1/predict", json={"request_id": str(i), "features": row}).json()["prediction"]
+                for i, row in enumerate(rows)
+            ]
+        assert (service.predict_batcher is None) == (batch_size == "1")
+
+    assert predictions["1"] == predictions["32"]
+
+
+def make_rows(n, seed=0):
+    rng = np.random.default_rng(seed)
+    return [
+        dict(
+            FEATURES,
+            account_id=f"ACC{i:05d}",
+            days_past_due=int(rng.integers(0, 150)),
+            outstanding_balance=float(rng.exponential(2000)),
+            payment_history_score=float(rng.random()),
+        )
+        for i in range(n)
+    ]
+
+
+def test_batch_single_model_call(client, service):
+    rows = make_rows(50)
+    expected = [service.models.default.predict(service.FeatureVector(**row)) for row in rows]
+
+    body = client.post(
+        "/v1/predict/batch",
+        json=[{"request_id": f"r{i}", "features": row} for i, row in enumerate(rows)],
+    ).json()
+
+    assert [r["request_id"] for r in body["results"]] == [f"r{i}" for i in range(50)]
+    assert [r["prediction"] for r in body["results"]] == [p for p, _ in expected]
+    assert [r["confidence"] for r in body["results"]] == pytest.approx([c for _, c in expected], rel=1e-5)
+    assert all(r["inference_time_ms"] > 0 for r in body["results"])
+    assert body["total_time_ms"] >= body["results"][0]["inference_time_ms"]
+
+
+def test_columnar_json_and_arrow(client, service):
+    rows = make_rows(200, seed=1)
+    names = service.models.default.feature_names
+    columns = {name: [row[name] for row in rows] for name in names}
+    expected = client.post(
+        "/v1/predict/batch",
+        json=[{"request_id": str(i), "features": row} for i, row in enumerate(rows)],
+    ).json()["results"]
+
+    body = client.post(
+        "/v1/predict/batch/columnar",
+        json={"request_ids": [str(i) for i in range(200)], "features": columns},
+    ).json()
+    assert body["predictions"] == [r["prediction"] for r in expected]
+    assert body["request_ids"][:2] == ["0", "1"]
+
+    table = pa.table({"request_id": [str(i) for i in range(200)], **columns})
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    response = client.post(
+        "/v1/predict/batch/columnar",
+        content=sink.getvalue().to_pybytes(),
+        headers={"content-type": service.ARROW_STREAM, "accept": service.ARROW_STREAM},
+    )
+    result = pa.ipc.open_stream(response.content).read_all()
+    assert result.column("prediction").to_pylist() == [r["prediction"] for r in expected]
+    assert result.schema.metadata[b"model_version"].decode() == service.models.default.version
+
+
+def test_columnar_rejects_bad_input(client):
+    missing = client.post("/v1/predict/batch/columnar", json={"features": {"days_past_due": [1]}})
+    ragged = client.post("/v1/predict/batch/columnar", json={
+        "features": {name: [1, 2] for name in FEATURES if name != "account_id"} | {"days_past_due": [1]}
+    })
+
+    assert missing.status_code == 422
+    assert ragged.status_code == 422
+
+
+def test_columnar_nulls_are_missing_values(client):
+    columns = {name: [FEATURES[name], None] for name in FEATURES if name != "account_id"}
+
+    body = client.post("/v1/predict/batch/columnar", json={"features": columns}).json()
+
+    assert len(body["predictions"]) == 2
+
+
+def test_explain_matches_tree_shap_and_caches(client, service, baseline_model_dir):
+    from ml.explainability.shap_summary import explain_single
+
+    model = service.models.default
+    body = client.post("/v1/explain", json={"request_id": "r1", "features": FEATURES}).json()
+    reference = explain_single(
+        model.booster, {name: FEATURES[name] for name in model.feature_names},
+        model.feature_names, model.label_classes, native=False
+    )
+
+    assert body["prediction"] == reference["prediction"]
+    assert body["confidence"] == pytest.approx(reference["confidence"], rel=1e-5)
+    assert {i["feature"]: i["shap_value"] for i in body["feature_importance"]} == pytest.approx(
+        {c["feature"]: c["shap_value"] for c in reference["feature_contributions"]}, abs=1e-5
+    )
+
+    # Same split-threshold bins: served from the cache, and exactly what the booster gives
+    nearby = dict(FEATURES, outstanding_balance=FEATURES["outstanding_balance"] + 0.5)
+    again = client.post("/v1/explain", json={"request_id": "r2", "features": nearby}).json()
+    stats = client.get("/health").json()["explain_cache"]
+
+    row = np.array([[nearby[name] for name in model.feature_names]], dtype=np.float32)
+    _, _, direct = model.contributions_matrix(row)
+    assert {i["feature"]: i["shap_value"] for i in again["feature_importance"]} == pytest.approx(
+        dict(zip(model.feature_names, direct[0].tolist())), abs=1e-6
+    )
+    assert {i["feature"]: i["value"] for i in again["feature_importance"]}["outstanding_balance"] == \
+        nearby["outstanding_balance"]
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+
+
+def test_explain_batch_matches_single(client):
+    rows = make_rows(5, seed=2)
+
+    body = client.post(
+        "/v1/explain/batch",
+        json=[{"request_id": f"r{i}", "features": row} for i, row in enumerate(rows)],
+    ).json()
+    single = client.post("/v1/explain", json={"request_id": "r3", "features": rows[3]}).json()
+
+    assert [r["request_id"] for r in body["results"]] == [f"r{i}" for i in range(5)]
+    assert body["results"][3]["prediction"] == single["prediction"]
+    assert {i["feature"]: i["shap_value"] for i in body["results"][3]["feature_importance"]} == pytest.approx(
+        {i["feature"]: i["shap_value"] for i in single["feature_importance"]}, abs=1e-6
+    )
+
+
+def test_summary_job(load_service, baseline_model_dir, tmp_path):
+    service = load_service(
+        "inference-service", MODEL_PATH=str(baseline_model_dir), SUMMARY_OUTPUT_DIR=str(tmp_path),
+        SUMMARY_CHUNK_SIZE="100", EXPLAIN_PROCESSES="1"
+    )
+    rows = make_rows(250, seed=3)
+
+    with TestClient(service.app) as client:
+        columns = {name: [row[name] for row in rows] for name in service.models.default.feature_names}
+        job = client.post("/v1/explain/summary", json={"features": columns})
+        assert job.status_code == 202
+
+        events = client.get(f"/v1/explain/summary/{job.json()['job_id']}/events")
+        updates = [json.loads(line) for line in events.text.splitlines()]
+        status = client.get(f"/v1/explain/summary/{job.json()['job_id']}").json()
+        missing = client.get("/v1/explain/summary/nope")
+
+    assert status["status"] == "completed"
+    assert [u["rows_done"] for u in updates if u["status"] == "running"][-1] == 250
+    assert set(status["feature_importance"]) == set(service.models.default.feature_names)
+    assert sum(status["feature_importance"].values()) == pytest.approx(1.0)
+    assert json.loads(open(status["artifacts"]["importance"]).read()) == status["feature_importance"]
+    assert missing.status_code == 404
+
+
+@pytest.fixture
+def candidate_model_dir(baseline_model_dir, tmp_path):
+    """The baseline model copied to <tmp>/2.0.0 and relabelled as version 2.0.0."""
+    v2_dir = tmp_path / "2.0.0"
+    shutil.copytree(baseline_model_dir, v2_dir)
+    metadata = dict(json.loads((v2_dir / "metadata.json").read_text()), version="2.0.0")
+    (v2_dir / "metadata.json").write_text(json.dumps(metadata))
+    write_packed_artifact(v2_dir, xgb.Booster(model_file=str(v2_dir / "model.json")), metadata)
+    return v2_dir
+
+
+def test_loads_and_routes_model_versions(load_service, baseline_model_dir, candidate_model_dir, tmp_path):
+    v1 = json.loads((baseline_model_dir / "metadata.json").read_text())["version"]
+
+    service = load_service("inference-service", MODEL_PATH=str(baseline_model_dir), MODELS_ROOT=str(tmp_path))
+    request = {"request_id": "r1", "features": FEATURES}
+
+    with TestClient(service.app) as client:
+        loading = client.post("/v1/models", json={"source": "2.0.0", "make_default": False})
+        deadline = time.time() + 30
+        while "2.0.0" not in client.get("/v1/models").json()["versions"] and time.time() < deadline:
+            time.sleep(0.05)
+
+        unversioned = client.post("/v1/predict", json=request).json()
+        pinned = client.post("/v1/predict", json=dict(request, model_version="2.0.0")).json()
+        unknown = client.post("/v1/predict", json=dict(request, model_version="9.9.9"))
+        mixed = client.post("/v1/predict/batch", json=[request, dict(request, model_version="2.0.0")])
+
+        client.post("/v1/models/2.0.0/default")
+        swapped = client.post("/v1/predict", json=request).json()
+        unloaded = client.delete(f"/v1/models/{v1}").json()
+        missing_source = client.post("/v1/models", json={"source": "9.9.9"})
+        deadline = time.time() + 30
+        while "9.9.9" not in client.get("/v1/models").json()["errors"] and time.time() < deadline:
+            time.sleep(0.05)
+        models = client.get("/v1/models").json()
+
+    assert loading.status_code == 202
+    assert unversioned["model_version"] == v1
+    assert pinned["model_version"] == "2.0.0"
+    assert pinned["prediction"] == unversioned["prediction"]
+    assert unknown.status_code == 404
+    assert mixed.status_code == 422
+    assert swapped["model_version"] == "2.0.0"
+    assert unloaded["versions"] == ["2.0.0"]
+    assert missing_source.status_code == 202
+    assert models["default"] == "2.0.0"
+    assert "No model artifacts" in models["errors"]["9.9.9"]
+
+
+def test_same_metadata_version_loads_as_second_model(load_service, baseline_model_dir, tmp_path):
+    v1 = json.loads((baseline_model_dir / "metadata.json").read_text())["version"]
+    retrained = tmp_path / "retrained"
+    shutil.copytree(baseline_model_dir, retrained)
+    metadata = dict(json.loads((retrained / "metadata.json").read_text()), created_at="retrained")
+    (retrained / "metadata.json").write_text(json.dumps(metadata))
+    write_packed_artifact(retrained, xgb.Booster(model_file=str(retrained / "model.json")), metadata)
+    service = load_service("inference-service", MODEL_PATH=str(baseline_model_dir))
+
+    with TestClient(service.app) as client:
+        client.post("/v1/models", json={"source": str(retrained), "make_default": False})
+        deadline = time.time() + 30
+        while len(client.get("/v1/models").json()["versions"]) < 2 and time.time() < deadline:
+            time.sleep(0.05)
+        models = client.get("/v1/models").json()
+        pinned = client.post("/v1/predict", json={
+            "request_id": "r1", "features": FEATURES, "model_version": models["versions"][1]
+        }).json()
+
+    assert models["default"] == v1
+    assert models["versions"][0] == v1 and models["versions"][1].startswith(f"{v1}+")
+    assert pinned["model_version"] == models["versions"][1]
+    assert service.models.get(v1).model_id != service.models.get(models["versions"][1]).model_id
+
+
+def test_canary_and_shadow_traffic(load_service, baseline_model_dir, candidate_model_dir, tmp_path):
+    v1 = json.loads((baseline_model_dir / "metadata.json").read_text())["version"]
+    service = load_service(
+        "inference-service", MODEL_PATH=str(baseline_model_dir), CANDIDATE_MODEL=str(candidate_model_dir),
+        FF_NEW_MODEL_V2="true", CANARY_PERCENT="50", SHADOW_MODE="true", SHADOW_LOG_DIR=str(tmp_path / "shadow")
+    )
+    rows = make_rows(40, seed=4)
+
+    with TestClient(service.app) as client:
+        served = [
+            client.post("/v1/predict", json={"request_id": f"r{i}", "features": row}).json()
+            for i, row in enumerate(rows)
+        ]
+        pinned = client.post("/v1/predict", json={
+            "request_id": "pinned", "features": rows[0], "model_version": served[0]["model_version"]
+        })
+        off = client.put("/v1/traffic", json={"enabled": False}).json()
+        unsplit = client.post("/v1/predict", json={"request_id": "off", "features": rows[0]}).json()
+
+    import pyarrow.parquet as pq
+    pairs = pq.read_table(sorted((tmp_path / "shadow").glob("pairs-*.parquet"))).to_pylist()
+    versions = {r["model_version"] for r in served}
+
+    assert versions == {v1, "2.0.0"}
+    assert len(pairs) == 40
+    assert {p["request_id"] for p in pairs} == {f"r{i}" for i in range(40)}
+    assert all(p["served_version"] != p["shadow_version"] for p in pairs)
+    assert all(p["canary"] == (p["served_version"] == "2.0.0") for p in pairs)
+    # Same booster under both versions
+    assert all(p["served_prediction"] == p["shadow_prediction"] for p in pairs)
+    assert pinned.status_code == 200
+    assert off["enabled"] is False
+    assert unsplit["model_version"] == v1
+
+
+def test_split_to_the_default_model_is_rejected(load_service, baseline_model_dir, tmp_path):
+    v1 = json.loads((baseline_model_dir / "metadata.json").read_text())["version"]
+    service = load_service(
+        "inference-service", MODEL_PATH=str(baseline_model_dir), CANDIDATE_MODEL=str(baseline_model_dir),
+        FF_NEW_MODEL_V2="true", CANARY_PERCENT="50", SHADOW_MODE="true", SHADOW_LOG_DIR=str(tmp_path / "shadow")
+    )
+
+    with TestClient(service.app) as client:
+        served = client.post("/v1/predict", json={"request_id": "r1", "features": FEATURES}).json()
+        rejected = client.put("/v1/traffic", json={"candidate_version": v1})
+        traffic = client.get("/v1/traffic").json()
+        executors = client.get("/health").json()["executors"]
+
+    assert served["model_version"] == v1
+    assert rejected.status_code == 409
+    assert traffic["candidate_version"] is None and traffic["unsplit"] == 1
+    assert executors["shadow"]["max_pending"] < executors["inference"]["max_pending"]
+
+
+def test_packed_artifact_matches_json_artifacts(service, baseline_model_dir, tmp_path):
+    json_dir = tmp_path / "json"
+    shutil.copytree(baseline_model_dir, json_dir)
+    (json_dir / "model.pack").unlink()
+    pack_dir = tmp_path / "pack"
+    pack_dir.mkdir()
+    shutil.copy(baseline_model_dir / "model.pack", pack_dir)
+
+    from_json = service.BoosterModel(str(json_dir))
+    from_pack = service.BoosterModel(str(pack_dir))
+    rows = [SimpleNamespace(**dict(FEATURES, days_past_due=d, payment_history_score=s))
+            for d in (0, 45, 95) for s in (0.1, 0.5, 0.9)]
+
+    assert (from_json.artifact_format, from_pack.artifact_format) == ("json", "pack")
+    assert from_pack.metadata == from_json.metadata
+    assert from_pack.predict_many(rows) == from_json.predict_many(rows)
+    assert [from_pack.explain_key(r)[0] for r in rows] == [from_json.explain_key(r)[0] for r in rows]
+    assert from_pack.explain(rows[0]) == from_json.explain(rows[0])
+
+
+def test_predictions_update_drift_sketches(load_service, baseline_model_dir, tmp_path):
+    service = load_service("inference-service", MODEL_PATH=str(baseline_model_dir), DRIFT_SKETCH_DIR=str(tmp_path))
+    rows = make_rows(20)
+    assert (baseline_model_dir / "drift_reference.json").exists()
+
+    with TestClient(service.app) as client:
+        client.post("/v1/predict", json={"request_id": "r0", "features": FEATURES})
+        client.post("/v1/predict/batch", json=[{"request_id": f"r{i}", "features": row} for i, row in enumerate(rows)])
+        body = client.get("/v1/drift/sketches").json()
+
+    sketch = body["sketches"][0]
+    assert body["rows_sketched"] == 21
+    assert sketch["feature_names"] == service.models.default.feature_names
+    assert sum(sketch["counts"]) == 21 * len(sketch["feature_names"])
+    assert len(list(tmp_path.glob("sketch-*.json"))) == 1
@@ -0,0 +1,94 @@
+import asyncio
+import importlib.util
+from pathlib import Path
+
+SERVICE_BATCHER = Path(__file__).parents[2] / "services" / "inference-service" / "micro_batcher.py"
+
+
+def load_batcher_module():
+    spec = importlib.util.spec_from_file_location("inference_service_micro_batcher", SERVICE_BATCHER)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+MicroBatcher = load_batcher_module().MicroBatcher
+
+
+class RecordingModel:
+    def __init__(self):
+        self.calls = []
+
+    async def __call__(self, items):
+        self.calls.append(list(items))
+        return [item * 10 for item in items]
+
+
+def test_concurrent_calls_share_one_batch():
+    run_batch = RecordingModel()
+    batcher = MicroBatcher(run_batch, max_batch_size=100, max_wait_us=2000)
+
+    async def burst():
+        return await asyncio.gather(*[batcher.submit(i) for i in range(20)])
+
+    assert asyncio.run(burst()) == [i * 10 for i in range(20)]
+    assert run_batch.calls == [list(range(20))]
+
+
+def test_flushes_at_max_batch_size():
+    run_batch = RecordingModel()
+    batcher = MicroBatcher(run_batch, max_batch_size=8, max_wait_us=1_000_000)
+
+    async def burst():
+        return await asyncio.wait_for(asyncio.gather(*[batcher.submit(i) for i in range(20)]), timeout=5)
+
+    results = asyncio.run(burst())
+
+    assert results == [i * 10 for i in range(20)]
+    assert [len(c) for c in run_batch.calls[:2]] == [8, 8]
+    assert batcher.stats()["items"] == 20
+
+
+def test_single_request_waits_at_most_max_wait():
+    run_batch = RecordingModel()
+    batcher = MicroBatcher(run_batch, max_batch_size=64, max_wait_us=1000)
+
+    async def one():
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        result = await batcher.submit(3)
+        return result, loop.time() - start
+
+    result, waited = asyncio.run(one())
+
+    assert result == 30
+    assert waited < 0.5
+
+
+def test_batch_errors_reach_every_caller():
+    async def failing(items):
+        raise RuntimeError("model failed")
+
+    batcher = MicroBatcher(failing, max_batch_size=4, max_wait_us=100)
+
+    async def burst():
+        return await asyncio.gather(*[batcher.submit(i) for i in range(4)], return_exceptions=True)
+
+    results = asyncio.run(burst())
+
+    assert all(isinstance(r, RuntimeError) for r in results)
+
+
+def test_cancelled_caller_does_not_break_batch():
+    run_batch = RecordingModel()
+    batcher = MicroBatcher(run_batch, max_batch_size=64, max_wait_us=5000)
+
+    async def scenario():
+        cancelled = asyncio.ensure_future(batcher.submit(1))
+        kept = asyncio.ensure_future(batcher.submit(2))
+        await asyncio.sleep(0)
+        cancelled.cancel()
+        return await kept
+
+    assert asyncio.run(scenario()) == 20
+    assert run_batch.calls == [[1, 2]]
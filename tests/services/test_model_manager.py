@@ -0,0 +1,152 @@
+import asyncio
+import importlib.util
+import threading
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+SERVICE_MANAGER = Path(__file__).parents[2] / "services" / "inference-service" / "model_manager.py"
+
+
+def load_manager_module():
+    spec = importlib.util.spec_from_file_location("inference_service_model_manager", SERVICE_MANAGER)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+model_manager = load_manager_module()
+ModelManager = model_manager.ModelManager
+ModelNotFound = model_manager.ModelNotFound
+
+
+class SlowLoader:
+    """Loads SimpleNamespace models; loads of `blocking` wait for release()."""
+
+    def __init__(self, blocking: str = None):
+        self.blocking = blocking
+        self.gate = threading.Event()
+        self.calls = []
+
+    def __call__(self, model_dir):
+        self.calls.append(model_dir)
+        if model_dir == self.blocking:
+            self.gate.wait(timeout=5)
+        if model_dir == "broken":
+            raise RuntimeError("corrupt model.json")
+        return SimpleNamespace(version=model_dir)
+
+
+def test_default_swaps_only_after_load_completes():
+    loader = SlowLoader(blocking="v2")
+    manager = ModelManager(load=loader, resolve=lambda source: source)
+
+    async def scenario():
+        await manager.load("v1")
+        task = manager.load_in_background("v2", make_default=True)
+        await asyncio.sleep(0.05)
+        during = manager.get().version, manager.stats()["loading"]
+        loader.gate.set()
+        await task
+        return during
+
+    during = asyncio.run(scenario())
+
+    assert during == ("v1", ["v2"])
+    assert manager.get().version == "v2"
+    assert manager.get("v1").version == "v1"
+
+
+def test_concurrent_loads_share_one_load():
+    loader = SlowLoader()
+    manager = ModelManager(load=loader, resolve=lambda source: source)
+
+    async def scenario():
+        return await asyncio.gather(manager.load("v1"), manager.load("v1"))
+
+    first, second = asyncio.run(scenario())
+
+    assert first is second
+    assert loader.calls == ["v1"]
+
+
+def test_failed_load_keeps_serving_default():
+    manager = ModelManager(load=SlowLoader(), resolve=lambda source: source)
+
+    async def scenario():
+        await manager.load("v1")
+        with pytest.raises(RuntimeError):
+            await manager.load("broken", make_default=True)
+
+    asyncio.run(scenario())
+
+    assert manager.get().version == "v1"
+    assert "corrupt" in manager.stats()["errors"]["broken"]
+
+
+def test_routing_and_unload():
+    manager = ModelManager(load=SlowLoader(), resolve=lambda source: source)
+    manager.add(SimpleNamespace(version="v1"))
+    manager.add(SimpleNamespace(version="v2"))
+
+    with pytest.raises(ModelNotFound):
+        manager.get("v3")
+    with pytest.raises(ValueError):
+        manager.unload("v1")
+
+    manager.set_default("v2")
+    manager.unload("v1")
+
+    assert manager.stats()["versions"] == ["v2"]
+    assert manager.get().version == "v2"
+
+
+def test_same_version_from_other_artifacts_is_served_alongside():
+    manager = ModelManager(load=SlowLoader(), resolve=lambda source: source)
+    first = SimpleNamespace(version="1.0.0", model_id="aaaa1111aaaa1111")
+    manager.add(first)
+    manager.add(SimpleNamespace(version="1.0.0", model_id="aaaa1111aaaa1111"))
+    other = SimpleNamespace(version="1.0.0", model_id="bbbb2222bbbb2222")
+    manager.add(other)
+
+    assert manager.stats()["versions"] == ["1.0.0", "1.0.0+bbbb2222bbbb"]
+    assert manager.get() is not other
+    assert manager.get("1.0.0+bbbb2222bbbb") is other
+
+
+def test_resolve_local_sources(tmp_path):
+    version_dir = tmp_path / "1.2.0"
+    version_dir.mkdir()
+    (version_dir / "model.json").write_text("{}")
+
+    def resolve(source):
+        return model_manager.resolve_model_dir(source, str(tmp_path), "http://unused", str(tmp_path / "dl"))
+
+    assert resolve(str(version_dir)) == str(version_dir)
+    assert resolve("1.2.0") == str(version_dir)
+    with pytest.raises(FileNotFoundError):
+        resolve("9.9.9")
+    assert model_manager.registry_uri("inflow-baseline", "Staging") == "models:/inflow-baseline/Staging"
+
+
+def test_resolve_from_local_registry(tmp_path):
+    from ml.models.baseline.registry import LocalModelRegistry
+
+    artifacts = tmp_path / "artifacts"
+    artifacts.mkdir()
+    (artifacts / "model.json").write_text("{}")
+    registry = LocalModelRegistry(tmp_path / "registry")
+    registry.register_model(str(artifacts), "inflow-baseline")
+    registry.promote_model("inflow-baseline", "1", "Production")
+    index = model_manager.LocalRegistryIndex(str(tmp_path / "registry"))
+
+    def resolve(source):
+        return model_manager.resolve_model_dir(source, str(tmp_path), "http://unused", str(tmp_path / "dl"), index)
+
+    assert resolve("models:/inflow-baseline/Production") == str(registry.get_model_path("inflow-baseline"))
+    assert resolve("models:/inflow-baseline/1") == str(registry.get_model_path("inflow-baseline", "1"))
+    with pytest.raises(FileNotFoundError):
+        resolve("models:/inflow-baseline/Staging")
+    with pytest.raises(FileNotFoundError):
+        resolve("models:/other/Production")
@@ -0,0 +1,68 @@
+import asyncio
+import importlib.util
+from pathlib import Path
+
+import pyarrow.parquet as pq
+
+SERVICE_SPLIT = Path(__file__).parents[2] / "services" / "inference-service" / "traffic_split.py"
+
+
+def load_split_module():
+    spec = importlib.util.spec_from_file_location("inference_service_traffic_split", SERVICE_SPLIT)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+traffic_split = load_split_module()
+TrafficSplit = traffic_split.TrafficSplit
+PairedOutputLog = traffic_split.PairedOutputLog
+
+ACCOUNTS = [f"ACC{i:06d}" for i in range(5000)]
+
+
+def test_canary_share_is_sticky_and_close_to_percent():
+    split = TrafficSplit(enabled=True, candidate_version="v2", canary_percent=10)
+
+    routed = [split.is_canary(account) for account in ACCOUNTS]
+
+    assert routed == [split.is_canary(account) for account in ACCOUNTS]
+    assert 0.08 < sum(routed) / len(routed) < 0.12
+
+
+def test_flag_off_or_zero_percent_never_routes():
+    assert not any(TrafficSplit(enabled=False, canary_percent=100).is_canary(a) for a in ACCOUNTS[:100])
+    assert not any(TrafficSplit(enabled=True, canary_percent=0).is_canary(a) for a in ACCOUNTS[:100])
+    assert all(TrafficSplit(enabled=True, canary_percent=100).is_canary(a) for a in ACCOUNTS[:100])
+
+
+def test_shadow_slots_are_bounded():
+    split = TrafficSplit(enabled=True, shadow=True, max_shadow_in_flight=2)
+
+    started = [split.try_start_shadow() for _ in range(3)]
+    split.finish_shadow(scored=True)
+
+    assert started == [True, True, False]
+    assert split.stats()["shadow_dropped"] == 1
+    assert split.stats()["shadow_scored"] == 1
+    assert split.try_start_shadow()
+
+
+def test_paired_log_writes_parquet(tmp_path):
+    async def scenario():
+        log = PairedOutputLog(str(tmp_path), max_rows=3, flush_interval=60)
+        for i in range(5):
+            log.append(float(i), f"r{i}", f"ACC{i}", i % 2 == 0, "v1", "monitor", 0.6, 1.5,
+                       "v2", "escalate" if i == 4 else "monitor", 0.7, 2.5)
+        await log.close()
+        return log.stats()
+
+    stats = asyncio.run(scenario())
+    files = sorted(tmp_path.glob("pairs-*.parquet"))
+    table = pq.read_table(files)
+
+    assert stats == {"buffered": 0, "rows_written": 5, "files_written": 2}
+    assert len(files) == 2
+    assert table.schema == PairedOutputLog.SCHEMA
+    assert table.column("request_id").to_pylist() == [f"r{i}" for i in range(5)]
+    assert table.column("shadow_prediction").to_pylist()[-1] == "escalate"